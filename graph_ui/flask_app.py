@@ -1,6 +1,6 @@
 #!/usr/bin/env python
 
-from flask import Flask, render_template
+from flask import Flask, render_template, jsonify
 from flask_socketio import SocketIO
 import jinja2
 import os
@@ -33,6 +33,10 @@ def index():
 def sim_index():
     return render_template('flask_sim.html')
 
+@app.route('/stats')
+def stats():
+    return jsonify(app.network_state.stats())
+
 
 @socketio.on('connect')
 def handle_connect():
@@ -53,6 +57,8 @@ def handle_json(message):
             socketio.emit('message', {'command': 'init response', 'payload': app.network_state.sync_state()})
         elif message['command'] == 'sensors':
             app.network_state.update_sensors(message['payload'])
+        elif message['command'] == 'stats':
+            socketio.emit('message', {'command': 'stats response', 'payload': app.network_state.stats()})
 
 
 class NetworkState(object):
@@ -117,10 +123,20 @@ class NetworkState(object):
         """
         return self.net.to_json()
 
+    def stats(self):
+        """
+        :return: the net's runtime counters and gauges (NeuralNet.get_stats) plus this loop's
+                 update_rate and smoothed time_delta, in seconds
+        """
+        stats = self.net.Net.get_stats()
+        stats['update_rate'] = self.update_rate
+        stats['time_delta'] = self.smooth_delta
+        return stats
+
     def update_sensors(self, payload):
         for neuron in self.net.Net.Neurons:
             if neuron.Name in payload.keys():
-                neuron._sensory_current = payload[neuron.Name]
+                self.net.Net.set_sensory_current(neuron, payload[neuron.Name])
 
     def device_loop(self):
         # yield here skips the first update and calls us again after the update period expires
@@ -133,8 +149,9 @@ class NetworkState(object):
         # update the network
         self.net.Net.update()
         payload = {'neurons': {}}
+        snapshot = self.net.Net.get_snapshot()
         for neuron in self.net.Net.Neurons:
-            activity = neuron.get_activity()
+            activity = snapshot.get(neuron.Name)
             if neuron.Name not in self.last_transmitted_state or self.last_transmitted_state[neuron.Name] != activity:
                 payload['neurons'][neuron.Name] = {"value": activity,
                                                    "is_output": (len(neuron.Outgoing) == 0 and len(neuron.Incoming) != 0)}
@@ -4,6 +4,7 @@ import json
 import logging
 import os
 import time
+import zipfile
 
 
 import tornado.auth
@@ -19,6 +20,8 @@ from tornado import gen
 from datetime import datetime
 
 UPDATE_RATE =  1./40 # seconds
+CHECKPOINT_PATH = os.path.join(os.path.dirname(__file__), 'graph_ui.ckpt') # resumed from on start
+CHECKPOINT_EVERY = 400 # updates
 
 UPDATE_KEY = 'update'
 COMMAND_KEY = 'command'
@@ -37,6 +40,7 @@ class WebSocketBridge(object):
         # non-blocking periodic polling in tornado
         self.update_rate = UPDATE_RATE
         self.last_frame = datetime.now()
+        self.time_delta = 0.0
         self.last_transmitted_state = {}
 
         # websocket callback for push messages
@@ -48,6 +52,13 @@ class WebSocketBridge(object):
         from neuralnetio import NeuralIO
         path = '../neural2/nets/nerve_sim_layout_1.nui'
         self.net = NeuralIO.create(path)
+        self.updates = 0
+        if os.path.exists(CHECKPOINT_PATH):
+            try:
+                # runtime state only, edits to the .nui file since win over the checkpoint
+                self.net.Net.restore(CHECKPOINT_PATH, parameters=False)
+            except (ValueError, KeyError, OSError, zipfile.BadZipFile) as e:
+                logging.getLogger(__name__).warning("not resuming from %s: %s", CHECKPOINT_PATH, e)
 
         #from gui.nervesimreader import NerveSimReader
         #path = '../neural2/nets/newer neurons.neu'
@@ -87,10 +98,20 @@ class WebSocketBridge(object):
         #
         # }
 
+    def stats(self):
+        '''
+        :return: the net's runtime counters and gauges (NeuralNet.get_stats) plus this loop's
+                 update_rate and last time_delta, in seconds
+        '''
+        stats = self.net.Net.get_stats()
+        stats['update_rate'] = self.update_rate
+        stats['time_delta'] = self.time_delta
+        return stats
+
     def update_sensors(self, payload):
         for neuron in self.net.Net.Neurons:
             if neuron.Name in payload.keys():
-                neuron._sensory_current = payload[neuron.Name]
+                self.net.Net.set_sensory_current(neuron, payload[neuron.Name])
         # { 'node1': 0.0, 'node2': 0.0 }
 
     @gen.engine
@@ -102,9 +123,13 @@ class WebSocketBridge(object):
 
         # update the network
         self.net.Net.update()
+        self.updates += 1
+        if self.updates % CHECKPOINT_EVERY == 0:
+            self.net.Net.checkpoint(CHECKPOINT_PATH)
         payload = {}
+        snapshot = self.net.Net.get_snapshot()
         for neuron in self.net.Net.Neurons:
-            activity = neuron.get_activity()
+            activity = snapshot.get(neuron.Name)
             if neuron.Name not in self.last_transmitted_state or self.last_transmitted_state[neuron.Name] != activity:
                 payload[neuron.Name] = activity
             # payload[neuron.Name] = activity
@@ -115,6 +140,7 @@ class WebSocketBridge(object):
         frame = datetime.now()
         delta = (frame - self.last_frame).total_seconds()
         self.last_frame = frame
+        self.time_delta = delta
 
         payload['time_delta'] = delta
 
@@ -137,6 +163,7 @@ class Application(tornado.web.Application):
         handlers = [
             (r"/ws", WSHandler),
             (r"/simws", WSHandler),
+            (r"/stats", StatsHandler),
             (r"^/(.*)$", MainHandler),
         ]
         settings = dict(
@@ -180,6 +207,10 @@ class MainHandler(BaseHandler):
         with open(angular_app_path + filename, 'r') as f:
             self.write(f.read())
 
+class StatsHandler(BaseHandler):
+    def get(self):
+        self.write(self.application.wsbridge.stats())
+
 class WSHandler(tornado.websocket.WebSocketHandler):
     connections = set()
     ws_open = False
@@ -225,6 +256,11 @@ class WSHandler(tornado.websocket.WebSocketHandler):
                 COMMAND_KEY: 'init response',
                 PAYLOAD_KEY: self.application.wsbridge.sync_state()
             }
+        elif (COMMAND_KEY in message_dict.keys()) and 'stats' in message_dict[COMMAND_KEY]:
+            return_msg = {
+                COMMAND_KEY: 'stats response',
+                PAYLOAD_KEY: self.application.wsbridge.stats()
+            }
         elif (COMMAND_KEY in message_dict.keys()) and (PAYLOAD_KEY in message_dict.keys()) \
                 and ('sensor' in message_dict[COMMAND_KEY]):
             self.application.wsbridge.update_sensors(message_dict[PAYLOAD_KEY])
@@ -0,0 +1,141 @@
+#!/usr/bin/env python
+"""
+    TraceWriter / TraceReader classes
+
+    On disk activity traces for long runs.  A trace file is a small header
+    followed by fixed width blocks of columns, each holding up to chunk updates:
+
+        step        int64 x chunk
+        activity    float64 x neurons x chunk   (firing frequency, one column per neuron)
+        voltage     float64 x neurons x chunk   (only when recorded)
+        count       int64                       (updates stored in this block)
+
+    Blocks are plain numpy records, so a reader maps the file with
+    numpy.memmap; one neuron's history is a contiguous run in every block, so
+    reading it from a multi GB trace only costs that neuron's pages.  Updates
+    are buffered into the last block, which is rewritten in place on every
+    flush; a trace cut short by a crash is readable up to its last flush.
+
+        net.attach_trace(TraceWriter('run.trace', net.get_trace_names(), voltage=True))
+        ...
+        trace = TraceReader('run.trace')
+        lc = trace.column('LC')            # firing frequency of LC, every update
+        blocks = trace.Blocks              # memmapped blocks
+"""
+import json
+import struct
+import numpy as np
+
+_MAGIC_ = b'NTRACE2\n'
+_ALIGN_ = 64 # blocks start on an aligned offset
+
+def _block_dtype(count, voltage, chunk):
+    fields = [('step', np.int64, (chunk,)), ('activity', np.float64, (count, chunk))]
+    if voltage:
+        fields.append(('voltage', np.float64, (count, chunk)))
+    fields.append(('count', np.int64)) # last, so a torn rewrite keeps the old count
+    return np.dtype(fields)
+
+class TraceWriter(object):
+    class TraceError(Exception):
+        pass
+
+    def __init__(self, path, names, voltage=False, buffer_frames=1024):
+        """ param: path - trace file, overwritten
+            param: names - one name per traced neuron, in column order
+            param: voltage - also record each neuron's voltage
+            param: buffer_frames - updates per block, held in memory between writes to disk
+        """
+        self.Path = path
+        self.Names = list(names)
+        self.Voltage = voltage
+        self.Chunk = max(1, buffer_frames)
+        self.dtype = _block_dtype(len(self.Names), voltage, self.Chunk)
+        self.__buffer = np.zeros(1, dtype=self.dtype)[0]
+        self.__count = 0
+        self.__flushed = 0
+        self.__blocks = 0
+
+        header = json.dumps({'names': self.Names, 'voltage': voltage,
+                             'chunk': self.Chunk}).encode('utf-8')
+        size = len(_MAGIC_) + 4 + len(header)
+        header += b' ' * (-size % _ALIGN_)
+        self.__file = open(path, 'wb')
+        self.__file.write(_MAGIC_ + struct.pack('<I', len(header)) + header)
+        self.__offset = self.__file.tell()
+
+    def write(self, step, activity, voltage=None):
+        """ append an update, activity (and voltage when recorded) in column order """
+        if self.__file is None:
+            raise TraceWriter.TraceError("trace '%s' is closed" % self.Path)
+        block = self.__buffer
+        block['step'][self.__count] = step
+        block['activity'][:, self.__count] = activity
+        if self.Voltage:
+            block['voltage'][:, self.__count] = voltage
+        self.__count += 1
+        if self.__count == self.Chunk:
+            self.flush()
+
+    def flush(self):
+        """ write the last block, full or not """
+        if self.__file is None or self.__count == self.__flushed:
+            return
+        self.__buffer['count'] = self.__count
+        self.__file.seek(self.__offset + self.__blocks * self.dtype.itemsize)
+        self.__file.write(self.__buffer.tobytes())
+        self.__file.flush()
+        self.__flushed = self.__count
+        if self.__count == self.Chunk:
+            self.__blocks += 1
+            self.__count = self.__flushed = 0
+
+    def close(self):
+        self.flush()
+        if self.__file is not None:
+            self.__file.close()
+            self.__file = None
+
+    def __len__(self):
+        return self.__blocks * self.Chunk + self.__count
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *args):
+        self.close()
+
+class TraceReader(object):
+    def __init__(self, path):
+        self.Path = path
+        with open(path, 'rb') as f:
+            if f.read(len(_MAGIC_)) != _MAGIC_:
+                raise TraceWriter.TraceError("'%s' is not a trace file" % path)
+            length = struct.unpack('<I', f.read(4))[0]
+            header = json.loads(f.read(length).decode('utf-8'))
+            f.seek(0, 2)
+            size = f.tell()
+        self.Names = header['names']
+        self.Voltage = header['voltage']
+        self.Chunk = header['chunk']
+        self.dtype = _block_dtype(len(self.Names), self.Voltage, self.Chunk)
+        offset = len(_MAGIC_) + 4 + length
+        blocks = (size - offset) // self.dtype.itemsize # a partly written last block is ignored
+        if blocks == 0:
+            self.Blocks = np.zeros(0, dtype=self.dtype) # an empty file can't be mapped
+            self.__length = 0
+        else:
+            self.Blocks = np.memmap(path, dtype=self.dtype, mode='r', offset=offset, shape=(blocks,))
+            last = min(max(int(self.Blocks[-1]['count']), 0), self.Chunk)
+            self.__length = (blocks - 1) * self.Chunk + last
+        self.__names = dict((name, i) for i, name in enumerate(self.Names))
+
+    def __len__(self):
+        return self.__length
+
+    def steps(self):
+        return self.Blocks['step'].reshape(-1)[:self.__length]
+
+    def column(self, name, field='activity'):
+        """ one neuron's values over the whole trace, reading only its columns """
+        return self.Blocks[field][:, self.__names[name], :].reshape(-1)[:self.__length]
@@ -0,0 +1,307 @@
+#!/usr/bin/env python
+"""
+    Scaling benchmarks
+
+    Generates synthetic nets from 1e2 to 1e6 neurons and times the hot paths on
+    them: update() steps/sec, memory per neuron, NeuralNetIO write / read and
+    NerveSimReader parse time.  Results are written as JSON so a run can be
+    checked against an earlier baseline:
+
+        python benchmark.py --sizes 100 1000 10000 --fan-in 8 --output new.json
+        python benchmark.py --sizes 100 1000 10000 --fan-in 8 --baseline old.json
+
+    The second form exits non-zero if any metric got worse than the baseline by
+    more than --tolerance.  The XML based formats are much slower than stepping,
+    so they are only timed up to --io-limit / --parse-limit neurons.  NeuralNetIO
+    recurses along the links, so it is timed on a thread with IOStack bytes of
+    stack and the recursion limit raised to IORecursion.  Its DOM grows to
+    several GB by 1e4 neurons, hence the lower default --io-limit.
+"""
+import argparse
+import json
+import os
+import platform
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+import numpy as np
+from neuron import Neuron
+from neuralnet import NeuralNet
+from neuralnetio import NeuralNetIO
+from subnet import SubNet
+
+# intrinsic current parameters, (LowIC, LIC, HighIC, HIC), taken from nets/newer neurons.neu
+_INTRINSICS_ = {Neuron.ICType_VInf: (-1e-8, [-0.02, 0.175, 31.25], 2e-8, [0.075, 0.0]),
+                Neuron.ICType_Random: (-1e-8, [2.0, 3.0, 0.0], 2e-9, [0.5, 3.5])}
+
+def generate(neurons, fan_in=4, gating_ratio=0.0, ic_share=0.0, subnet_depth=0, seed=0):
+    """ a random net for benchmarking
+        param: neurons - number of neurons
+        param: fan_in - incoming links per neuron, fewer where random sources collide
+        param: gating_ratio - fraction of links with a gate source
+        param: ic_share - fraction of neurons with an intrinsic current, VInf and Random in equal parts
+        param: subnet_depth - number of SubNets wrapped around the generated neurons, each level
+            adds an input neuron feeding the SubNet and an output neuron it feeds
+        param: seed - the same seed generates the same net
+        neuron 0 is the only input and gets a sensory current, the last neuron is an output
+    """
+    rng = np.random.default_rng(seed)
+    dst = np.repeat(np.arange(1, neurons), fan_in)
+    src = rng.integers(0, max(neurons - 1, 1), len(dst))
+    key = src * neurons + dst
+    _, keep = np.unique(key, return_index=True)
+    keep = np.sort(keep[src[keep] != dst[keep]])
+    src, dst = src[keep], dst[keep]
+    edges = len(src)
+
+    gated = rng.random(edges) < gating_ratio
+    ic = np.where(rng.random(neurons) < ic_share, rng.integers(0, 2, neurons), Neuron.ICType_None)
+    params = {'IntrinsicCurrent': ic,
+              'LowIC': np.zeros(neurons), 'LIC': np.zeros((neurons, 3)),
+              'HighIC': np.zeros(neurons), 'HIC': np.zeros((neurons, 2))}
+    for ic_type, (low, lic, high, hic) in _INTRINSICS_.items():
+        mask = ic == ic_type
+        params['LowIC'][mask] = low
+        params['LIC'][mask] = lic
+        params['HighIC'][mask] = high
+        params['HIC'][mask] = hic
+
+    net = NeuralNet.from_arrays(['n%d' % i for i in range(neurons)], params, src, dst,
+                                weights=rng.uniform(-0.5e-8, 1e-8, edges),
+                                gate_src=np.where(gated, rng.integers(0, neurons, edges), -1),
+                                gate_weights=np.where(gated, rng.uniform(0.0, 2.0, edges), 1.0),
+                                gate_types=np.where(gated, rng.integers(0, 2, edges), 0),
+                                gate_states=np.where(gated, rng.integers(0, 2, edges), 0))
+    if neurons:
+        net.Neurons[0]._sensory_current = 1e-8
+
+    for level in range(subnet_depth):
+        outer = NeuralNet()
+        source = outer.add_neuron()
+        sub = outer.add_subnet('sub', None)
+        sub.Net = net
+        target = outer.add_neuron()
+        outer.add_link(source, sub, 1e-8)
+        outer.add_link(sub, target, 1e-8)
+        source._sensory_current = 1e-8
+        net = outer
+    return net
+
+def write_neu(arrays, path):
+    """ write the output of NeuralNet.to_arrays as a NerveSim .neu file, for timing NerveSimReader """
+    names, params = arrays['names'], arrays['params']
+    src, dst, gate_src = arrays['src'].tolist(), arrays['dst'].tolist(), arrays['gate_src'].tolist()
+
+    # each neuron's incoming connections are a linked list through the connection table
+    head = [-1] * len(names)
+    chain = [-1] * len(src)
+    for i in reversed(range(len(src))):
+        chain[i] = head[dst[i]]
+        head[dst[i]] = i
+
+    intrinsics = [i for i, t in enumerate(params['IntrinsicCurrent'].tolist()) if t != Neuron.ICType_None]
+    ic_index = dict((n, i) for i, n in enumerate(intrinsics))
+    lines = ['numNeurons %d' % len(names)]
+    for i, name in enumerate(names):
+        p = 'neuron[%d].' % i
+        lines += [p + 'name ' + name,
+                  p + 'membranceConductance %r' % params['MembraneConductance'][i].item(),
+                  p + 'membranceCapacitance %r' % params['MembraneCapacitance'][i].item(),
+                  p + 'thresholdVoltage %r' % params['ThresholdVoltage'][i].item(),
+                  p + 'minFiringFrequency %r' % params['MinFiringFrequency'][i].item(),
+                  p + 'Gain %r' % params['Gain'][i].item(),
+                  p + 'sensorType 0', p + 'paramsSensorCurrent[0] 0', p + 'paramsSensorCurrent[1] 0',
+                  p + 'motorType 0', p + 'motorName 0', p + 'motorConst 0',
+                  p + 'intrinsicCurrent %d' % ic_index.get(i, -1),
+                  p + 'neuronConnection %d' % head[i]]
+
+    lines.append('numIntrinsicCurrents %d' % len(intrinsics))
+    for j, i in enumerate(intrinsics):
+        p = 'intrinsicCurrent[%d].' % j
+        lic, hic = params['LIC'][i].tolist(), params['HIC'][i].tolist()
+        lines += [p + 'type %d' % params['IntrinsicCurrent'][i],
+                  p + 'low %r' % params['LowIC'][i].item(),
+                  p + 'paramsLIC[0] %r' % lic[0], p + 'paramsLIC[1] %r' % lic[1], p + 'paramsLIC[2] %r' % lic[2],
+                  p + 'high %r' % params['HighIC'][i].item(),
+                  p + 'paramsHIC[0] %r' % hic[0], p + 'paramsHIC[1] %r' % hic[1],
+                  p + 'isHigh 0', p + 'timeSinceLastChange 0', p + 'maxTimeSinceLastChange 0']
+
+    lines.append('numNeuronConnections %d' % len(src))
+    for i in range(len(src)):
+        p = 'neuronConnection[%d].' % i
+        lines += [p + 'sourceName ' + names[src[i]],
+                  p + 'source %d' % src[i],
+                  p + 'sourceWeight %r' % arrays['weights'][i].item(),
+                  p + 'type %d' % arrays['gate_types'][i],
+                  p + 'targetName ' + (names[gate_src[i]] if gate_src[i] >= 0 else '-'),
+                  p + 'target %d' % max(gate_src[i], 0),
+                  p + 'targetWeight %r' % arrays['gate_weights'][i].item(),
+                  p + 'ungatedState %d' % arrays['gate_states'][i],
+                  p + 'next %d' % chain[i]]
+
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+
+def _nervesim_reader():
+    # the reader lives with the editor, whose modules import each other by bare name
+    gui = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'gui')
+    if gui not in sys.path:
+        sys.path.append(gui)
+    from nervesimreader import NerveSimReader
+    return NerveSimReader
+
+def write_net(path, net):
+    """ NeuralNetIO.write net to path, and each SubNet's net to its own file beside it """
+    io = NeuralNetIO()
+    base = os.path.splitext(path)[0]
+    io._unlink_subnets(net) # the inner files shouldn't hold the boundary links
+    try:
+        for n in net.Neurons:
+            if isinstance(n, SubNet):
+                n.Path = '%s.%s.net' % (os.path.basename(base), n.Name)
+                write_net(os.path.join(os.path.dirname(path), n.Path), n.Net)
+    finally:
+        io._link_subnets(net)
+    io.write(path, net)
+
+IOStack = 512 * 2**20
+IORecursion = 10**6
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return time.perf_counter() - start, result
+
+def _timed_deep(function, *args):
+    """ _timed on a thread with room for deep recursion, see IOStack """
+    result = []
+    def target():
+        try:
+            result.append(_timed(function, *args))
+        except BaseException as e:
+            result.append(e)
+    stack = threading.stack_size(IOStack)
+    limit = sys.getrecursionlimit()
+    sys.setrecursionlimit(IORecursion)
+    try:
+        thread = threading.Thread(target=target)
+        thread.start()
+        thread.join()
+    finally:
+        sys.setrecursionlimit(limit)
+        threading.stack_size(stack)
+    if isinstance(result[0], BaseException):
+        raise result[0]
+    return result[0]
+
+def steps_per_sec(net, min_time=1.0):
+    """ update() rate, stepping for at least min_time seconds """
+    steps = 0
+    start = time.perf_counter()
+    elapsed = 0.0
+    while steps == 0 or elapsed < min_time:
+        net.update()
+        steps += 1
+        elapsed = time.perf_counter() - start
+    return steps / elapsed
+
+def bench(neurons, fan_in=4, gating_ratio=0.0, ic_share=0.0, subnet_depth=0, seed=0,
+          min_time=1.0, io_limit=3000, parse_limit=10**3):
+    """ benchmark one generated net, returns {'config': {...}, 'metrics': {...}}
+        metrics the limits skip, or that fail, are None with the reason in metrics['errors']
+    """
+    config = {'neurons': neurons, 'fan_in': fan_in, 'gating_ratio': gating_ratio,
+              'ic_share': ic_share, 'subnet_depth': subnet_depth, 'seed': seed}
+    generate(2, fan_in, gating_ratio, ic_share, subnet_depth, seed) # one off allocations stay out of the count
+    tracemalloc.start()
+    try:
+        net = generate(neurons, fan_in, gating_ratio, ic_share, subnet_depth, seed)
+        memory = tracemalloc.get_traced_memory()[0]
+    finally:
+        tracemalloc.stop()
+
+    arrays = net.to_arrays()
+    metrics = {'links': len(arrays['src']),
+               'memory_per_neuron': memory / float(max(len(arrays['names']), 1)),
+               'steps_per_sec': steps_per_sec(net, min_time),
+               'io_write_sec': None, 'io_read_sec': None, 'nervesim_parse_sec': None, 'errors': []}
+    with tempfile.TemporaryDirectory() as directory:
+        if neurons <= io_limit:
+            path = os.path.join(directory, 'bench.net')
+            try:
+                metrics['io_write_sec'] = _timed_deep(write_net, path, net)[0]
+                metrics['io_read_sec'] = _timed_deep(NeuralNetIO().read, path)[0]
+            except (RecursionError, MemoryError) as e:
+                metrics['errors'].append('NeuralNetIO: %s' % type(e).__name__)
+        if neurons <= parse_limit:
+            path = os.path.join(directory, 'bench.neu')
+            write_neu(arrays, path)
+            metrics['nervesim_parse_sec'] = _timed(_nervesim_reader(), path)[0]
+    return {'config': config, 'metrics': metrics}
+
+def run(sizes, output=None, **options):
+    """ bench every size with the same options, writes the results to output if given """
+    results = {'python': platform.python_version(), 'numpy': np.__version__,
+               'platform': platform.platform(), 'time': time.time(),
+               'runs': [bench(neurons, **options) for neurons in sizes]}
+    if output is not None:
+        with open(output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    return results
+
+# higher is better for these, lower for every other timed metric
+_RATES_ = ['steps_per_sec']
+_COMPARED_ = _RATES_ + ['memory_per_neuron', 'io_write_sec', 'io_read_sec', 'nervesim_parse_sec']
+
+def compare(baseline, results, tolerance=0.2):
+    """ list of (config, metric, baseline value, new value) for every metric that got worse than
+        baseline by more than tolerance (a fraction), runs are matched by config
+    """
+    before = dict((json.dumps(r['config'], sort_keys=True), r['metrics']) for r in baseline['runs'])
+    regressions = []
+    for r in results['runs']:
+        old = before.get(json.dumps(r['config'], sort_keys=True))
+        if old is None:
+            continue
+        for metric in _COMPARED_:
+            a, b = old.get(metric), r['metrics'].get(metric)
+            if a is None or b is None:
+                continue
+            worse = b < a * (1.0 - tolerance) if metric in _RATES_ else b > a * (1.0 + tolerance)
+            if worse:
+                regressions.append((r['config'], metric, a, b))
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10**2, 10**3, 10**4, 10**5, 10**6])
+    parser.add_argument('--fan-in', type=int, default=4)
+    parser.add_argument('--gating-ratio', type=float, default=0.0)
+    parser.add_argument('--ic-share', type=float, default=0.0)
+    parser.add_argument('--subnet-depth', type=int, default=0)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--min-time', type=float, default=1.0, help='seconds of stepping per size')
+    parser.add_argument('--io-limit', type=int, default=3000, help='largest net to time NeuralNetIO on')
+    parser.add_argument('--parse-limit', type=int, default=10**3, help='largest net to time NerveSimReader on')
+    parser.add_argument('--output', help='write the results here as JSON')
+    parser.add_argument('--baseline', help='JSON results to check for regressions against')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    args = parser.parse_args(argv)
+
+    results = run(args.sizes, args.output, fan_in=args.fan_in, gating_ratio=args.gating_ratio,
+                  ic_share=args.ic_share, subnet_depth=args.subnet_depth, seed=args.seed,
+                  min_time=args.min_time, io_limit=args.io_limit, parse_limit=args.parse_limit)
+    for r in results['runs']:
+        print(json.dumps(dict(r['config'], **r['metrics']), sort_keys=True))
+    if args.baseline is None:
+        return 0
+    with open(args.baseline) as f:
+        regressions = compare(json.load(f), results, args.tolerance)
+    for config, metric, a, b in regressions:
+        print('REGRESSION %s n=%d: %r -> %r' % (metric, config['neurons'], a, b))
+    return 1 if regressions else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,169 @@
+#!/usr/bin/env python
+"""
+    Specialized step functions
+
+    Generates straight line Python source that steps one particular net,
+    with its weights and parameters folded in as constants and the branches
+    on intrinsic current type, gate type and integrator resolved while
+    generating, then execs it into a step function:
+
+        step = specialize(net)
+        changed = step() # same as stepping every neuron, bit for bit
+
+    NeuralNet.set_specialized does this for update(), and regenerates the
+    function after every topology edit or invalidate(), of the net or of a
+    SubNet's inner net.  Because parameters
+    and weights are constants in the source, changing them directly on a
+    neuron or link also needs net.invalidate().
+
+    Generating costs about as much as a hundred ordinary updates, so it pays
+    off for nets stepped far more often than they are edited.
+
+    Only plain Neuron objects are inlined - a net holding a Neuron subclass,
+    or neurons with an update divisor, can't be specialized.
+"""
+import math
+from neuron import Neuron
+from link import Link
+from flatten import FlatNet
+
+# avoid circular import problem by not using from xxx import xxx,
+# since this requires the module to have defined its classes already
+import subnet
+
+class SpecializeError(Exception):
+    pass
+
+ChunkSize = 256 # neurons per generated function, keeps each one a manageable size
+
+def _literal(x):
+    if isinstance(x, float) and not math.isfinite(x):
+        return "float('%r')" % x
+    return repr(x)
+
+def _link_terms(links, lines):
+    """ summands of a neuron's input current from its FlatNet links, in Neuron's
+        order; modulated links need a sign test and get a temporary assigned in lines first
+    """
+    terms = []
+    for source, target, gate, link in links:
+        activity = 'F[%d] * %s' % (source, _literal(link.Weight))
+        if gate is None:
+            terms.append(activity)
+        elif link.GateType == Link.GateType_Gate:
+            terms.append('%s * (%s + F[%d] * %s * 1e9)' % (activity, _literal(link.GateState), gate, _literal(link.GateWeight)))
+        else:
+            name = 'a%d' % len(terms)
+            lines.append('    g = F[%d] * %s' % (gate, _literal(link.GateWeight)))
+            lines.append('    %s = %s * (1 + g * 1e9) if g >= 0 else %s / (1 - g * 1e9)' % (name, activity, activity))
+            terms.append(name)
+    return terms
+
+def _update_source(flat, i, links, dt, integrator, lines):
+    n = flat.Neurons[i]
+    lines.append('    n = N[%d] # %s' % (i, flat.Names[i]))
+    terms = _link_terms(links, lines)
+    if n.IntrinsicCurrent == Neuron.ICType_None:
+        lines.append('    n._current = c = ' + ' + '.join(['0.0'] + terms + ['n._sensory_current']))
+    else:
+        lines.append('    c = ' + ' + '.join(['0.0'] + terms))
+        lines.append('    t = n._lastChangeTimeIC + %s' % _literal(dt))
+        lines.append('    n._lastChangeTimeIC = t')
+        if n.IntrinsicCurrent == Neuron.ICType_VInf:
+            lines.append('    if not n._isHighIC:')
+            lines.append('        volts = n._current / %s' % _literal(n.MembraneConductance))
+            lines.append('        n._maxChangeTimeIC = %s - %s * volts if volts > %s else float(\'inf\')'
+                         % (_literal(n.LIC[1]), _literal(n.LIC[2]), _literal(n.LIC[0])))
+        threshold = _literal(n.ThresholdVoltage)
+        lines.append('    if (n._lastVoltage < %s and n._voltage >= %s) or (not n._isHighIC and t >= n._maxChangeTimeIC):'
+                     % (threshold, threshold))
+        lines.append('        n.set_IsHighIC(True)')
+        lines.append('    elif n._isHighIC and t >= n._maxChangeTimeIC:')
+        lines.append('        n.set_IsHighIC(False)')
+        lines.append('    c += %s' % _literal(n.LowIC))
+        lines.append('    if n._isHighIC:')
+        lines.append('        c += %s' % _literal(n.HighIC - n.LowIC))
+        lines.append('    n._current = c = c + n._sensory_current')
+
+    lines.append('    n._lastVoltage = v = n._voltage')
+    conductance, capacitance = n.MembraneConductance, n.MembraneCapacitance
+    if integrator == Neuron.Integrator_Exponential and conductance != 0:
+        lines.append('    vi = c / %s' % _literal(conductance))
+        lines.append('    v = vi + (v - vi) * %s' % _literal(math.exp(-dt * conductance / capacitance)))
+    else:
+        lines.append('    v += (c - v * %s) / %s * %s' % (_literal(conductance), _literal(capacitance), _literal(dt)))
+    lines.append('    n._voltage = v = 0.0 if -1e-30 < v < 1e-30 else v')
+
+    min_activity = n.MinFiringFrequency - n.Gain * n.ThresholdVoltage
+    lines.append('    n._nextFiringFrequency = 0.0 if v < %s else (%s * v + %s if v < %s else 1.0)'
+                 % (_literal(n.ThresholdVoltage), _literal(n.Gain), _literal(min_activity),
+                    _literal((1.0 - min_activity) / n.Gain)))
+
+def generate_source(flat, dt, integrator):
+    """ source of step(N, S) for the neurons of a FlatNet, which takes the flat
+        neuron list and [(SubNet, its neurons)] and returns the number of
+        neurons whose firing frequency changed.  Only updateState is generated,
+        changeState is the same for every neuron and stays a loop
+    """
+    lines = ['# %d neurons, %d links, dt %r, integrator %d' % (len(flat.Neurons), len(flat.Links), dt, integrator)]
+    incoming = [[] for n in flat.Neurons]
+    for entry in flat.Links:
+        incoming[entry[1]].append(entry)
+    chunks = range(0, len(flat.Neurons), ChunkSize)
+    for first in chunks:
+        last = min(first + ChunkSize, len(flat.Neurons))
+        lines.append('def update_%d(N, F):' % first)
+        for i in range(first, last):
+            _update_source(flat, i, incoming[i], dt, integrator, lines)
+
+    lines.append('def step(N, S):')
+    lines.append('    F = [n._firingFrequency for n in N]')
+    for first in chunks:
+        lines.append('    update_%d(N, F)' % first)
+    lines.append('    changed = 0')
+    lines.append('    for n, f in zip(N, F):')
+    lines.append('        x = n._nextFiringFrequency')
+    lines.append('        if x != f:')
+    lines.append('            n._firingFrequency = x')
+    lines.append('            n._stateChanged = True')
+    lines.append('            changed += 1')
+    lines.append('        else:')
+    lines.append('            n._stateChanged = False')
+    lines.append('    for s, neurons in S:')
+    lines.append('        s._stateChanged = any(n._stateChanged for n in neurons)')
+    lines.append('    return changed')
+    return '\n'.join(lines) + '\n'
+
+def specialize(net):
+    """ a step() function for net's current topology and parameters, see generate_source.
+        step.Source holds the generated source
+    """
+    try:
+        flat = FlatNet(net)
+    except FlatNet.FlattenError as e:
+        raise SpecializeError(str(e))
+    for n, name in zip(flat.Neurons, flat.Names):
+        if type(n) is not Neuron:
+            raise SpecializeError("'%s' is a %s, only Neuron can be specialized" % (name, type(n).__name__))
+    if any(divisor != 1 for divisor in net.get_update_divisors(flat)):
+        raise SpecializeError("neurons with an update divisor can't be specialized")
+    dt, integrator = net.get_timestep()
+    source = generate_source(flat, dt, integrator)
+    namespace = {}
+    exec(compile(source, '<specialized net>', 'exec'), namespace)
+    generated = namespace['step']
+
+    # SubNets, innermost first, keep their changed flag as SubNet.changeState would
+    subnets = []
+    def collect(neurons):
+        for n in neurons:
+            if isinstance(n, subnet.SubNet):
+                collect(n.Net.Neurons)
+                subnets.append((n, [leaf for leaf, path in zip(flat.Neurons, flat.Paths) if n in path]))
+    collect(net.Neurons)
+    neurons = flat.Neurons
+
+    def step():
+        return generated(neurons, subnets)
+    step.Source = source
+    return step
@@ -0,0 +1,522 @@
+#!/usr/bin/env python
+"""
+    CompiledNet class
+
+    Flattens a NeuralNet, SubNets included, into contiguous numpy arrays so
+    that a simulation step runs as a handful of array operations instead of a
+    walk over the Neuron / Link object graph.  The math is the leaky
+    integrator from Neuron.updateState / Neuron.changeState and produces the
+    same values, bit for bit.
+"""
+import math
+import random
+import numpy as np
+from neuron import Neuron
+from link import Link
+from flatten import FlatNet
+
+def _mix64(x):
+    """ splitmix64 finalizer - scrambles uint64 counters into well mixed random bits """
+    x = (x ^ (x >> np.uint64(30))) * np.uint64(0xbf58476d1ce4e5b9)
+    x = (x ^ (x >> np.uint64(27))) * np.uint64(0x94d049bb133111eb)
+    return x ^ (x >> np.uint64(31))
+
+class CSRMatrix(object):
+    """ compressed sparse row matrix, one row per target neuron
+
+        row_sum adds the entries of each row strictly in entry order, so a
+        product computed here equals the sum a Neuron builds link by link
+    """
+    def __init__(self, indptr, indices, data, shape):
+        self.indptr = np.array(indptr, dtype=np.intp)
+        self.indices = np.array(indices, dtype=np.intp)
+        self.data = np.array(data, dtype=np.float64)
+        self.shape = shape
+
+        # floating point addition is not associative, so rather than a reduction
+        # rows are summed slot by slot: slot k adds the k-th entry of every row
+        # that has one
+        row_length = np.diff(self.indptr)
+        self._slots = []
+        for k in range(int(row_length.max()) if len(row_length) else 0):
+            rows = np.nonzero(row_length > k)[0]
+            self._slots.append((rows, self.indptr[rows] + k))
+
+    def gather(self, x, entries=None):
+        """ per entry products data * x[column], optionally for a subset of entries """
+        if entries is None:
+            return x[..., self.indices] * self.data
+        return x[..., self.indices[entries]] * self.data[entries]
+
+    def row_sum(self, values):
+        """ sum per entry values into their rows """
+        rows = np.zeros(values.shape[:-1] + (self.shape[0],), dtype=np.float64)
+        for row, entries in self._slots:
+            rows[..., row] += values[..., entries]
+        return rows
+
+    def dot(self, x):
+        return self.row_sum(self.gather(x))
+
+class CompiledNet(object):
+    # per neuron parameters, copied from the Neuron objects at compile time
+    Parameters = ['MembraneConductance', 'MembraneCapacitance', 'ThresholdVoltage', 'MinFiringFrequency', 'Gain', 'LowIC', 'HighIC']
+    # per neuron runtime state, copied to / from the Neuron objects by read_state / write_state
+    State = ['_current', '_voltage', '_firingFrequency', '_lastVoltage', '_nextFiringFrequency',
+             '_lastChangeTimeIC', '_maxChangeTimeIC', '_sensory_current',
+             '_inputCurrent', '_inputSensory', '_inputSteps']
+    FlagState = ['_stateChanged', '_isHighIC']
+
+    GateType_None = -1 # GateType mask value for links without a GateSource
+
+    class CompileError(Exception):
+        pass
+
+    def __init__(self, net, batch=None, store=None):
+        self.Net = net
+        self.Batch = batch # number of instances stepped together, None for a single instance
+        self.Store = store # NeuronStore whose arrays are stepped in place, None to step private copies
+        try:
+            self.Flat = FlatNet(net)
+        except FlatNet.FlattenError as e:
+            raise CompiledNet.CompileError(str(e))
+        self.Neurons = self.Flat.Neurons
+        self.__index = dict((n, i) for i, n in enumerate(self.Neurons))
+        self.Names = self.Flat.Names # qualified by subnet path
+        self.__names = dict((name, i) for i, name in enumerate(self.Names))
+        self.TimeStep, self.Integrator = net.get_timestep() # see NeuralNet.set_timestep
+        self._decayFor = None # (dt, conductance, capacitance) the cached _decay was computed for
+        self.Step = 0 # index of the next update, slow neurons update when Step + 1 is a multiple of their divisor
+
+        if store is not None:
+            self._use_store(store)
+            return
+
+        # parameters are shared by all instances, state is shaped (batch, neurons)
+        count = len(self.Neurons)
+        shape = (count,) if batch is None else (batch, count)
+        for name in CompiledNet.Parameters:
+            setattr(self, name, np.array([getattr(n, name) for n in self.Neurons], dtype=np.float64))
+        for name in CompiledNet.State:
+            setattr(self, name, np.zeros(shape, dtype=np.float64))
+        for name in CompiledNet.FlagState:
+            setattr(self, name, np.zeros(shape, dtype=bool))
+
+        self.IntrinsicCurrent = np.array([n.IntrinsicCurrent for n in self.Neurons], dtype=np.int8)
+        self.LIC = np.array([n.LIC for n in self.Neurons], dtype=np.float64).reshape(count, 3)
+        self.HIC = np.array([n.HIC for n in self.Neurons], dtype=np.float64).reshape(count, 2)
+
+        self._compile_intrinsic()
+        self._compile_links()
+        self._compile_rates()
+        self.read_state()
+
+    def _use_store(self, store):
+        # share the store's arrays rather than copying them - every update below
+        # writes its arrays in place, so the neuron views see each step as it happens
+        if self.Batch is not None:
+            raise CompiledNet.CompileError("a NeuronStore holds a single instance, it can't be batched")
+        if len(store.Neurons) != len(self.Neurons) or any(a is not b for a, b in zip(store.Neurons, self.Neurons)):
+            raise CompiledNet.CompileError("NeuronStore neurons don't match the flattened net")
+        for name in CompiledNet.Parameters + CompiledNet.State + CompiledNet.FlagState + ['IntrinsicCurrent', 'LIC', 'HIC']:
+            setattr(self, name, getattr(store, name))
+        self._compile_intrinsic()
+        self._compile_links()
+        self._compile_rates()
+
+    def __getstate__(self):
+        # a pickled CompiledNet travels without the object graph it was compiled
+        # from - read_state / write_state are unavailable on the unpickled copy
+        state = self.__dict__.copy()
+        state['Net'] = None
+        state['Flat'] = None
+        state['Neurons'] = None
+        state['Store'] = None # the arrays themselves are kept
+        state['_CompiledNet__index'] = {}
+        return state
+
+    def _compile_intrinsic(self):
+        # the intrinsic current state machine only runs over the neurons that have one
+        self._ic = np.nonzero(self.IntrinsicCurrent != Neuron.ICType_None)[0]
+        self._icVInf = self.IntrinsicCurrent[self._ic] == Neuron.ICType_VInf
+        self._icRandom = self.IntrinsicCurrent[self._ic] == Neuron.ICType_Random
+        # random stream per neuron (and instance), see set_seed
+        shape = self._ic.shape if self.Batch is None else (self.Batch,) + self._ic.shape
+        self._icStream = self._ic.astype(np.uint64) + np.zeros(shape, dtype=np.uint64)
+        if self.Batch is not None:
+            self._icStream += np.arange(self.Batch, dtype=np.uint64).reshape(self.Batch, 1) << np.uint64(32)
+        self._icDraws = np.zeros(shape, dtype=np.uint64)
+        self.Seed = None
+
+    def set_seed(self, seed):
+        """ choose where intrinsic current durations are drawn from
+            param: seed - None draws from the global random stream in net order,
+                exactly as Neuron does.  An integer gives every neuron, in every
+                instance, a stream of its own: a neuron's n-th draw depends only
+                on seed, its index and its instance, so runs repeat across
+                processes and batch instance 0 matches an unbatched run
+        """
+        self.Seed = seed
+        self._icDraws[...] = 0
+
+    def index_of(self, neuron):
+        """ index of a Neuron object, or of a path qualified neuron name, in the compiled arrays """
+        if isinstance(neuron, Neuron):
+            return self.__index[neuron]
+        return self.__names[neuron]
+
+    def _compile_links(self):
+        # row i of the weight matrix holds the Incoming links of neuron i, in the
+        # order the Neuron sums them.  The gate matrix shares that layout entry
+        # for entry: column is the gate source, data the gate weight
+        indptr = [0]
+        sources = []
+        weights = []
+        gate_sources = []
+        gate_weights = []
+        gate_states = []
+        gate_types = []
+        fan_in = [0] * len(self.Neurons)
+        for source, target, gate, link in self.Flat.Links:
+            fan_in[target] += 1
+            sources.append(source)
+            weights.append(link.Weight)
+            if gate is None:
+                gate_sources.append(0)
+                gate_weights.append(0.0)
+                gate_states.append(0)
+                gate_types.append(CompiledNet.GateType_None)
+                continue
+            gate_sources.append(gate)
+            gate_weights.append(link.GateWeight)
+            gate_states.append(link.GateState)
+            gate_types.append(Link.GateType_Gate if link.GateType == Link.GateType_Gate else Link.GateType_Modulation)
+        for count in fan_in:
+            indptr.append(indptr[-1] + count)
+
+        count = len(self.Neurons)
+        self.Weights = CSRMatrix(indptr, sources, weights, (count, count))
+        self.Gates = CSRMatrix(indptr, gate_sources, gate_weights, (count, count))
+        self.GateType = np.array(gate_types, dtype=np.int8)
+        self.GateState = np.array(gate_states, dtype=np.float64)
+
+        # the gate terms are only evaluated for links that actually have a gate
+        self._gated = np.nonzero(self.GateType != CompiledNet.GateType_None)[0]
+        self._gateIsGate = self.GateType[self._gated] == Link.GateType_Gate
+
+    def _compile_rates(self):
+        # update divisors, see NeuralNet.set_update_divisor.  A slow neuron's link
+        # entries split into boundary ones, from neurons of another divisor, which
+        # are accumulated every step, and the rest, which are summed when it updates
+        self.Divisor = np.array(self.Net.get_update_divisors(self.Flat), dtype=np.int64)
+        self._slow = np.nonzero(self.Divisor > 1)[0]
+        if not len(self._slow):
+            self._slow = None
+            return
+        boundary = []
+        for source, target, gate, link in self.Flat.Links:
+            k = self.Divisor[target]
+            boundary.append(k > 1 and (self.Divisor[source] != k or (gate is not None and self.Divisor[gate] != k)))
+        self._boundary = np.array(boundary, dtype=bool)
+        self._fast = self.Divisor == 1
+
+    def subset(self, rows, halo=()):
+        """ a CompiledNet stepping only rows (flat indices), for one partition of a
+            net stepped across processes.  Its neurons are rows followed by halo, the
+            neurons outside rows that feed them: the caller writes the halo's firing
+            frequencies before each update, and the halo is not stepped meaningfully.
+            Link sums keep their order and intrinsic current streams keep their
+            global index, so seeded results match the whole net bit for bit
+        """
+        rows = np.asarray(rows, dtype=np.intp)
+        local = np.concatenate([rows, np.asarray(halo, dtype=np.intp)])
+        position = dict((i, p) for p, i in enumerate(local.tolist()))
+        part = CompiledNet.__new__(CompiledNet)
+        part.Net = part.Flat = part.Neurons = part.Store = part.Batch = None
+        part.Names = [self.Names[i] for i in local.tolist()]
+        part._CompiledNet__names = dict((name, i) for i, name in enumerate(part.Names))
+        part._CompiledNet__index = {}
+        part.TimeStep, part.Integrator, part.Step = self.TimeStep, self.Integrator, self.Step
+        part._decayFor = None
+        for name in CompiledNet.Parameters + CompiledNet.State + CompiledNet.FlagState + ['LIC', 'HIC']:
+            setattr(part, name, getattr(self, name)[local].copy())
+        part.IntrinsicCurrent = self.IntrinsicCurrent[local].copy()
+        part.IntrinsicCurrent[len(rows):] = Neuron.ICType_None
+
+        part._compile_intrinsic()
+        globals_ = local[part._ic]
+        part._icStream = globals_.astype(np.uint64)
+        part._icDraws = np.zeros(part._ic.shape, dtype=np.uint64)
+        draws = dict(zip(self._ic.tolist(), self._icDraws.tolist()))
+        part._icDraws[...] = [draws[i] for i in globals_.tolist()]
+        part.Seed = self.Seed
+
+        # owned rows keep their entries in order, with columns renumbered; halo rows have none
+        entries = np.concatenate([np.arange(self.Weights.indptr[r], self.Weights.indptr[r + 1]) for r in rows.tolist()] +
+                                 [np.zeros(0, dtype=np.intp)]).astype(np.intp)
+        fan_in = np.zeros(len(local), dtype=np.intp)
+        fan_in[:len(rows)] = np.diff(self.Weights.indptr)[rows]
+        indptr = np.concatenate([[0], np.cumsum(fan_in)])
+        gated = self.GateType[entries] != CompiledNet.GateType_None
+        sources = [position[i] for i in self.Weights.indices[entries].tolist()]
+        gates = [position[i] if g else 0 for i, g in zip(self.Gates.indices[entries].tolist(), gated.tolist())]
+        count = len(local)
+        part.Weights = CSRMatrix(indptr, sources, self.Weights.data[entries], (count, count))
+        part.Gates = CSRMatrix(indptr, gates, self.Gates.data[entries], (count, count))
+        part.GateType = self.GateType[entries]
+        part.GateState = self.GateState[entries]
+        part._gated = np.nonzero(gated)[0]
+        part._gateIsGate = part.GateType[part._gated] == Link.GateType_Gate
+
+        part.Divisor = self.Divisor[local]
+        part._slow = np.nonzero(part.Divisor > 1)[0]
+        if not len(part._slow):
+            part._slow = None
+        else:
+            part._boundary = self._boundary[entries]
+            part._fast = part.Divisor == 1
+        return part
+
+    def read_state(self):
+        """ copy runtime state from the Neuron objects into the arrays, every instance gets the same copy """
+        if self.Store is not None:
+            return # the neurons are views on the arrays already
+        for name in CompiledNet.State + CompiledNet.FlagState:
+            getattr(self, name)[...] = [getattr(n, name) for n in self.Neurons]
+
+    def write_state(self, instance=0):
+        """ copy runtime state from the arrays back onto the Neuron objects
+            param: instance to copy when batched
+        """
+        if self.Store is not None:
+            return
+        for name in CompiledNet.State + CompiledNet.FlagState:
+            values = getattr(self, name)
+            if self.Batch is not None:
+                values = values[instance]
+            for n, value in zip(self.Neurons, values.tolist()):
+                setattr(n, name, value)
+
+    def get_activity(self):
+        """ firing frequencies, shaped (batch, neurons) when batched """
+        return self._firingFrequency
+
+    def _incoming_current(self):
+        return self.Weights.row_sum(self._link_activity())
+
+    def _link_activity(self):
+        """ per link entry current, gates applied """
+        activity = self.Weights.gather(self._firingFrequency)
+        if len(self._gated):
+            gated_activity = self.Gates.gather(self._firingFrequency, self._gated) * 1e9
+            linked = activity[..., self._gated]
+            with np.errstate(divide='ignore', invalid='ignore'): # both branches are evaluated, only one is kept
+                linked = np.where(self._gateIsGate, linked * (self.GateState[self._gated] + gated_activity),
+                         np.where(gated_activity >= 0, linked * (1 + gated_activity), linked / (1 - gated_activity)))
+            activity[..., self._gated] = linked
+        return activity
+
+    def _random_spans(self, draw, span, pos=None):
+        """ random.randint(0, span) for every entry of the draw mask
+            param: pos - positions in _ic the mask covers, None for all of them
+        """
+        if self.Seed is None:
+            # one global draw per event, in the order Neuron.updateState makes them
+            # (instance by instance, then net order)
+            return np.array([random.randint(0, s) for s in span[draw].tolist()], dtype=np.float64)
+        stream, draws = self._icStream, self._icDraws
+        if pos is not None:
+            stream, draws = stream[..., pos], draws[..., pos]
+        draws[draw] += np.uint64(1)
+        if pos is not None:
+            self._icDraws[..., pos] = draws
+        bits = _mix64(_mix64(stream[draw] + np.uint64(self.Seed & 0xffffffffffffffff)) ^ draws[draw])
+        return np.floor((bits >> np.uint64(11)) * 2.0 ** -53 * (np.maximum(span[draw], 0) + 1))
+
+    def _intrinsic_current(self, current, dt, active=None):
+        # Neuron's intrinsic current branches evaluated as masks over every
+        # neuron (and instance) that has one, or only the active ones among them
+        ic, pos = self._ic, None
+        vinf, rand = self._icVInf, self._icRandom
+        if active is not None:
+            pos = np.nonzero(active[ic])[0]
+            ic, vinf, rand = ic[pos], vinf[pos], rand[pos]
+        if not len(ic):
+            return
+        lic, hic = self.LIC[ic], self.HIC[ic]
+        last = self._lastChangeTimeIC[..., ic] + (dt if np.ndim(dt) == 0 else dt[..., ic])
+        high = self._isHighIC[..., ic]
+        max_time = self._maxChangeTimeIC[..., ic]
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            volts = self._current[..., ic] / self.MembraneConductance[ic]
+        max_time = np.where(~high & vinf, np.where(volts > lic[:, 0], lic[:, 1] - lic[:, 2] * volts, np.inf), max_time)
+
+        threshold = self.ThresholdVoltage[ic]
+        expired = last >= max_time
+        turn_on = ((self._lastVoltage[..., ic] < threshold) & (self._voltage[..., ic] >= threshold)) | (~high & expired)
+        turn_off = ~turn_on & high & expired
+
+        # set_IsHighIC - switching on starts a VInf neuron's fixed high time or
+        # draws a random one, switching off draws a random neuron's low time
+        max_time = np.where(turn_on & vinf, hic[:, 0], max_time)
+        draw = (turn_on & ~vinf) | (turn_off & rand)
+        if draw.any():
+            low = np.where(turn_on, hic[:, 0], lic[:, 0])
+            span = (1000.0 * (np.where(turn_on, hic[:, 1], lic[:, 1]) - low)).astype(np.int64)
+            max_time[draw] = (self._random_spans(draw, span, pos) + 1000.0 * low[draw]) / 1000.0
+        switched = turn_on | turn_off
+        last[switched] = 0
+        high = np.where(switched, turn_on, high)
+
+        self._lastChangeTimeIC[..., ic] = last
+        self._maxChangeTimeIC[..., ic] = max_time
+        self._isHighIC[..., ic] = high
+        current[..., ic] += self.LowIC[ic]
+        current[..., ic] += np.where(high, self.HighIC[ic] - self.LowIC[ic], 0.0)
+
+    def updateState(self):
+        if self._slow is not None:
+            return self._update_multirate()
+        current = self._incoming_current()
+        self._intrinsic_current(current, self.TimeStep)
+        current += self._sensory_current
+        self._current[...] = current
+
+        # calculate new voltage
+        self._lastVoltage[...] = self._voltage
+        if self.Integrator == Neuron.Integrator_Exponential:
+            conductance = self.MembraneConductance
+            with np.errstate(divide='ignore', invalid='ignore'): # the Euler step stands in where conductance is 0
+                v_inf = current / conductance
+                euler = self._voltage + (current - self._voltage * conductance) / self.MembraneCapacitance * self.TimeStep
+                self._voltage[...] = np.where(conductance != 0, v_inf + (self._voltage - v_inf) * self._decay(), euler)
+        else:
+            current = (current - self._voltage * self.MembraneConductance) / self.MembraneCapacitance
+            self._voltage += current * self.TimeStep
+        self._voltage[np.abs(self._voltage) < 1e-30] = 0.0  # floor to epsilon instead of overflow
+
+        # calculate new firing frequency
+        self._nextFiringFrequency[...] = self._firing_frequency(self._voltage)
+
+    def _firing_frequency(self, voltage):
+        min_activity = self.MinFiringFrequency - self.Gain * self.ThresholdVoltage
+        return np.where(voltage < self.ThresholdVoltage, 0.0,
+            np.where(voltage < (1.0 - min_activity) / self.Gain, self.Gain * voltage + min_activity, 1.0))
+
+    def _update_multirate(self):
+        # NeuralNet's multi-rate update: slow neurons accumulate their boundary and
+        # sensory current every step, and only the due ones (active) integrate
+        activity = self._link_activity()
+        slow = self._slow
+        self._inputCurrent[..., slow] += self.Weights.row_sum(np.where(self._boundary, activity, 0.0))[..., slow]
+        self._inputSensory[..., slow] += self._sensory_current[..., slow]
+        self._inputSteps[..., slow] += 1
+        due = slow[(self.Step + 1) % self.Divisor[slow] == 0]
+        active = self._fast.copy()
+        active[due] = True
+
+        current = self.Weights.row_sum(np.where(self._boundary, 0.0, activity))
+        sensory = self._sensory_current.copy()
+        steps = np.ones(current.shape, dtype=np.float64)
+        if len(due):
+            steps[..., due] = self._inputSteps[..., due]
+            current[..., due] = self._inputCurrent[..., due] / steps[..., due] + current[..., due]
+            sensory[..., due] = self._inputSensory[..., due] / steps[..., due]
+            self._inputCurrent[..., due] = 0.0
+            self._inputSensory[..., due] = 0.0
+            self._inputSteps[..., due] = 0.0
+        dt = self.TimeStep * steps
+
+        self._intrinsic_current(current, dt, active)
+        current += sensory
+        voltage = self._voltage
+        conductance = self.MembraneConductance
+        if self.Integrator == Neuron.Integrator_Exponential:
+            decay = np.broadcast_to(self._decay(), current.shape).copy()
+            exact = conductance != 0
+        else:
+            # due slow neurons are stepped exactly anyway, as by NeuralNet
+            decay = np.ones(current.shape, dtype=np.float64)
+            exact = np.zeros(conductance.shape, dtype=bool)
+            exact[due] = conductance[due] != 0
+        if len(due):
+            exponent = -dt[..., due] * conductance[due] / self.MembraneCapacitance[due]
+            decay[..., due] = np.array([math.exp(x) for x in exponent.ravel().tolist()]).reshape(exponent.shape)
+        with np.errstate(divide='ignore', invalid='ignore'):
+            v_inf = current / conductance
+            euler = voltage + (current - voltage * conductance) / self.MembraneCapacitance * dt
+            voltage = np.where(exact, v_inf + (voltage - v_inf) * decay, euler)
+        voltage[np.abs(voltage) < 1e-30] = 0.0
+
+        # neurons that aren't due keep their state
+        self._current[...] = np.where(active, current, self._current)
+        self._lastVoltage[...] = np.where(active, self._voltage, self._lastVoltage)
+        self._voltage[...] = np.where(active, voltage, self._voltage)
+        self._nextFiringFrequency[...] = np.where(active, self._firing_frequency(voltage), self._nextFiringFrequency)
+
+    def _decay(self):
+        # exp(-dt G / C) per neuron, recomputed only when dt or a parameter changes.  math.exp
+        # rather than np.exp, which may round differently, keeps the values equal to Neuron's
+        key = self._decayFor
+        if key is None or key[0] != self.TimeStep or not np.array_equal(key[1], self.MembraneConductance) \
+                or not np.array_equal(key[2], self.MembraneCapacitance):
+            exponent = -self.TimeStep * self.MembraneConductance / self.MembraneCapacitance
+            self.__decay = np.array([math.exp(x) for x in exponent.tolist()], dtype=np.float64)
+            self._decayFor = (self.TimeStep, self.MembraneConductance.copy(), self.MembraneCapacitance.copy())
+        return self.__decay
+
+    def changeState(self):
+        np.not_equal(self._nextFiringFrequency, self._firingFrequency, out=self._stateChanged)
+        self._firingFrequency[...] = self._nextFiringFrequency
+        return bool(self._stateChanged.any())
+
+    def update(self):
+        """ advance the compiled net one step, returns True if any firing frequency changed """
+        self.updateState()
+        self.Step += 1
+        return self.changeState()
+
+    def _indices(self, neurons):
+        if neurons is None:
+            return np.arange(len(self.Names))
+        return np.array([n if isinstance(n, (int, np.integer)) else self.index_of(n) for n in neurons], dtype=np.intp)
+
+    def run(self, steps, record=None, sensors=None, sense=None, monitor=None):
+        """ advance steps updates in one call
+            param: record - neurons (Neuron objects, qualified names or indices) whose firing
+                frequency is traced, None for all
+            param: sensors - sensory currents for the sense neurons: an array shaped
+                (steps, sensed) or (sensed,) for a constant input, or a callable
+                sensors(step, activity) returning one such row (None leaves the currents as they are)
+            param: sense - neurons the sensor columns feed, None for all
+            param: monitor - optional callable monitor(step, compiled) called after every step
+            returns (trace, changed) - trace holds the recorded firing frequencies after each
+                step, shaped (steps, [batch,] recorded); changed is True if any frequency changed
+        """
+        record = self._indices(record)
+        sense = self._indices(sense)
+        trace = np.empty((steps,) + self._firingFrequency.shape[:-1] + (len(record),), dtype=np.float64)
+        if sensors is not None and not callable(sensors):
+            sensors = np.asarray(sensors, dtype=np.float64)
+            if sensors.ndim == 1:
+                self._sensory_current[..., sense] = sensors
+                sensors = None
+            elif len(sensors) != steps:
+                raise ValueError("sensors has %d rows for %d steps" % (len(sensors), steps))
+
+        changed = False
+        for step in range(steps):
+            if callable(sensors):
+                row = sensors(step, self._firingFrequency)
+                if row is not None:
+                    self._sensory_current[..., sense] = row
+            elif sensors is not None:
+                self._sensory_current[..., sense] = sensors[step]
+            self.updateState()
+            self.Step += 1
+            changed = self.changeState() or changed
+            trace[step] = self._firingFrequency[..., record]
+            if monitor is not None:
+                monitor(step, self)
+        return trace, changed
@@ -0,0 +1,69 @@
+#!/usr/bin/env python
+"""
+    FlatNet class
+
+    Expands every SubNet level of a NeuralNet into one flat table of neurons
+    and links, so an engine can step the whole hierarchy as a single graph.
+
+    Neurons appear in the order NeuralNet.update visits them, with each SubNet
+    replaced in place by its own (recursively flattened) neurons.  Names are
+    qualified by the SubNet path, e.g. 'legs/L1/FOOT', top level names are
+    unchanged.
+"""
+# avoid circular import problem by not using from xxx import xxx,
+# since this requires the module to have defined its classes already
+import subnet
+
+class FlatNet(object):
+    Separator = '/'
+
+    class FlattenError(Exception):
+        pass
+
+    def __init__(self, net):
+        self.Net = net
+        self.Neurons = []   # leaf neurons, flat index order
+        self.Names = []     # path qualified names, parallel to Neurons
+        self.Paths = []     # tuple of enclosing SubNets (outermost first), parallel to Neurons
+        self.Links = []     # (source index, target index, gate source index or None, link)
+        self.__index = {}
+
+        self._expand(net, (), '')
+        self._collect_links()
+
+    def _expand(self, net, path, prefix):
+        for n in net.Neurons:
+            if isinstance(n, subnet.SubNet):
+                self._expand(n.Net, path + (n,), prefix + n.Name + FlatNet.Separator)
+                continue
+            self.__index[n] = len(self.Neurons)
+            self.Neurons.append(n)
+            self.Names.append(prefix + n.Name)
+            self.Paths.append(path)
+
+    def _collect_links(self):
+        # each neuron's Incoming list is what it actually sums - boundary links
+        # into a subnet appear on its input neuron, and links out of a subnet
+        # have already been rewired to leave from its output neuron
+        for target, n in enumerate(self.Neurons):
+            for link in n.Incoming:
+                if isinstance(link.Source, subnet.SubNet):
+                    # a nested subnet with no output of its own stays the source, and
+                    # a SubNet never fires - the link only ever adds zero current
+                    continue
+                if link.Source not in self.__index:
+                    raise FlatNet.FlattenError("link into '%s' has no neuron as its source" % self.Names[target])
+                gate = None
+                if link.GateSource is not None:
+                    if link.GateSource not in self.__index:
+                        raise FlatNet.FlattenError("link into '%s' has no neuron as its gate" % self.Names[target])
+                    gate = self.__index[link.GateSource]
+                self.Links.append((self.__index[link.Source], target, gate, link))
+
+    def index_of(self, neuron):
+        """ flat index of a leaf Neuron object """
+        return self.__index[neuron]
+
+    def lookup(self, index):
+        """ (enclosing SubNets, Neuron) for a flat index, for UI lookups """
+        return self.Paths[index], self.Neurons[index]
@@ -165,6 +165,7 @@ class NeuralEditPanel(wx.Panel, DragMonitor):
         neuron = self.Net.lookup_neuron(element)
         neuron._firingFrequency = 1.0 if neuron._firingFrequency == 0.0 else 0.0
         neuron._nextFiringFrequency = neuron._firingFrequency
+        self.Net.Net.wake(neuron)
         if element != self.__SelectedElement:
             self.FireSelectionChangedEvent(element)
         else:
@@ -230,8 +231,9 @@ class NeuralEditPanel(wx.Panel, DragMonitor):
         # draw links first so they're obscured by elements
         for e in self.Net.Elements: 
             self.draw_links(gc, e)
+        snapshot = self.Net.Net.get_snapshot() # one consistent frame while the sim thread runs
         for e in self.Net.Elements:
-            self.draw_neuron(gc, e)
+            self.draw_neuron(gc, e, snapshot)
         self.draw_drag_link(gc)
 
     def draw_links(self, dc, element):
@@ -255,7 +257,7 @@ class NeuralEditPanel(wx.Panel, DragMonitor):
             (end_w, end_h) = self.logical_to_device(target.Size)
             dc.StrokeLine( start_x + start_w, start_y + start_h / 2, end_x, end_y + end_h / 2);
         
-    def draw_neuron(self, dc, element):
+    def draw_neuron(self, dc, element, snapshot):
         dc.SetBrush(self.__WhiteBrush)
         if self.__SelectedElement == element:
             dc.SetPen( self.__SelectedElementPen)
@@ -282,7 +284,8 @@ class NeuralEditPanel(wx.Panel, DragMonitor):
         dc.DrawText(neuron.Name, x + w / 2.0 - tw / 2.0, y + h + th / 8.0)
         
         #draw activation as percent fill
-        (fill_w, fill_h) = self.logical_to_device((min(element.Size[0], neuron._firingFrequency * element.Size[0]), min(element.Size[1], neuron._firingFrequency * element.Size[1])))
+        activity = snapshot.get(neuron.Name)
+        (fill_w, fill_h) = self.logical_to_device((min(element.Size[0], activity * element.Size[0]), min(element.Size[1], activity * element.Size[1])))
         dc.SetBrush(self.__ActivationBrush)
         if not has_incoming: #input neuron
             dc.DrawEllipse(x + w / 2.0 - fill_w / 2.0, y + h / 2.0 - fill_h / 2.0, fill_w, fill_h)
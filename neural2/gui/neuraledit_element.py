@@ -68,7 +68,7 @@ class NeuralEditNeuralNet(PickleToXML):
 
     def add_named_element(self, position, name):
         neuron = self.Net.add_neuron()
-        neuron.Name = name
+        name = self.Net.rename_neuron(neuron, name)
         element = NeuralEditElement(name, position)
         self.Elements.append(element)
         self.LookupTable[name] = (neuron, element)
@@ -97,9 +97,7 @@ class NeuralEditNeuralNet(PickleToXML):
     def rename_element(self, element, name):
         (neuron, element) = self.LookupTable[element.Name]
         self.LookupTable.pop(element.Name)
-        neuron.Name = ""  # temp to let get_unique_name reuse our name
-        name = self.Net.get_unique_name(name)
-        neuron.Name = name
+        name = self.Net.rename_neuron(neuron, name)
         element.Name = name
         self.LookupTable[neuron.Name] = (neuron, element)
         return name  # in case the selected name is different from what was passed in
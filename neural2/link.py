@@ -3,6 +3,8 @@
 from pickletoxml import PickleToXML
 
 class Link(PickleToXML):
+    __pickle_to_xml__ = ['GateSource', 'GateState', 'GateType', 'GateWeight', 'Source', 'Target', 'Weight']
+    __slots__ = __pickle_to_xml__ + ['__pickle_reference_id__']
     GateType_Gate = 0
     GateType_Modulation = 1
     
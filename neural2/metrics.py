@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+    RuntimeMetrics class
+
+    Counters and gauges NeuralNet keeps while it runs, for monitoring a live
+    simulation:
+
+        stats = net.get_stats()
+        if stats['rate'] < 0.9 * stats['target_rate']: alert(...)
+
+    Counters (steps, callbacks, sensor_writes, changed) only ever grow.  The
+    gauges (rate, changed_per_step) are taken over the last window updates, so
+    they follow the simulation's current state rather than its average since
+    start.
+"""
+import time
+from collections import deque
+
+class RuntimeMetrics(object):
+    def __init__(self, window=100, clock=time.monotonic):
+        self.Steps = 0          # updates executed
+        self.Changed = 0        # neuron firing frequency changes, summed over every update
+        self.LastChanged = 0    # neurons whose firing frequency changed on the last update
+        self.Callbacks = 0      # state change callback invocations
+        self.SensorWrites = 0   # sensory currents set
+        self.__clock = clock
+        self.__samples = deque(maxlen=window) # (time, Steps, Changed) after each update
+
+    def step(self, changed, steps=1):
+        """ count steps updates that changed changed neurons between them """
+        self.Steps += steps
+        self.Changed += changed
+        self.LastChanged = changed
+        self.__samples.append((self.__clock(), self.Steps, self.Changed))
+
+    def rate(self):
+        """ achieved steps per second over the window, 0.0 until there are two samples """
+        if len(self.__samples) < 2:
+            return 0.0
+        t0, s0 = self.__samples[0][:2]
+        t1, s1 = self.__samples[-1][:2]
+        return (s1 - s0) / (t1 - t0) if t1 > t0 else 0.0
+
+    def changed_per_step(self):
+        """ mean neurons changed per update over the window """
+        if len(self.__samples) < 2:
+            return float(self.LastChanged)
+        s0, c0 = self.__samples[0][1:]
+        s1, c1 = self.__samples[-1][1:]
+        return (c1 - c0) / float(s1 - s0) if s1 > s0 else 0.0
+
+    def stats(self):
+        return {'steps': self.Steps,
+                'rate': self.rate(),
+                'changed': self.Changed,
+                'changed_last': self.LastChanged,
+                'changed_per_step': self.changed_per_step(),
+                'callbacks': self.Callbacks,
+                'sensor_writes': self.SensorWrites}
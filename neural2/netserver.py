@@ -36,6 +36,11 @@
 #       returns activation value of named neuron
 #   get_update_period:
 #       returns update period in seconds
+#   get_stats:
+#       returns dict of runtime counters and gauges: steps, rate, target_rate, overruns, skipped,
+#       changed, changed_last, changed_per_step, callbacks, sensor_writes, running
+#   get_profile:
+#       returns dict of update phase -> timing statistics in seconds, empty unless profiling
 #
 #  Setters
 #   set_weight
@@ -54,6 +59,9 @@
 #   set_update_period:
 #       param: update period in seconds non-zero starts update thread.  Zero value stops update thread
 #       returns False on lookup failure
+#   set_profiling:
+#       param: True to time each phase of every update, False to stop
+#       returns False on lookup failure
 #   update
 #       Iterates through a single network update
 #       returns False on lookup failure
@@ -150,6 +158,15 @@ class NetServerState:
             if n.Name == name: return n
         return None
 
+    def __set_parameter(self, name, parameter, value):
+        # returns False on lookup failure
+        if self.Net is None: return False
+        n = self.__lookup_neuron_by_name(name)
+        if n is None: return False
+        setattr(n, parameter, value)
+        self.Net.invalidate() # wakes every neuron and rebuilds steps that hold parameters as constants
+        return True
+
     def load_net(self, path):
         """load_net
            param: absolute or relative path to net file
@@ -220,7 +237,7 @@ class NetServerState:
         if self.Net is None: return 0.0
         n = self.__lookup_neuron_by_name(name)
         if n is None: return 0.0
-        return n.LowThreshold
+        return getattr(n, 'LowThreshold', 0.0)
 
     def get_high_threshold(self, name):
         """get_high_threshold:
@@ -230,7 +247,7 @@ class NetServerState:
         if self.Net is None: return 0.0
         n = self.__lookup_neuron_by_name(name)
         if n is None: return 0.0
-        return n.HighThreshold
+        return getattr(n, 'HighThreshold', 0.0)
 
     def get_activation(self, name):
         """get_activation:
@@ -238,9 +255,7 @@ class NetServerState:
             returns activation value of named neuron, 0.0 on lookup failure
         """
         if self.Net is None: return 0.0
-        n = self.__lookup_neuron_by_name(name)
-        if n is None: return 0.0
-        return n.Activation
+        return self.Net.get_snapshot().get(name) # consistent with the other neurons' values
 
     def get_update_period(self):
         """get_update_period:
@@ -249,6 +264,23 @@ class NetServerState:
         if self.Net is None: return 0.0
         return self.Net._NeuralNet__period
 
+    def get_stats(self):
+        """get_stats:
+            returns dict of runtime counters and gauges, steps, rate (achieved steps / sec),
+            target_rate, overruns, skipped, changed, changed_last, changed_per_step, callbacks,
+            sensor_writes and running; empty dict on lookup failure
+        """
+        if self.Net is None: return {}
+        return self.Net.get_stats()
+
+    def get_profile(self):
+        """get_profile:
+            returns dict of update phase -> dict of count, window, mean, min, max, p50, p90, p99
+            in seconds over the recent updates, empty dict when not profiling or on lookup failure
+        """
+        if self.Net is None: return {}
+        return self.Net.get_profile()
+
     def set_weight(self, name, link, weight):
         """set_weight
             param: neuron name
@@ -262,6 +294,7 @@ class NetServerState:
         if n is None: return False
         if link < 0 or link > len(n.Incoming)-1: return False
         n.Incoming[link].Weight = weight
+        self.Net.invalidate()
         return True
 
     def set_low_threshold(self, name, threshold):
@@ -270,11 +303,7 @@ class NetServerState:
             sets low firing threshold for the named neuron
             returns False on lookup failure
         """
-        if self.Net is None: return False
-        n = self.__lookup_neuron_by_name(name)
-        if n is None: return False
-        n.LowThreshold = threshold
-        return True
+        return self.__set_parameter(name, 'LowThreshold', threshold)
 
     def set_high_threshold(self, name, threshold):
         """set_high_threshold
@@ -282,11 +311,7 @@ class NetServerState:
             sets high_firing threshold for the named neuron
             returns False on lookup failure
         """
-        if self.Net is None: return False
-        n = self.__lookup_neuron_by_name(name)
-        if n is None: return False
-        n.HighThreshold = threshold
-        return True
+        return self.__set_parameter(name, 'HighThreshold', threshold)
 
     def set_activation(self, name, activation):
         """set_activation
@@ -297,7 +322,8 @@ class NetServerState:
         if self.Net is None: return False
         n = self.__lookup_neuron_by_name(name)
         if n is None: return False
-        n.Activation = activation
+        n._firingFrequency = n._nextFiringFrequency = activation
+        self.Net.wake(n)
         return True
 
     def set_update_period(self, period):
@@ -309,6 +335,15 @@ class NetServerState:
         self.Net.set_period(period)
         return True
 
+    def set_profiling(self, enabled):
+        """set_profiling:
+            param: True to time each phase of every update, False to stop
+            returns False on lookup failure
+        """
+        if self.Net is None: return False
+        self.Net.set_profiling(enabled)
+        return True
+
     def update(self):
         """update
             Iterates through a single network update
@@ -1,18 +1,34 @@
 #!/usr/bin/env python
 """NeuralNet class"""
-from threading import Thread
-from time import sleep
+import gc
+from contextlib import contextmanager
+from threading import Thread, Event
 from pickletoxml import PickleToXML
 from neuron import Neuron
 from link import Link
+from scheduler import RateScheduler
+from profiler import UpdateProfiler
+from metrics import RuntimeMetrics
+from snapshot import Snapshot
 
 # avoid circular import problem by not using from xxx import xxx, 
 # since this requires the module to have defined its classes already
 import subnet
 
+@contextmanager
+def _gc_paused():
+    # bulk builds allocate millions of objects that all stay alive, letting the
+    # cyclic collector rescan them over and over costs more than the build itself
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
 class NeuralNet(PickleToXML):
     __pickle_to_xml__ = ['Neurons']
-    __min_period = 0.1
     
     def __init__(self):
         self.Neurons = []
@@ -20,142 +36,1187 @@ class NeuralNet(PickleToXML):
         self.__running = False
         self.__stop = False
         self.__period = 0.0
+        self.__stop_event = Event()   # interrupts the update thread's waits
+        self.__scheduler = RateScheduler(self.__period)
         self.__state_change_callback = None
+        self.__profiler = None    # UpdateProfiler while profiling, see set_profiling
+        self.__metrics = RuntimeMetrics() # see get_stats
+        self.__dt = None          # seconds of simulated time per update, None for Neuron.TimeConstant
+        self.__integrator = Neuron.Integrator_Euler
+        self.__step_args = ()     # updateState arguments, none at the defaults so overrides without them still work
+        self.__divisors = {}      # neuron or SubNet -> update divisor other than 1, see set_update_divisor
+        self.__rates = None       # multi-rate update plan, empty when every divisor is 1, None to rebuild
+        self.__specialize = False # step through a generated function, see set_specialized
+        self.__specialized = None # that function, False if the net can't be specialized, None to regenerate
+        self.__generation = 0     # count of topology edits and invalidate() calls
+        self.__nested = None      # [(SubNet inner net at any depth, its generation)] at the last step, None to collect
+
+        # event driven update state, see set_event_driven
+        self.__event_driven = False
+        self.__step = 0           # index of the next update
+        self.__fanout = None      # neuron -> neurons whose input current it feeds, rebuilt on topology edits
+        self.__order = None       # neuron -> position in self.Neurons
+        self.__awake = set()      # neurons updated every step
+        self.__asleep = {}        # resting neuron -> index of the first update it skipped
+        self.__alarms = {}        # update index -> resting neurons whose intrinsic current timer expires then
+        self.__wakes = set()      # neurons woken from outside the update loop, while event driven
+
+        # array backed stepping, see attach_store
+        self.__store = None       # NeuronStore the neurons are views on, None when detached
+        self.__kernel = None      # CompiledNet stepping the store's arrays, rebuilt after invalidate
+
+        # activity trace, see attach_trace
+        self.__trace = None
+        self.__trace_neurons = []
+        self.__trace_index = (None, None) # (CompiledNet, its indices of the traced neurons)
+
+        # last published activity frame, see get_snapshot
+        self.__snapshot = Snapshot(0, (), (), {})
+        self.__snapshot_stale = True  # activity poked from outside an update
+        self.__snapshot_names = None  # names and index of the current topology, None after invalidate
+        self.__snapshot_rows = None   # where a store holds the top level neurons' activity, see __snapshot_activity
+        self.__snapshot_read = False  # steps only mark the snapshot stale until it is first read or the net runs
+
+        # topology index, kept up to date by the methods below and rebuilt after invalidate
+        self.__names = None       # name -> neuron, None when it needs rebuilding
+        self.__indexed = 0        # len(self.Neurons) when indexed, catches direct edits of the list
+        self.__renames = 0        # Neuron.Renames when indexed, catches direct renames
+        self.__serial = {}        # neuron -> increasing number, orders neurons as in self.Neurons
+        self.__next_serial = 0
+        self.__inputs = set()     # neurons without incoming links
+        self.__outputs = set()    # neurons without outgoing links
+        self.__holders = {}       # link -> neurons of this net whose link lists hold it
+        self.__suffixes = {}      # base name -> next numeric suffix get_unique_name tries, cleared when a name is freed
 
     def set_callback(self, callback):
         self.__state_change_callback = callback
 
     def lookup_neuron_by_name(self, name):
-        for n in self.Neurons:
-            if n.Name == name: return n
-        return None
+        return self.__current_names().get(name)
 
     def get_unique_name(self, name):
         if not name:
             name = "neuron"
         new_name = name
-        next_id = 2
+        next_id = self.__suffixes.get(name, 2) # numbered names below this are taken already
         while not new_name or self.lookup_neuron_by_name(new_name) is not None:
             new_name = '%s-%d' % (name, next_id)
             next_id += 1
+        self.__suffixes[name] = next_id
         return new_name
+
+    def rename_neuron(self, neuron, name):
+        """ give neuron a unique name based on name, returns the name it got """
+        names = self.__current_names()
+        if names.get(neuron.Name) is neuron:
+            del names[neuron.Name] # frees the current name for reuse
+            self.__suffixes.clear()
+        neuron.Name = self.get_unique_name(name)
+        names[neuron.Name] = neuron
+        self.__renames = Neuron.Renames # this rename is indexed already
+        self.__snapshot_names = None
+        return neuron.Name
        
     def add_neuron(self):
         n = Neuron(self.get_unique_name("neuron"))
-        self.Neurons.append(n)
+        self.__add_to_index(n)
+        self.__changed()
         return n
 
     def remove_neuron(self, neuron):
-        dead_links = []
-                
-        # remove all links to this neuron (target == self)
-        incoming = neuron.Incoming[:]
-        for link in incoming:
-            if neuron != link.Target:
-                neuron.remove_link(link)
-            link.Source.remove_link(link)
-            link.Target.remove_link(link)
-            dead_links.append(link)
-            
-        # remove all links from this neuron (source == self)
-        outgoing = neuron.Outgoing[:]
-        for link in outgoing:
-            if neuron != link.Source:
-                neuron.remove_link(link)
-            link.Source.remove_link(link)
-            link.Target.remove_link(link)
-            dead_links.append(link)
-
-        # in the case where we're removing a neuron that a subnet has an outgoing
-        # link to, we have to walk the entire net in order to find the link 
-        # out of the subnet to the neuron we've removed
-        for n in self.Neurons:
-            for link in dead_links:
-                if link in n.Outgoing:
-                    n.Outgoing.remove(link)
-                #if link in n.Incoming:
-                #    n.Incoming.remove(link)
+        self.__topology()
+        touched = set()
+
+        # remove all links to and from this neuron from every list they appear in.
+        # A link out of a subnet is held by the subnet as well as by the internal
+        # neuron it leaves from, the registry finds the subnet without a walk of
+        # the net and the subnet clears its internal lists itself
+        for link in neuron.Incoming + neuron.Outgoing:
+            touched.update(self.__unregister_link(link))
 
         # remove the neuron from the network
         self.Neurons.remove(neuron)
-        
+        self.__remove_from_index(neuron)
+        self.__divisors.pop(neuron, None)
+        touched.discard(neuron)
+        for n in touched:
+            self.__index_io(n)
+        self.__changed()
+
     def add_link(self, source, target, weight=1.0):
         # if we've already got a link between these two neurons, return it
         # otherwise add a new one
+        self.__topology()
         l = source.is_connected_outgoing(target)
         if l is not None:
-            return l        
+            return l
         l = Link(source, target, weight)
+        for n in (source, target):
+            self.__register_link(l, n)
+            self.__index_io(n)
+        self.__changed()
         return l
 
     def remove_link(self, link):
-        for n in self.Neurons:
-            n.remove_link(link)
+        self.__topology()
+        if link not in self.__holders:
+            self.__names = None # wired by hand without invalidate(), reindexing finds its holders
+            self.__topology()
+        for n in self.__unregister_link(link):
+            self.__index_io(n)
+        self.__changed()
 
     def get_input_neurons(self):
-        rval = []
-        for n in self.Neurons:
-            if len(n.Incoming) == 0:
-                rval.append(n)
-        return rval
+        self.__topology()
+        return sorted(self.__inputs, key=self.__serial.get)
 
     def get_output_neurons(self):
-        rval = []
-        for n in self.Neurons:
-            if len(n.Outgoing) == 0:
-                rval.append(n)
-        return rval
+        self.__topology()
+        return sorted(self.__outputs, key=self.__serial.get)
+
+    #####---- bulk construction ----#####
+    # per neuron values from_arrays / to_arrays carry, everything a Neuron saves except its name and links
+    ArrayParameters = [name for name in Neuron.__pickle_to_xml__ if name not in ('Name', 'Incoming', 'Outgoing', 'Gating')]
+    ArrayShapes = {'LIC': (3,), 'HIC': (2,)} # per neuron shape of the list valued parameters
+
+    @classmethod
+    def from_arrays(cls, names, params=None, src=(), dst=(), weights=None,
+                    gate_src=None, gate_weights=None, gate_types=None, gate_states=None):
+        """ build a net in one go from per neuron and per link arrays, validated in bulk
+            param: names - N unique neuron names
+            param: params - dict of ArrayParameters name -> N values (LIC (N,3), HIC (N,2)) or one value for all
+            param: src, dst - E link source and target indices; each neuron sums its
+                incoming links in the order they appear here
+            param: weights - E link weights, defaults to 1.0
+            param: gate_src - E gate source indices, -1 for an ungated link
+            param: gate_weights, gate_types, gate_states - E gate values, Link defaults when None
+            returns the new NeuralNet, to_arrays gives the same arrays back
+        """
+        import numpy as np # only needed for bulk construction
+        names = [str(name) for name in names]
+        count = len(names)
+        if len(set(names)) != count:
+            raise ValueError("neuron names must be unique")
+
+        def per_neuron(name, value, shape=()):
+            value = np.asarray(value)
+            if value.ndim == len(shape):
+                value = np.broadcast_to(value, (count,) + shape)
+            if value.shape != (count,) + shape:
+                raise ValueError("%s has shape %s, expected %s" % (name, value.shape, (count,) + shape))
+            return value.tolist()
+
+        src = np.asarray(src, dtype=np.int64).ravel()
+        dst = np.asarray(dst, dtype=np.int64).ravel()
+        edges = len(src)
+        def per_link(name, value, default, dtype):
+            if value is None:
+                return [default] * edges
+            value = np.asarray(value, dtype=dtype).ravel()
+            if len(value) != edges:
+                raise ValueError("%s has %d entries for %d links" % (name, len(value), edges))
+            return value.tolist()
+
+        if len(dst) != edges:
+            raise ValueError("src and dst must have the same length")
+        gates = per_link('gate_src', gate_src, -1, np.int64)
+        for name, indices, low in (('src', src, 0), ('dst', dst, 0), ('gate_src', np.asarray(gates), -1)):
+            if edges and (indices.min() < low or indices.max() >= count):
+                raise ValueError("%s index out of range" % name)
+        if edges and len(np.unique(src * count + dst)) != edges:
+            raise ValueError("duplicate links, add_link allows one link per source and target")
+
+        values = {}
+        for name, value in (params or {}).items():
+            if name not in cls.ArrayParameters:
+                raise ValueError("unknown neuron parameter '%s'" % name)
+            values[name] = per_neuron(name, value, cls.ArrayShapes.get(name, ()))
+        weights = per_link('weights', weights, 1.0, np.float64)
+        gate_weights = per_link('gate_weights', gate_weights, 1.0, np.float64)
+        gate_types = per_link('gate_types', gate_types, Link.GateType_Gate, np.int64)
+        gate_states = per_link('gate_states', gate_states, 0, np.float64)
+
+        # validated - build the objects directly, skipping add_link's per link checks
+        with _gc_paused():
+            net = cls()
+            net.Neurons = cls.__build(names, values, src.tolist(), dst.tolist(), weights, gates, gate_weights, gate_types, gate_states)
+        return net
+
+    @staticmethod
+    def __build(names, values, src, dst, weights, gates, gate_weights, gate_types, gate_states):
+        neurons = [Neuron(name) for name in names]
+        for name, column in values.items():
+            for n, value in zip(neurons, column):
+                setattr(n, name, value)
+        new_link = Link.__new__
+        for s, d, w, g, gw, gt, gs in zip(src, dst, weights, gates, gate_weights, gate_types, gate_states):
+            link = new_link(Link) # every field is set here, Link.__init__ would set them twice
+            link.Source = source = neurons[s]
+            link.Target = target = neurons[d]
+            link.Weight = w
+            link.GateWeight = gw
+            link.GateType = gt
+            link.GateState = gs
+            source.Outgoing.append(link)
+            target.Incoming.append(link)
+            if g >= 0:
+                link.GateSource = neurons[g]
+                neurons[g].Gating.append(link)
+            else:
+                link.GateSource = None
+        return neurons
+
+    def to_arrays(self):
+        """ the net as the arrays from_arrays takes, NeuralNet.from_arrays(**net.to_arrays())
+            copies it.  SubNets are flattened, their neurons named by path (see FlatNet)
+        """
+        import numpy as np
+        from flatten import FlatNet
+        with _gc_paused():
+            flat = FlatNet(self)
+            arrays = NeuralNet.__link_arrays(flat)
+        params = {}
+        for name in NeuralNet.ArrayParameters:
+            params[name] = np.array([getattr(n, name) for n in flat.Neurons]).reshape((len(flat.Neurons),) + NeuralNet.ArrayShapes.get(name, ()))
+        arrays['names'] = list(flat.Names)
+        arrays['params'] = params
+        return arrays
+
+    __link_columns = ('src', 'dst', 'gate_src', 'weights', 'gate_weights', 'gate_types', 'gate_states')
+
+    @staticmethod
+    def __link_arrays(flat):
+        """ the to_arrays link columns of a FlatNet """
+        import numpy as np
+        columns = list(zip(*[(s, t, -1 if g is None else g, l.Weight, l.GateWeight, l.GateType, l.GateState)
+                             for s, t, g, l in flat.Links])) or [()] * 7
+        return dict((key, np.array(column, dtype=dtype)) for key, column, dtype in zip(NeuralNet.__link_columns, columns,
+                    (np.int64, np.int64, np.int64, np.float64, np.float64, np.int64, np.float64)))
+
+    #####---- checkpoints ----#####
+    CheckpointFormat = 1
+
+    def checkpoint(self, path=None):
+        """ the net's parameters, every neuron's runtime state (the _ fields), the
+            step count, timestep and the random module's state as a compact binary
+            blob, for restore() to return to later - in memory for a quick
+            rollback, or on disk to resume after a restart without re-running
+            the warm-up transient.  Take it between updates, not while they run
+            param: path - file to write the blob to as well, replaced atomically
+            returns the blob as bytes
+        """
+        import io
+        import os
+        import random
+        import numpy as np
+        from neuronstore import NeuronStore
+        from flatten import FlatNet
+        for neuron in list(self.__asleep.keys()):
+            self.__wake_now(neuron) # bring skipped intrinsic current timers up to date
+        with _gc_paused():
+            flat = FlatNet(self)
+            data = NeuralNet.__link_arrays(flat)
+        version, state, gauss = random.getstate()
+        dt, integrator = self.__dt, self.__integrator
+        data.update({'format': np.array(NeuralNet.CheckpointFormat),
+                     'names': np.array(flat.Names, dtype=str),
+                     'step': np.array(self.__step),
+                     'timestep': np.array([np.nan if dt is None else dt, integrator]),
+                     'random_state': np.array(state, dtype=np.uint32),
+                     'random_other': np.array([version, np.nan if gauss is None else gauss])})
+        # parameters and state, straight from the store's arrays when it matches the topology
+        store = self.__store if self.__kernel is not None else None
+        for name, dtype, shape in NeuronStore.Fields:
+            if store is not None:
+                values = getattr(store, name)
+            else:
+                values = np.array([getattr(n, name) for n in flat.Neurons], dtype=dtype).reshape((len(flat.Neurons),) + shape)
+            data[NeuralNet.__checkpoint_key(name)] = values
+        buffer = io.BytesIO()
+        np.savez(buffer, **data)
+        blob = buffer.getvalue()
+        if path is not None:
+            with open(path + '.tmp', 'wb') as f:
+                f.write(blob)
+            os.replace(path + '.tmp', path)
+        return blob
+
+    @staticmethod
+    def __checkpoint_key(field):
+        return ('state.' if field.startswith('_') else 'params.') + field
+
+    def restore(self, checkpoint, parameters=True):
+        """ return to a checkpoint of this net, or of a copy of it with the same
+            neurons and links - parameters, runtime state, step count, timestep
+            and random state, so stepping on repeats what followed the checkpoint
+            bit for bit.  Raises ValueError, leaving the net as it was, for a
+            checkpoint of a different net or one that is damaged
+            param: checkpoint - bytes from checkpoint(), or the path it wrote
+            param: parameters - False to keep the net's own parameters, weights and
+                timestep, e.g. edited since, and restore only the runtime state
+        """
+        import io
+        import random
+        import zipfile
+        import numpy as np
+        from neuronstore import NeuronStore
+        from flatten import FlatNet
+        if not isinstance(checkpoint, (bytes, bytearray)):
+            with open(checkpoint, 'rb') as f:
+                checkpoint = f.read()
+        try:
+            with np.load(io.BytesIO(checkpoint), allow_pickle=False) as blob:
+                data = dict(blob.items())
+        except (OSError, EOFError, zipfile.BadZipFile) as e:
+            raise ValueError("not a readable checkpoint: %s" % e)
+        fields = [(NeuralNet.__checkpoint_key(name), shape) for name, dtype, shape in NeuronStore.Fields]
+        missing = [key for key in ['format', 'names', 'step', 'timestep', 'random_state', 'random_other']
+                   + list(NeuralNet.__link_columns) + [key for key, shape in fields] if key not in data]
+        if missing:
+            raise ValueError("checkpoint is missing %s" % ', '.join(missing))
+        if int(data['format']) != NeuralNet.CheckpointFormat:
+            raise ValueError("unsupported checkpoint format %d" % int(data['format']))
+        with _gc_paused():
+            flat = FlatNet(self)
+            links = NeuralNet.__link_arrays(flat)
+        if data['names'].tolist() != flat.Names or \
+                not all(np.array_equal(data[key], links[key]) for key in NeuralNet.__link_columns[:3]):
+            raise ValueError("checkpoint is of a different net")
+        count = len(flat.Neurons)
+        if any(data[key].shape != (count,) + shape for key, shape in fields) or \
+                any(data[key].shape != links[key].shape for key in NeuralNet.__link_columns[3:]) or \
+                data['random_state'].shape != (len(random.getstate()[1]),) or data['random_other'].shape != (2,):
+            raise ValueError("checkpoint is damaged")
+
+        store = self.__store if self.__kernel is not None else None
+        for name, dtype, shape in NeuronStore.Fields:
+            if not parameters and not name.startswith('_'):
+                continue
+            values = data[NeuralNet.__checkpoint_key(name)]
+            if store is not None:
+                getattr(store, name)[...] = values
+                continue
+            for n, value in zip(flat.Neurons, values.tolist()):
+                setattr(n, name, value)
+        if parameters:
+            for (s, t, g, link), weight, gate_weight, gate_type, gate_state in zip(flat.Links,
+                    *[data[key].tolist() for key in NeuralNet.__link_columns[3:]]):
+                link.Weight = weight
+                link.GateWeight = gate_weight
+                link.GateType = gate_type
+                link.GateState = gate_state
+
+        version, gauss = data['random_other'].tolist()
+        random.setstate((int(version), tuple(data['random_state'].tolist()), None if np.isnan(gauss) else gauss))
+        dt, integrator = data['timestep'].tolist()
+        self.__asleep.clear() # every neuron's state is current, nothing to catch up
+        self.__alarms.clear()
+        self.__step = int(data['step'])
+        if parameters:
+            self.set_timestep(None if np.isnan(dt) else dt, int(integrator)) # and rebuild what was derived from the old values
+        else:
+            self.__changed()
+        self.__publish(True)
+
+    #####---- topology index ----#####
+    def __topology(self):
+        """ the name index, rebuilt along with the input / output sets when stale """
+        if self.__names is None or self.__indexed != len(self.Neurons):
+            self.__names = {}
+            self.__serial = {}
+            self.__inputs = set()
+            self.__outputs = set()
+            self.__holders = {}
+            self.__suffixes = {}
+            self.__indexed = 0
+            self.__renames = Neuron.Renames
+            for n in self.Neurons:
+                n._links = None # dropped with the rest, direct edits may have rewired links
+                self.__index_neuron(n)
+        return self.__names
+
+    def __current_names(self):
+        """ the name index, rebuilt first if a neuron was renamed directly since indexing """
+        if self.__renames != Neuron.Renames:
+            self.__names = None
+        return self.__topology()
+
+    def __index_neuron(self, n):
+        self.__names.setdefault(n.Name, n) # like a scan, the first of any duplicates wins
+        self.__serial[n] = self.__next_serial
+        self.__next_serial += 1
+        self.__indexed += 1
+        self.__index_io(n)
+        for link in n.Incoming + n.Outgoing + n.Gating:
+            self.__register_link(link, n)
+
+    def __register_link(self, link, n):
+        if n not in self.__serial:
+            return
+        holders = self.__holders.setdefault(link, [])
+        if n not in holders:
+            holders.append(n)
+
+    def __unregister_link(self, link):
+        """ take link out of every list in this net that holds it, returns the holders """
+        holders = self.__holders.pop(link, [])
+        for n in holders:
+            n.remove_link(link) # a SubNet also removes it from its internal neurons
+        return holders
+
+    def __index_io(self, n):
+        if n not in self.__serial:
+            return # not in this net, e.g. the far side of a subnet boundary link
+        if len(n.Incoming) == 0: self.__inputs.add(n)
+        else:                    self.__inputs.discard(n)
+        if len(n.Outgoing) == 0: self.__outputs.add(n)
+        else:                    self.__outputs.discard(n)
+
+    def __add_to_index(self, n):
+        self.__topology()
+        self.Neurons.append(n)
+        self.__index_neuron(n)
+
+    def __remove_from_index(self, n):
+        if self.__names.get(n.Name) is n:
+            del self.__names[n.Name]
+            self.__suffixes.clear() # the name is free again
+        self.__serial.pop(n, None)
+        self.__inputs.discard(n)
+        self.__outputs.discard(n)
+        self.__indexed -= 1
 
     def update(self):
-        state_changed = False
+        self.__nested_changed()
+        if self.__profiler is not None:
+            return self.__update_profiled()
+        if self.__store is not None:
+            state_changed = self.__update_store()
+        elif self.__event_driven:
+            state_changed = self.__update_event_driven()
+        else:
+            state_changed = self.__update_neurons()
+            self.__finish_step(state_changed)
+
+        if state_changed and self.__state_change_callback is not None:
+            self.__metrics.Callbacks += 1
+            self.__state_change_callback()
+
+    def __update_neurons(self):
+        """ step every neuron, returns the number whose state changed """
+        if self.__specialize and self.__specialized_step():
+            return self.__specialized()
+        if self.__multirate():
+            return self.__update_multirate()
+        changed = 0
         # walk through all the neurons, update their state based on
         # current state of all connections
+        args = self.__step_args
         for neuron in self.Neurons:
-            neuron.updateState()
+            neuron.updateState(*args)
 
         # walk through all the neurons, apply the current state
         for neuron in self.Neurons:
             neuron.changeState()
-            state_changed = state_changed or neuron.is_state_changed()
+            if neuron.is_state_changed():
+                changed += 1
+        return changed
+
+    def __finish_step(self, changed, compiled=None):
+        """ param: changed - number of neurons whose state changed this step """
+        if self.__trace is not None:
+            self.__write_trace(self.__step, compiled)
+        self.__step += 1
+        self.__metrics.step(changed)
+        self.__publish(changed)
+
+    #####---- timestep ----#####
+    def set_timestep(self, dt=None, integrator=Neuron.Integrator_Euler):
+        """ simulated time per update for this net (SubNets included), independent of
+            any other net in the process and of the update thread's wall clock period
+            param: dt - seconds per update, None for Neuron.TimeConstant
+            param: integrator - Neuron.Integrator_Euler, the original forward step, or
+                Neuron.Integrator_Exponential, exact for the membrane equation and so
+                stable and accurate at a dt many times the membrane time constant
+            Neuron subclasses overriding updateState must take both arguments once set
+        """
+        if dt is not None and dt <= 0:
+            raise ValueError("timestep must be positive")
+        if integrator not in (Neuron.Integrator_Euler, Neuron.Integrator_Exponential):
+            raise ValueError("unknown integrator %r" % (integrator,))
+        self.__dt = dt
+        self.__integrator = integrator
+        self.__step_args = () if dt is None and integrator == Neuron.Integrator_Euler else (dt, integrator)
+        self.__changed() # recompile, and re-time resting neurons' intrinsic current alarms
+
+    def get_timestep(self):
+        """ (seconds per update, integrator) """
+        return (Neuron.TimeConstant if self.__dt is None else self.__dt), self.__integrator
+
+    #####---- specialized update ----#####
+    def set_specialized(self, enabled):
+        """ when enabled, update() steps the net through a function generated for
+            its exact topology and parameters (see codegen.specialize), bit for bit
+            the same as stepping the neurons.  It is regenerated after topology edits
+            and invalidate(), which parameter and weight changes then need as well.
+            Nets holding Neuron subclasses or update divisors are stepped as usual.
+        """
+        self.__specialize = enabled
+        self.__specialized = None
+
+    def __specialized_step(self):
+        if self.__specialized is None:
+            import codegen
+            try:
+                self.__specialized = codegen.specialize(self)
+            except codegen.SpecializeError:
+                self.__specialized = False
+        return self.__specialized
+
+    #####---- multi-rate update ----#####
+    def set_update_divisor(self, neurons, divisor):
+        """ step neurons every divisor-th update instead of every update, so slow
+            parts of a net stop costing full rate CPU.  In between, a slow neuron
+            accumulates its sensory current and the current of links from neurons
+            stepped at another rate; on its update it integrates their mean over
+            divisor steps of simulated time, with Neuron.Integrator_Exponential
+            whatever the net's integrator.  Links between neurons sharing a
+            divisor need no accumulation, both ends only change on the same updates.
+            param: neurons - a Neuron or SubNet of this net, or a list of them.  A
+                SubNet's divisor multiplies the divisors declared inside it
+            param: divisor - positive integer, 1 steps the neurons every update again
+            Slow neurons are integrated directly, bypassing any updateState override,
+            and event driven update doesn't support divisors.
+        """
+        if isinstance(neurons, Neuron):
+            neurons = [neurons]
+        if divisor != int(divisor) or divisor < 1:
+            raise ValueError("update divisor must be a positive integer")
+        if divisor != 1 and self.__event_driven:
+            raise ValueError("event driven update doesn't support update divisors")
+        self.__topology()
+        for n in neurons:
+            if n not in self.__serial:
+                holder = self.__holding_subnet(n)
+                if holder is None:
+                    raise ValueError("%r is not a neuron of this net" % (getattr(n, 'Name', n),))
+                raise ValueError("'%s' is inside SubNet '%s', give it a divisor with that SubNet's Net.set_update_divisor"
+                                 % (n.Name, holder.Name))
+        for n in neurons:
+            if divisor == 1:
+                self.__divisors.pop(n, None)
+            else:
+                self.__divisors[n] = int(divisor)
+            # a new rate starts a new accumulation window
+            for leaf in NeuralNet.__leaves(n):
+                leaf._inputCurrent = 0.0
+                leaf._inputSensory = 0.0
+                leaf._inputSteps = 0
+        self.__changed()
+
+    def __holding_subnet(self, n):
+        """ the SubNet of this net holding n at any depth, or None """
+        for s in self.Neurons:
+            if isinstance(s, subnet.SubNet) and (n in s.Net.Neurons or s.Net.__holding_subnet(n) is not None):
+                return s
+        return None
+
+    @staticmethod
+    def __leaves(n):
+        """ n, or the neurons inside SubNet n, nested SubNets expanded """
+        if not isinstance(n, subnet.SubNet):
+            return [n]
+        return [leaf for inner in n.Net.Neurons for leaf in NeuralNet.__leaves(inner)]
+
+    def get_update_divisor(self, neuron):
+        """ the divisor declared for neuron (a Neuron or SubNet of this net), 1 if none """
+        return self.__divisors.get(neuron, 1)
+
+    def get_update_divisors(self, flat=None):
+        """ effective divisor of every neuron, SubNets expanded in FlatNet order - the
+            product of the divisors declared for it and for each SubNet enclosing it
+            param: flat - FlatNet of this net, built when None
+        """
+        if flat is None:
+            from flatten import FlatNet
+            flat = FlatNet(self)
+        divisors = []
+        for n, path in zip(flat.Neurons, flat.Paths):
+            divisor = 1
+            net = self
+            for s in path:
+                divisor *= net.get_update_divisor(s)
+                net = s.Net
+            divisors.append(divisor * net.get_update_divisor(n))
+        return divisors
+
+    def __has_divisors(self):
+        return bool(self.__divisors) or any(n.Net.__has_divisors() for n in self.Neurons if isinstance(n, subnet.SubNet))
+
+    def __multirate(self):
+        if self.__rates is None:
+            self.__rates = self.__plan_rates()
+        return bool(self.__rates)
+
+    def __plan_rates(self):
+        """ [(unit, divisor, boundary links, internal links)] in update order.  A unit
+            stepped every update is a top level Neuron or SubNet; a SubNet holding
+            slow neurons is replaced by its neurons.  Empty when every divisor is 1
+        """
+        if not self.__has_divisors():
+            return []
+        from flatten import FlatNet
+        flat = FlatNet(self)
+        divisors = dict(zip(flat.Neurons, self.get_update_divisors(flat)))
+        leaves = {} # top level neuron -> its leaves, in order
+        for n, path in zip(flat.Neurons, flat.Paths):
+            leaves.setdefault(path[0] if path else n, []).append(n)
+        plan = []
+        for n in self.Neurons:
+            if all(divisors[leaf] == 1 for leaf in leaves.get(n, [])):
+                plan.append((n, 1, None, None))
+                continue
+            for leaf in leaves[n]:
+                k = divisors[leaf]
+                if k == 1:
+                    plan.append((leaf, 1, None, None))
+                    continue
+                # a link is accumulated unless its source, and gate, are stepped with the leaf
+                boundary = [l for l in leaf.Incoming if divisors.get(l.Source) != k
+                            or (l.GateSource is not None and divisors.get(l.GateSource) != k)]
+                internal = [l for l in leaf.Incoming if l not in boundary]
+                plan.append((leaf, k, boundary, internal))
+        return plan
+
+    def __update_multirate(self):
+        args = self.__step_args
+        dt = self.get_timestep()[0]
+        count = self.__step + 1 # slow neurons update on multiples of their divisor
+        stepped = []
+        for unit, k, boundary, internal in self.__rates:
+            if k == 1:
+                unit.updateState(*args)
+                stepped.append(unit)
+                continue
+            unit._inputCurrent += unit.input_current(boundary)
+            unit._inputSensory += unit._sensory_current
+            unit._inputSteps += 1
+            if count % k:
+                continue
+            # exact whatever the net's integrator, a forward step of k dt is unstable once k dt > 2 C / G
+            steps = unit._inputSteps
+            unit.integrate(unit._inputCurrent / steps + unit.input_current(internal),
+                           unit._inputSensory / steps, dt * steps, Neuron.Integrator_Exponential)
+            unit._inputCurrent = 0.0
+            unit._inputSensory = 0.0
+            unit._inputSteps = 0
+            stepped.append(unit)
+
+        changed = 0
+        for unit in stepped:
+            unit.changeState()
+            if unit.is_state_changed():
+                changed += 1
+        return changed
+
+    #####---- profiling ----#####
+    def set_profiling(self, enabled, window=1000):
+        """ when enabled, update() records how long each of its phases takes, see
+            UpdateProfiler for the phases.  Disabled, the only cost is one check per update.
+            param: window - number of recent updates each phase's statistics cover
+        """
+        self.__profiler = UpdateProfiler(window) if enabled else None
+
+    def get_profile(self):
+        """ phase name -> timing statistics in seconds (see RollingHistogram.summary),
+            empty when profiling is disabled
+        """
+        return {} if self.__profiler is None else self.__profiler.summary()
+
+    def __update_profiled(self):
+        profiler = self.__profiler
+        clock = profiler.Clock
+        start = clock()
+        if self.__store is not None:
+            state_changed = self.__update_store()
+            profiler.record('store', clock() - start)
+        elif self.__event_driven:
+            state_changed = self.__update_event_driven()
+            profiler.record('event_driven', clock() - start)
+        elif self.__specialize and self.__specialized_step():
+            state_changed = self.__specialized()
+            updated = clock()
+            self.__finish_step(state_changed)
+            profiler.record('specialized', updated - start)
+            profiler.record('publish', clock() - updated)
+        elif self.__multirate():
+            state_changed = self.__update_multirate()
+            updated = clock()
+            self.__finish_step(state_changed)
+            profiler.record('multirate', updated - start)
+            profiler.record('publish', clock() - updated)
+        else:
+            state_changed = 0
+            subnets = {}
+            args = self.__step_args
+            for neuron in self.Neurons:
+                if isinstance(neuron, subnet.SubNet):
+                    t = clock()
+                    neuron.updateState(*args)
+                    subnets[neuron] = clock() - t
+                else:
+                    neuron.updateState(*args)
+            updated = clock()
+            for neuron in self.Neurons:
+                if isinstance(neuron, subnet.SubNet):
+                    t = clock()
+                    neuron.changeState()
+                    subnets[neuron] += clock() - t
+                else:
+                    neuron.changeState()
+                if neuron.is_state_changed():
+                    state_changed += 1
+            changed = clock()
+            self.__finish_step(state_changed)
+            published = clock()
+            profiler.record('updateState', updated - start)
+            profiler.record('changeState', changed - updated)
+            profiler.record('publish', published - changed)
+            for n, seconds in subnets.items():
+                profiler.record('subnet/' + n.Name, seconds)
 
         if state_changed and self.__state_change_callback is not None:
+            self.__metrics.Callbacks += 1
+            t = clock()
             self.__state_change_callback()
-       
+            profiler.record('callback', clock() - t)
+        profiler.record('total', clock() - start)
+
+    #####---- event driven update ----#####
+    __alarm_horizon = 1000 # max updates a resting neuron with an intrinsic current sleeps before it is re-checked
+
+    def set_event_driven(self, enabled):
+        """ when enabled, update() only steps neurons whose inputs or state can change.
+            A neuron at rest (see Neuron.is_at_rest) is skipped until one of its
+            sources or gate sources changes firing frequency, or its intrinsic
+            current timer is due; the timer is caught up when it wakes.
+            Code that changes a neuron's state, parameters or sensory current
+            directly must call wake(neuron) afterwards.
+        """
+        if enabled and self.__has_divisors():
+            raise ValueError("event driven update doesn't support update divisors")
+        if not enabled:
+            # bring the skipped intrinsic current timers up to date for plain update()
+            for neuron in list(self.__asleep.keys()):
+                self.__wake_now(neuron)
+            self.__awake.clear()
+            self.__alarms.clear()
+        self.__event_driven = enabled
+        self.__wakes.clear() # enabling wakes every neuron below
+        self.wake()
+
+    def wake(self, neuron=None):
+        """ make neuron and the neurons it feeds (or every neuron, if None) take part in the next update """
+        if self.__event_driven:
+            self.__wakes.add(neuron) # drained by the update loop, safe to call from other threads
+        self.__snapshot_stale = True
+
+    def set_sensory_current(self, neuron, current):
+        neuron._sensory_current = current
+        self.__metrics.SensorWrites += 1
+        self.wake(neuron)
+
+    def invalidate(self):
+        """ call after changing links, link weights, intrinsic current types or the
+            set of neurons other than through the methods of this class, so the
+            structures derived from them are rebuilt
+        """
+        self.__names = None
+        self.__changed()
+
+    def __changed(self):
+        # topology edit through this class, the index is already up to date
+        self.__fanout = None
+        self.__kernel = None
+        self.__rates = None
+        self.__specialized = None
+        self.__snapshot_names = None
+        self.__generation += 1
+        self.__nested = None
+        self.__snapshot_rows = None
+        self.wake()
+
+    def __nested_changed(self):
+        """ rebuild what was derived from the SubNets' inner nets when one of them,
+            at any depth, was edited or invalidated since the last step
+        """
+        if self.__nested is not None:
+            if all(net.__generation == generation for net, generation in self.__nested):
+                return
+            self.__changed()
+        nested = []
+        def collect(neurons):
+            for n in neurons:
+                if isinstance(n, subnet.SubNet):
+                    nested.append((n.Net, n.Net.__generation))
+                    collect(n.Net.Neurons)
+        collect(self.Neurons)
+        self.__nested = nested
+
+    def __build_fanout(self):
+        self.__fanout = {}
+        self.__order = dict((n, i) for i, n in enumerate(self.Neurons))
+        for n in self.Neurons:
+            for link in n.Incoming:
+                for source in (link.Source, link.GateSource):
+                    if source is not None:
+                        self.__fanout.setdefault(source, set()).add(n)
+            # a subnet's outgoing links leave from its internal neurons, the
+            # subnet itself stands in for them as the source
+            if isinstance(n, subnet.SubNet):
+                for link in n.Outgoing:
+                    self.__fanout.setdefault(n, set()).add(link.Target)
+        self.__awake.intersection_update(self.__order.keys())
+        for n in [n for n in self.__asleep.keys() if n not in self.__order]:
+            del self.__asleep[n]
+
+    def __wake_now(self, neuron):
+        if neuron in self.__asleep:
+            neuron.advance_IC(self.__step - self.__asleep.pop(neuron), self.__dt)
+        if neuron in self.__order:
+            self.__awake.add(neuron)
+
+    def __update_event_driven(self):
+        if self.__fanout is None:
+            self.__build_fanout()
+        while self.__wakes:
+            neuron = self.__wakes.pop()
+            if neuron is None:
+                woken = self.Neurons
+            else:
+                # the neuron's own firing frequency may have been poked, so its targets wake too
+                woken = [neuron] + list(self.__fanout.get(neuron, ()))
+            for n in woken:
+                self.__wake_now(n)
+        for n in self.__alarms.pop(self.__step, []):
+            self.__wake_now(n)
+
+        # keep net order so intrinsic currents draw random numbers in the same order as update()
+        active = sorted(self.__awake, key=self.__order.get)
+        for neuron in active:
+            neuron.updateState(*self.__step_args)
+        changed = []
+        for neuron in active:
+            neuron.changeState()
+            if neuron.is_state_changed():
+                changed.append(neuron)
+
+        woken = set()
+        for neuron in changed:
+            woken.update(self.__fanout.get(neuron, ()))
+        for neuron in active:
+            if neuron in woken or isinstance(neuron, subnet.SubNet) or not neuron.is_at_rest():
+                continue
+            self.__awake.discard(neuron)
+            self.__asleep[neuron] = self.__step + 1
+            steps = neuron.steps_until_IC_change(self.__alarm_horizon, self.__dt)
+            if steps is not None:
+                self.__alarms.setdefault(self.__step + steps, []).append(neuron)
+        self.__finish_step(len(changed))
+        for neuron in woken:
+            self.__wake_now(neuron)
+        return len(changed)
+
+    #####---- snapshots ----#####
+    def get_snapshot(self):
+        """ the Snapshot published at the last step boundary - an immutable, consistent
+            frame of every neuron's firing frequency, safe to read from any thread
+        """
+        self.__snapshot_read = True # publish at every step boundary from now on
+        if self.__snapshot_stale and not self.__running:
+            self.__publish(True) # nothing is stepping, show pokes straight away
+        return self.__snapshot
+
+    def __publish(self, changed):
+        if not self.__snapshot_read:
+            self.__snapshot_stale = True # no reader yet, get_snapshot builds the first frame
+            return
+        if self.__snapshot_names is None:
+            names = tuple(n.Name for n in self.Neurons)
+            self.__snapshot_names = (names, dict((name, i) for i, name in enumerate(names)))
+            changed = True
+        if changed or self.__snapshot_stale:
+            self.__snapshot_stale = False
+            activity = self.__snapshot_activity()
+        else:
+            activity = self.__snapshot.Activity # unchanged frames share one tuple
+        names, index = self.__snapshot_names
+        self.__snapshot = Snapshot(self.__step, names, activity, index) # a single reference swap
+
+    def __snapshot_activity(self):
+        """ tuple of the top level neurons' firing frequencies, read from the store's
+            array rather than through each view while one is attached
+        """
+        store = self.__store
+        if store is None:
+            return tuple(n._firingFrequency for n in self.Neurons)
+        cached = self.__snapshot_rows
+        if cached is None or cached[0] is not store or len(cached[4]) != len(self.Neurons):
+            import numpy as np # only reached with a store, which needs numpy anyway
+            stored = [i for i, n in enumerate(self.Neurons) if n._store is store]
+            others = [i for i, n in enumerate(self.Neurons) if n._store is not store] # SubNets
+            rows = np.array([self.Neurons[i]._index for i in stored], dtype=np.intp)
+            self.__snapshot_rows = (store, np.array(stored, dtype=np.intp), rows, others, np.zeros(len(self.Neurons)))
+        store, stored, rows, others, activity = self.__snapshot_rows
+        activity[stored] = store._firingFrequency[rows]
+        for i in others:
+            activity[i] = self.Neurons[i]._firingFrequency
+        return tuple(activity.tolist())
+
+    #####---- array backed update ----#####
+    def attach_store(self):
+        """ move every neuron's fields, subnets included, into a NeuronStore and
+            step them with a CompiledNet from then on.  The Neuron objects stay
+            usable as views, so reads and writes through them (sensory current,
+            parameters, activation) go straight to the arrays being stepped.
+        """
+        if self.__store is None:
+            self.__kernel = None
+            self.__store = self.__build_store()
+
+    def detach_store(self):
+        """ copy the store's values back onto plain Neuron objects """
+        if self.__store is not None:
+            self.__store.detach()
+        self.__store = None
+        self.__kernel = None
+
+    def get_store(self):
+        return self.__store
+
+    def __build_store(self):
+        import neuronstore # numpy is only required for array backed stepping
+        from flatten import FlatNet
+        return neuronstore.NeuronStore(FlatNet(self).Neurons)
+
+    def __update_kernel(self):
+        if self.__kernel is None:
+            # the neuron set may have changed too - rebuilding keeps every current value
+            self.__store.detach()
+            self.__store = self.__build_store()
+            self.__kernel = self.compile(store=self.__store)
+
+    def __update_store(self):
+        self.__update_kernel()
+        self.__kernel.Step = self.__step
+        self.__kernel.update()
+        changed = int(self.__kernel._stateChanged.sum())
+        self.__finish_step(changed, self.__kernel)
+        return changed
+
+    #####---- activity trace ----#####
+    def get_trace_names(self):
+        """ path qualified names of the neurons a trace records, in column order """
+        from flatten import FlatNet
+        return FlatNet(self).Names
+
+    def attach_trace(self, writer):
+        """ append a frame to writer (an activitytrace.TraceWriter made with get_trace_names)
+            after every update.  The traced neurons are fixed now - neurons added
+            later are not recorded, removed ones keep their last values
+        """
+        from flatten import FlatNet
+        neurons = FlatNet(self).Neurons
+        if len(neurons) != len(writer.Names):
+            raise ValueError("trace has %d columns for %d neurons" % (len(writer.Names), len(neurons)))
+        self.__trace_neurons = neurons
+        self.__trace_index = (None, None)
+        self.__trace = writer
+
+    def detach_trace(self):
+        """ stop tracing, flushes and returns the writer """
+        writer = self.__trace
+        self.__trace = None
+        self.__trace_neurons = []
+        self.__trace_index = (None, None)
+        if writer is not None:
+            writer.flush()
+        return writer
+
+    def __write_trace(self, step, compiled=None):
+        voltage = self.__trace.Voltage
+        if compiled is not None:
+            if self.__trace_index[0] is not compiled:
+                try:
+                    index = [compiled.index_of(n) for n in self.__trace_neurons]
+                except KeyError:
+                    index = None # a traced neuron was removed, read the objects
+                self.__trace_index = (compiled, index)
+            index = self.__trace_index[1]
+            if index is not None:
+                self.__trace.write(step, compiled._firingFrequency[index],
+                                   compiled._voltage[index] if voltage else None)
+                return
+        self.__trace.write(step, [n._firingFrequency for n in self.__trace_neurons],
+                           [n._voltage for n in self.__trace_neurons] if voltage else None)
+
+    def run(self, steps, record=None, sensors=None, sense=None):
+        """ advance steps updates in one call on the compiled arrays, equivalent to
+            calling update() steps times but without per step dispatch or readout.
+            The state change callback is called once, at the end, if anything changed.
+            param: record - neurons (objects, path qualified names or flat indices) to trace, None for all
+            param: sensors - sensory currents, an array shaped (steps, sensed) or (sensed,),
+                or a callable sensors(step, activity) returning a row, see CompiledNet.run
+            param: sense - neurons the sensor columns feed, None for all
+            returns a (steps, recorded) array of firing frequencies, one row per step
+        """
+        self.__nested_changed()
+        for neuron in list(self.__asleep.keys()):
+            self.__wake_now(neuron) # the compiled run steps every neuron
+        self.__alarms.clear()
+        monitor = None
+        if self.__trace is not None:
+            first = self.__step
+            monitor = lambda step, compiled: self.__write_trace(first + step, compiled)
+        if self.__store is not None:
+            self.__update_kernel()
+            self.__kernel.Step = self.__step
+            trace, changed = self.__kernel.run(steps, record, sensors, sense, monitor)
+        else:
+            compiled = self.compile()
+            compiled.Step = self.__step
+            trace, changed = compiled.run(steps, record, sensors, sense, monitor)
+            compiled.write_state()
+        self.__step += steps
+        self.__metrics.step(0, steps) # per neuron changes aren't tracked through a fused run
+        self.wake()
+        self.__publish(changed)
+        if changed and self.__state_change_callback is not None:
+            self.__metrics.Callbacks += 1
+            self.__state_change_callback()
+        return trace
+
+    def partition(self, parts, seed=0):
+        """ step a compiled copy of this net split across parts worker processes,
+            see partition.PartitionedNet.  Its write_state copies the result back
+            onto the neurons, as for compile()
+            param: seed - intrinsic current seed, see CompiledNet.set_seed
+        """
+        import partition
+        compiled = self.compile()
+        compiled.Step = self.__step
+        return partition.PartitionedNet(compiled, parts, seed)
+
+    def compile(self, batch=None, store=None):
+        """ build a CompiledNet - an array based copy of this net for fast stepping
+            param: batch - number of instances of the net to step together, None for one
+            param: store - NeuronStore to step in place instead of private copies of the state
+        """
+        import engine # numpy is only required when compiling
+        return engine.CompiledNet(self, batch, store)
+
     def start(self):
+        if self.__running:
+            return # already stepping, e.g. set_period started the thread
         self.__stop = False
-        self.__thread = Thread(target=self.run)
+        self.__stop_event.clear()
+        self.__running = True
+        self.__snapshot_read = True # readers on other threads see every step
+        self.__thread = Thread(target=self.__run_loop)
         self.__thread.start()
 
     def stop(self):
-        if self.__thread == None:
-            return
         self.__stop = True
+        self.__stop_event.set()
+        if self.__thread == None:
+            return # run_async stops at its next step
         self.__thread.join()
 
     def interruptable_sleep(self, period):
-        counter = period
-        while counter > 0 and not self.__stop:
-            sleep_time = min(self.__min_period, counter)
-            counter -= sleep_time
-            sleep(sleep_time)
+        """ sleep for period seconds, returning early if stop() is called """
+        if period > 0 and not self.__stop:
+            self.__stop_event.wait(period)
 
-    def run(self):
-        self.__running = True
+    def __run_loop(self):
+        # updates are due at fixed deadlines, see RateScheduler
+        self.__scheduler.start()
         while not self.__stop:
             self.update()
-            self.interruptable_sleep(self.__period)
+            self.interruptable_sleep(self.__scheduler.tick())
         self.__running = False
 
     def set_period(self, period):
         if self.__running and period == 0:
             self.stop()
         self.__period = period
+        self.__scheduler.Period = period
         if not self.__running and period != 0:
             self.start()
 
+    async def run_async(self, rate=None, on_step=None, executor=None, steps=None):
+        """ drive the net from an asyncio event loop instead of the update thread.
+            Yields to the loop between steps; returns the number of steps run once
+            steps is reached or stop() / set_period(0) is called, or the task is cancelled.
+            param: rate - updates per second, None to keep set_period's rate (0 runs flat out)
+            param: on_step - optional callable on_step(step), may be a coroutine function
+            param: executor - concurrent.futures executor to run update() in, None runs it inline
+            param: steps - stop after this many updates, None to run until stopped
+        """
+        import asyncio # only needed by the async driver
+        if self.__running:
+            raise NeuralNet.AlreadyRunningError()
+        loop = asyncio.get_running_loop()
+        if rate is not None:
+            self.__period = self.__scheduler.Period = 1.0 / rate if rate else 0.0
+        self.__stop = False
+        self.__running = True
+        self.__snapshot_read = True
+        count = 0
+        try:
+            self.__scheduler.start()
+            while not self.__stop and (steps is None or count < steps):
+                if executor is None:
+                    self.update()
+                else:
+                    await loop.run_in_executor(executor, self.update)
+                count += 1
+                if on_step is not None:
+                    result = on_step(count)
+                    if asyncio.iscoroutine(result):
+                        await result
+                await asyncio.sleep(self.__scheduler.tick()) # sleep(0) still yields to the loop
+        finally:
+            self.__running = False
+        return count
+
+    class AlreadyRunningError(Exception):
+        pass
+
+    def set_catch_up(self, policy):
+        """ what the update thread does after an update overruns its deadline:
+            RateScheduler.Skip (default), RateScheduler.Burst or RateScheduler.Slow
+        """
+        self.__scheduler.set_policy(policy)
+
+    def get_overruns(self):
+        """ number of updates the thread finished after their deadline """
+        return self.__scheduler.Overruns
+
+    def get_stats(self):
+        """ runtime counters and gauges (see RuntimeMetrics) plus target_rate, the rate
+            set_period asks for (0.0 when not set), and the scheduler's overruns and skipped ticks
+        """
+        stats = self.__metrics.stats()
+        stats['target_rate'] = 1.0 / self.__period if self.__period > 0 else 0.0
+        stats['overruns'] = self.__scheduler.Overruns
+        stats['skipped'] = self.__scheduler.Skipped
+        stats['running'] = self.__running
+        return stats
+
     #####---- subnet support ----#####
     def add_subnet(self, name, path):
-        n = neural2.subnet.SubNet(self.get_unique_name(name), path)
-        self.Neurons.append(n)
+        n = subnet.SubNet(self.get_unique_name(name), path)
+        self.__add_to_index(n)
+        self.__changed()
         return n
 
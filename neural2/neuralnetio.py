@@ -52,9 +52,11 @@ class NeuralNetIO(NeuralIO):
         # neuron.  Only need to go one level deep since we're only writing the outer 
         # level net
         self._unlink_subnets(net)     
-        NeuralIO.write(self, filename, net)
-        # we then need to restore the original links when we leave
-        self._link_subnets(net)
+        try:
+            NeuralIO.write(self, filename, net)
+        finally:
+            # we then need to restore the original links when we leave
+            self._link_subnets(net)
     
 
     def read(self, filename):
@@ -89,6 +91,7 @@ class NeuralNetIO(NeuralIO):
             for link in neuron.Outgoing:
                 link.Source.Outgoing = [] # assumption: only one outgoing boundary link allowed per neuron
                 link.Source = neuron
+            neuron.Net.invalidate()
 
     def _link_subnets(self, net):
         for neuron in net.Neurons:
@@ -105,4 +108,5 @@ class NeuralNetIO(NeuralIO):
             for i in range(len(neuron.Outgoing)):
                 outputs[i].Outgoing = [neuron.Outgoing[i]]
                 neuron.Outgoing[i].Source = outputs[i]
+            neuron.Net.invalidate()
                 
@@ -2,25 +2,39 @@
 """Neuron class"""
 from pickletoxml import PickleToXML
 from link import Link
+import math
 import random
 
 class Neuron(PickleToXML):
     __pickle_to_xml__ = ['Name','Incoming','Outgoing','Gating'
         ,'MembraneConductance','MembraneCapacitance','ThresholdVoltage'
         ,'MinFiringFrequency', 'Gain', 'IntrinsicCurrent', 'LIC', 'HIC', 'LowIC', 'HighIC']
+    __slots__ = ['_name', 'Incoming', 'Outgoing', 'Gating'
+        , 'MembraneConductance', 'MembraneCapacitance', 'ThresholdVoltage'
+        , 'MinFiringFrequency', 'Gain', 'IntrinsicCurrent', 'LIC', 'HIC', 'LowIC', 'HighIC'
+        , '_current', '_voltage', '_firingFrequency', '_stateChanged', '_lastVoltage', '_nextFiringFrequency'
+        , '_isHighIC', '_lastChangeTimeIC', '_maxChangeTimeIC', '_sensory_current'
+        , '_inputCurrent', '_inputSensory', '_inputSteps'
+        , '_store', '_index', '_links'
+        , '__pickle_reference_id__'
+        , '__dict__'] # listed fields are slots, __dict__ only holds others, e.g. from older files
     __next_id = 0 # static id for unnamed neurons
+    Renames = 0   # count of Name changes after construction, lets NeuralNet's name index notice direct renames
+    LinkIndexMin = 8 # link list length from which lookups in it go through a dict rather than a scan
 
-    TimeConstant = 1.0 / 60.0 # Seconds per simulated time step
+    TimeConstant = 1.0 / 60.0 # Seconds per simulated time step, unless the net sets its own (NeuralNet.set_timestep)
     ICType_VInf = 0
     ICType_Random = 1
     ICType_None = 2
+    Integrator_Euler = 0        # forward Euler step of the membrane equation
+    Integrator_Exponential = 1  # exact solution of the membrane equation for the step's current
 
     def __init__(self, name=None):
         if name == None:
             name = 'neuron-%d' % Neuron.__next_id
             Neuron.__next_id += 1
 
-        self.Name = name                        # friendly name of this neuron, must be unique
+        self._name = name                       # friendly name of this neuron, must be unique
         self.Incoming = []                      # list of Incoming Links used to determine this neuron's activation
         self.Outgoing = []                      # list of Outgoing Links used for display purposes
         self.Gating = []                        # list of Outgoing Gating links used for display purposes
@@ -60,58 +74,110 @@ class Neuron(PickleToXML):
 
         self._sensory_current = 0
 
+        # input accumulated between updates when the net steps this neuron every k-th update,
+        # see NeuralNet.set_update_divisor
+        self._inputCurrent = 0.0
+        self._inputSensory = 0.0
+        self._inputSteps = 0
+
+        self._store = None                      # NeuronStore holding this neuron's fields, see neuronstore.py
+        self._index = None                      # row of this neuron in the store
+        self._links = None                      # list name -> (list, its length, lookup dict), see __link_index
+
+    def get_Name(self):
+        return self._name
+
+    def set_Name(self, name):
+        self._name = name
+        Neuron.Renames += 1
+
+    Name = property(get_Name, set_Name)
+
     def get_activity(self):
         return self._firingFrequency
 
     class LinkCantBeNullError(Exception):
         pass
 
-    def set_incoming(self, link):
+    __far_ends = {'Incoming': 'Source', 'Outgoing': 'Target', 'Gating': 'GateSource'}
+
+    def __link_index(self, name):
+        """ for the link list name a dict of its links -> True and of their far ends ->
+            the first link to each, None while the list is short enough to scan.  The
+            methods below keep it up to date, it is rebuilt when the list was replaced or
+            resized directly and dropped by NeuralNet.invalidate() for other direct edits,
+            such as rewiring a link's ends
+        """
+        links = getattr(self, name)
+        if len(links) < Neuron.LinkIndexMin:
+            return None
+        if self._links is None:
+            self._links = {}
+        cached = self._links.get(name)
+        if cached is not None and cached[0] is links and cached[1] == len(links):
+            return cached[2]
+        far = Neuron.__far_ends[name]
+        index = {}
+        for link in links:
+            index[link] = True
+            index.setdefault(getattr(link, far), link)
+        self._links[name] = (links, len(links), index)
+        return index
+
+    def __has_link(self, name, link):
+        index = self.__link_index(name)
+        return link in getattr(self, name) if index is None else link in index
+
+    def __add_link(self, name, link):
         if link is None:
-            raise LinkCantBeNullError()
-        if link in self.Incoming:
+            raise Neuron.LinkCantBeNullError()
+        index = self.__link_index(name)
+        if link in (getattr(self, name) if index is None else index):
             return
-        self.Incoming.append(link)
+        links = getattr(self, name)
+        links.append(link)
+        if index is not None:
+            index[link] = True
+            index.setdefault(getattr(link, Neuron.__far_ends[name]), link)
+            self._links[name] = (links, len(links), index)
+
+    def __connected(self, name, far_end):
+        """ the first link in list name whose far end is far_end, or None """
+        far = Neuron.__far_ends[name]
+        index = self.__link_index(name)
+        if index is not None:
+            link = index.get(far_end)
+            if link is None or getattr(link, far) is far_end:
+                return link
+        for link in getattr(self, name):
+            if getattr(link, far) == far_end:
+                return link
+        return None
+
+    def set_incoming(self, link):
+        self.__add_link('Incoming', link)
 
     def set_outgoing(self, link):
-        if link is None:
-            raise LinkCantBeNullError()
-        if link in self.Outgoing:
-            return
-        self.Outgoing.append(link)
+        self.__add_link('Outgoing', link)
 
     def set_gating(self, link):
-        if link is None:
-            raise LinkCantBeNullError()
-        if link in self.Gating:
-            return
-        self.Gating.append(link)
+        self.__add_link('Gating', link)
 
     def remove_link(self, link):
-        if link in self.Incoming:
-            self.Incoming.remove(link)
-        if link in self.Outgoing:
-            self.Outgoing.remove(link)
-        if link in self.Gating:
-            self.Gating.remove(link)
+        for name in ('Incoming', 'Outgoing', 'Gating'):
+            if self.__has_link(name, link):
+                getattr(self, name).remove(link)
+                if self._links is not None:
+                    self._links.pop(name, None) # rebuilt on its next use
 
     def is_connected_outgoing(self, target):
-        for link in self.Outgoing:
-            if link.Target == target:
-                return link
-        return None
+        return self.__connected('Outgoing', target)
 
     def is_connected_incoming(self, source):
-        for link in self.Incoming:
-            if link.Source == source:
-                return link
-        return None
+        return self.__connected('Incoming', source)
 
     def is_connected_gating(self, gate_source):
-        for link in self.Gating:
-            if link.GateSource == gate_source:
-                return link
-        return None
+        return self.__connected('Gating', gate_source)
 
     def is_state_changed(self):
         return self._stateChanged
@@ -128,15 +194,71 @@ class Neuron(PickleToXML):
             if self.IntrinsicCurrent == Neuron.ICType_Random:
                 self._maxChangeTimeIC = (random.randint(0, (int)(1000.0 * (self.LIC[1] - self.LIC[0]))) + 1000.0 * self.LIC[0]) / 1000.0
 
-    
 
-    def updateState(self):
-        self._stateChanged = False
+    def is_at_rest(self):
+        """ True once the voltage has decayed to the floor and the firing frequency
+            settled, so that updateState would change nothing until an input does
+        """
+        return self._voltage == 0.0 and self._lastVoltage == 0.0 and self._nextFiringFrequency == self._firingFrequency
+
+    def steps_until_IC_change(self, limit, dt=None):
+        """ number of updateState calls, given unchanged inputs, until the intrinsic
+            current timer expires.  None if it never does, limit if it is further out
+            param: dt - seconds per step, None for Neuron.TimeConstant
+        """
+        if self.IntrinsicCurrent == Neuron.ICType_None:
+            return None
+        if dt is None:
+            dt = Neuron.TimeConstant
+        max_time = self._maxChangeTimeIC
+        if not self._isHighIC and self.IntrinsicCurrent == Neuron.ICType_VInf:
+            volts = self._current / self.MembraneConductance
+            max_time = self.LIC[1] - self.LIC[2] * volts if volts > self.LIC[0] else float('inf')
+        if max_time == float('inf'):
+            return None
+        # repeat updateState's own additions so the step count is exact
+        time = self._lastChangeTimeIC + dt
+        steps = 1
+        while time < max_time and steps < limit:
+            time += dt
+            steps += 1
+        return steps
+
+    def advance_IC(self, steps, dt=None):
+        """ catch the intrinsic current timer up over steps skipped while at rest """
+        if self.IntrinsicCurrent == Neuron.ICType_None:
+            return
+        if dt is None:
+            dt = Neuron.TimeConstant
+        for i in range(steps):
+            self._lastChangeTimeIC += dt
+
+    def updateState(self, dt=None, integrator=Integrator_Euler):
+        """ param: dt - seconds per step, None for Neuron.TimeConstant
+            param: integrator - Neuron.Integrator_Euler or Neuron.Integrator_Exponential
+        """
+        # calculate current (based on activation of incoming links), as input_current does
+        current = 0.0
+        for link in self.Incoming:
+            activity = link.Source._firingFrequency * link.Weight
+            if link.GateSource is not None:
+                gated_activity = link.GateSource._firingFrequency * link.GateWeight
+                if link.GateType == Link.GateType_Gate:
+                    activity *= link.GateState + gated_activity * 1e9
+                elif gated_activity >= 0:
+                    activity *= 1 + gated_activity * 1e9
+                else:
+                    activity /= 1 - gated_activity * 1e9
+            current += activity
+        self.integrate(current, self._sensory_current, dt, integrator)
+
+    def input_current(self, links=None):
+        """ current flowing in through links, gates applied, the Incoming links when None """
         debug = False  #self.Name == 'FOOTL1'
         if debug: print()
         # calculate current (based on activation of incoming links)
         current = 0.0
-        for link in self.Incoming:
+        for link in (self.Incoming if links is None else links):
             if debug:  print(self.Name + " link from " + link.Source.Name + " ff " + str(link.Source._firingFrequency) + " w " + str(link.Weight))
             activity = link.Source._firingFrequency * link.Weight # frequency * weight = current ... apparently
             if link.GateSource is not None:
@@ -149,10 +271,21 @@ class Neuron(PickleToXML):
                 else:
                     activity /= 1 - gated_activity * 1e9
             current += activity # sum the current incoming from all links  
+        return current
+
+    def integrate(self, current, sensory, dt=None, integrator=Integrator_Euler):
+        """ advance the intrinsic current, voltage and next firing frequency dt seconds
+            param: current - link current, see input_current
+            param: sensory - sensory current
+        """
+        if dt is None:
+            dt = Neuron.TimeConstant
+        self._stateChanged = False
+        debug = False  #self.Name == 'FOOTL1'
 
         # add intrinsic current if any
         if self.IntrinsicCurrent != Neuron.ICType_None:
-            self._lastChangeTimeIC += Neuron.TimeConstant
+            self._lastChangeTimeIC += dt
             if not self._isHighIC and self.IntrinsicCurrent == Neuron.ICType_VInf:
                 volts = self._current / self.MembraneConductance
                 if volts > self.LIC[0]: self._maxChangeTimeIC = self.LIC[1] - self.LIC[2] * volts
@@ -168,7 +301,7 @@ class Neuron(PickleToXML):
                 current += (self.HighIC - self.LowIC)
             
         # APPLY SENSORY CURRENT FROM EXTERNAL SOURCE
-        current += self._sensory_current  #  getSensorCurrent(np->sensorType, np->name, np->paramsSensorCurrent);
+        current += sensory  #  getSensorCurrent(np->sensorType, np->name, np->paramsSensorCurrent);
         # self._sensory_current = 0 # clear immediately or hold?
 
         self._current = current  # store calculated current
@@ -176,9 +309,14 @@ class Neuron(PickleToXML):
         if debug: print(self.Name + " current_1 " + str(current))
 
         # calculate new Voltage
-        current = (current - self._voltage * self.MembraneConductance) / self.MembraneCapacitance
         self._lastVoltage = self._voltage
-        self._voltage += current * Neuron.TimeConstant
+        if integrator == Neuron.Integrator_Exponential and self.MembraneConductance != 0:
+            # C dV/dt = I - G V relaxes exponentially towards I / G, exactly for any dt
+            v_inf = current / self.MembraneConductance
+            self._voltage = v_inf + (self._voltage - v_inf) * math.exp(-dt * self.MembraneConductance / self.MembraneCapacitance)
+        else:
+            current = (current - self._voltage * self.MembraneConductance) / self.MembraneCapacitance
+            self._voltage += current * dt
         if abs(self._voltage) < 1e-30:
             self._voltage = 0.0 # floor to epsilon instead of overflow
 
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+    NeuronStore class
+
+    Struct of arrays storage for neurons.  Every per neuron field (parameters
+    and runtime state) lives in one typed numpy array per field, and each
+    attached Neuron becomes a thin view that reads and writes its row, so
+    existing code such as
+
+        neuron._sensory_current = x
+
+    lands directly in the array a CompiledNet steps, with no copy or sync.
+
+    Attaching swaps each neuron's class for a view subclass (same name and
+    module, so pickled files are unchanged); detaching copies the values back
+    onto the neuron and restores its class.
+"""
+import numpy as np
+
+class NeuronStore(object):
+    # field -> (dtype, trailing shape)
+    Fields = [('MembraneConductance', np.float64, ()),
+              ('MembraneCapacitance', np.float64, ()),
+              ('ThresholdVoltage', np.float64, ()),
+              ('MinFiringFrequency', np.float64, ()),
+              ('Gain', np.float64, ()),
+              ('IntrinsicCurrent', np.int8, ()),
+              ('LIC', np.float64, (3,)),
+              ('HIC', np.float64, (2,)),
+              ('LowIC', np.float64, ()),
+              ('HighIC', np.float64, ()),
+              ('_current', np.float64, ()),
+              ('_voltage', np.float64, ()),
+              ('_firingFrequency', np.float64, ()),
+              ('_stateChanged', bool, ()),
+              ('_lastVoltage', np.float64, ()),
+              ('_nextFiringFrequency', np.float64, ()),
+              ('_isHighIC', bool, ()),
+              ('_lastChangeTimeIC', np.float64, ()),
+              ('_maxChangeTimeIC', np.float64, ()),
+              ('_sensory_current', np.float64, ()),
+              ('_inputCurrent', np.float64, ()),
+              ('_inputSensory', np.float64, ()),
+              ('_inputSteps', np.float64, ())]
+
+    __views = {} # neuron class -> view class
+
+    class StoreError(Exception):
+        pass
+
+    def __init__(self, neurons):
+        self.Neurons = list(neurons)
+        for name, dtype, shape in NeuronStore.Fields:
+            values = [getattr(n, name) for n in self.Neurons]
+            setattr(self, name, np.array(values, dtype=dtype).reshape((len(self.Neurons),) + shape))
+        for i, n in enumerate(self.Neurons):
+            if n._store is not None:
+                raise NeuronStore.StoreError("neuron '%s' is already in a store" % n.Name)
+            n._store = self
+            n._index = i
+            n.__class__ = NeuronStore.view_class(n.__class__)
+
+    def __len__(self):
+        return len(self.Neurons)
+
+    def detach(self):
+        """ copy every field back onto the neurons and turn them back into plain objects """
+        for n in self.Neurons:
+            values = [(name, getattr(n, name)) for name, dtype, shape in NeuronStore.Fields]
+            n.__class__ = n.__class__.__bases__[0]
+            n._store = None
+            n._index = None
+            for name, value in values:
+                setattr(n, name, value)
+        self.Neurons = []
+
+    @classmethod
+    def view_class(cls, neuron_class):
+        if neuron_class not in cls.__views:
+            members = {'__slots__': (), '__module__': neuron_class.__module__}
+            for name, dtype, shape in NeuronStore.Fields:
+                members[name] = _row_property(name) if shape else _field_property(name)
+            cls.__views[neuron_class] = type(neuron_class.__name__, (neuron_class,), members)
+        return cls.__views[neuron_class]
+
+# view properties return plain python values so that pickling, comparisons
+# and printing behave exactly as they do for a detached neuron
+
+def _field_property(name):
+    def get(self):
+        return getattr(self._store, name).item(self._index)
+    def set(self, value):
+        getattr(self._store, name)[self._index] = value
+    return property(get, set)
+
+def _row_property(name):
+    def get(self):
+        return getattr(self._store, name)[self._index].tolist()
+    def set(self, value):
+        getattr(self._store, name)[self._index] = value
+    return property(get, set)
@@ -0,0 +1,285 @@
+#!/usr/bin/env python
+"""
+    Partitioned stepping
+
+    Splits a net into partitions with few links between them and steps each
+    partition in a worker process of its own, so a net too large for one
+    core's step budget scales across the cores of one machine:
+
+        with net.partition(4) as parted:
+            parted.step(600)
+            parted.write_state() # back onto the Neuron objects
+
+    Every step a worker updates its own neurons from their firing frequencies
+    and those of its halo - the neurons of other partitions that feed it -
+    read from a shared memory block.  It writes its new firing frequencies to
+    the other half of the block and waits at a barrier for the rest, so the
+    halo exchange is the only traffic between processes per step.
+
+    Intrinsic current durations are drawn from per neuron streams (see
+    CompiledNet.set_seed), so a partitioned run matches a seeded CompiledNet
+    run bit for bit, however the net is split.
+"""
+import heapq
+import math
+import multiprocessing
+from multiprocessing import shared_memory
+from multiprocessing.connection import wait
+import numpy as np
+from engine import CompiledNet
+
+def partition_graph(count, edges, parts, imbalance=0.05, passes=8):
+    """ assign count vertices to parts balanced partitions with few edges between them
+        param: edges - (a, b) vertex pairs, direction is ignored
+        param: imbalance - fraction by which a partition may differ from count / parts
+        param: passes - refinement sweeps, fewer once no move helps
+        returns a list of partition numbers, one per vertex
+    """
+    parts = max(1, min(parts, count))
+    neighbours = [{} for i in range(count)]
+    for a, b in edges:
+        if a != b:
+            neighbours[a][b] = neighbours[a].get(b, 0) + 1
+            neighbours[b][a] = neighbours[b].get(a, 0) + 1
+
+    # grow one partition at a time, always taking the vertex with the most links
+    # into it and the fewest out (lowest degree - 2 * inside first)
+    degree = [sum(n.values()) for n in neighbours]
+    assign = [-1] * count
+    start = 0
+    for p in range(parts):
+        size = (p + 1) * count // parts - p * count // parts
+        inside = {}
+        frontier = []
+        while size:
+            if not frontier: # nothing connected left, seed from the first free vertex
+                while assign[start] != -1:
+                    start += 1
+                frontier.append((degree[start], start))
+            key, v = heapq.heappop(frontier)
+            if assign[v] != -1 or key != degree[v] - 2 * inside.get(v, 0):
+                continue # taken, or superseded by a later push
+            assign[v] = p
+            size -= 1
+            for w, n in neighbours[v].items():
+                if assign[w] == -1:
+                    inside[w] = inside.get(w, 0) + n
+                    heapq.heappush(frontier, (degree[w] - 2 * inside[w], w))
+
+    # then move each vertex to the partition most of its links lead to, while
+    # that cuts fewer links and keeps the sizes within bounds
+    sizes = [0] * parts
+    for p in assign:
+        sizes[p] += 1
+    most = int(math.ceil(count / float(parts) * (1 + imbalance)))
+    least = max(1, int(count / float(parts) * (1 - imbalance)))
+    for i in range(passes):
+        moved = 0
+        for v in range(count):
+            links = {}
+            for w, n in neighbours[v].items():
+                links[assign[w]] = links.get(assign[w], 0) + n
+            own = assign[v]
+            best = max(sorted(links), key=links.get, default=own)
+            if links.get(best, 0) > links.get(own, 0) and sizes[best] < most and sizes[own] > least:
+                sizes[own] -= 1
+                sizes[best] += 1
+                assign[v] = best
+                moved += 1
+        if not moved:
+            break
+    return assign
+
+def link_edges(compiled):
+    """ (source, target) flat index pairs of a CompiledNet's links and gates """
+    targets = np.repeat(np.arange(len(compiled.Names)), np.diff(compiled.Weights.indptr))
+    gated = compiled._gated
+    sources = np.concatenate([compiled.Weights.indices, compiled.Gates.indices[gated]])
+    return list(zip(sources.tolist(), np.concatenate([targets, targets[gated]]).tolist()))
+
+def cut_links(assign, edges):
+    """ number of edges between different partitions """
+    return sum(1 for a, b in edges if assign[a] != assign[b])
+
+def _worker(kernel, rows, halo, memory_name, count, barrier, timeout, conn):
+    memory = shared_memory.SharedMemory(name=memory_name)
+    buffers = np.ndarray((2, count), dtype=np.float64, buffer=memory.buf)
+    owned = len(rows)
+    try:
+        while True:
+            command, args = conn.recv()
+            if command == 'step':
+                steps, current = args
+                changed = 0
+                try:
+                    for step in range(steps):
+                        kernel._firingFrequency[owned:] = buffers[current, halo]
+                        kernel.updateState()
+                        kernel.Step += 1
+                        kernel.changeState()
+                        changed += int(kernel._stateChanged[:owned].sum())
+                        current = 1 - current
+                        buffers[current, rows] = kernel._firingFrequency[:owned]
+                        barrier.wait(timeout)
+                except Exception as e:
+                    barrier.abort() # release the other workers rather than leave them waiting
+                    changed = e
+                conn.send(changed)
+            elif command == 'sense':
+                index, current = args
+                kernel._sensory_current[index] = current
+            elif command == 'state':
+                state = dict((name, getattr(kernel, name)[:owned].copy())
+                             for name in CompiledNet.State + CompiledNet.FlagState)
+                state['_icDraws'] = (kernel._icStream.tolist(), kernel._icDraws.tolist()) # streams are flat indices
+                conn.send(state)
+            else: # stop
+                break
+    finally:
+        del buffers
+        memory.close()
+
+class PartitionedNet(object):
+    BarrierTimeout = 300.0 # seconds a worker waits at a step's barrier for the others
+    JoinTimeout = 5.0      # seconds close() gives a worker to stop before terminating it
+
+    class PartitionError(Exception):
+        pass
+
+    def __init__(self, compiled, parts, seed=0, context=None):
+        """ param: compiled - CompiledNet to split, unbatched.  It keeps the state
+                write_state collects
+            param: parts - number of worker processes
+            param: seed - intrinsic current seed, see CompiledNet.set_seed
+            param: context - multiprocessing context, the default one when None
+        """
+        if compiled.Batch is not None:
+            raise PartitionedNet.PartitionError("a batched CompiledNet can't be partitioned")
+        compiled.set_seed(seed)
+        self.Compiled = compiled
+        self.Step = compiled.Step
+        count = len(compiled.Names)
+        edges = link_edges(compiled)
+        self.Assignment = np.array(partition_graph(count, edges, parts), dtype=np.intp)
+        self.CutLinks = cut_links(self.Assignment.tolist(), edges) # links crossing partitions
+
+        # per partition its own neurons, in flat order, and its halo
+        self.Rows = []
+        self.Halos = []
+        feeds = [set() for i in range(count)]
+        for source, target in edges:
+            feeds[target].add(source)
+        for p in range(max(1, min(parts, count))):
+            rows = np.nonzero(self.Assignment == p)[0]
+            inside = set(rows.tolist())
+            halo = sorted(set(s for r in rows.tolist() for s in feeds[r]) - inside)
+            self.Rows.append(rows)
+            self.Halos.append(np.array(halo, dtype=np.intp))
+
+        context = context or multiprocessing.get_context()
+        self.__memory = shared_memory.SharedMemory(create=True, size=max(1, 2 * count) * 8)
+        self.__buffers = np.ndarray((2, count), dtype=np.float64, buffer=self.__memory.buf)
+        self.__buffers[0] = compiled._firingFrequency
+        self.__current = 0 # half of the block holding the current firing frequencies
+        self.__barrier = context.Barrier(len(self.Rows)) # held here too, spawned workers rebuild it by name
+        self.__workers = []
+        try:
+            for rows, halo in zip(self.Rows, self.Halos):
+                conn, child = context.Pipe()
+                process = context.Process(target=_worker, daemon=True,
+                                          args=(compiled.subset(rows, halo), rows, halo, self.__memory.name, count,
+                                                self.__barrier, PartitionedNet.BarrierTimeout, child))
+                process.start()
+                self.__workers.append((process, conn))
+        except Exception:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def step(self, steps=1):
+        """ advance every partition steps updates, returns the number of firing frequency changes """
+        try:
+            for process, conn in self.__workers:
+                conn.send(('step', (steps, self.__current)))
+        except OSError as e:
+            raise PartitionedNet.PartitionError("worker died: %r" % (e,))
+        changed = [self.__receive(conn) for process, conn in self.__workers]
+        for c in changed:
+            if isinstance(c, Exception):
+                raise PartitionedNet.PartitionError("worker failed: %r" % (c,))
+        self.__current = (self.__current + steps) % 2
+        self.Step += steps
+        return sum(changed)
+
+    def get_activity(self):
+        """ every neuron's firing frequency, in flat order """
+        return self.__buffers[self.__current].copy()
+
+    def set_sensory_current(self, neuron, current):
+        """ param: neuron - Neuron object, path qualified name or flat index """
+        index = neuron if isinstance(neuron, (int, np.integer)) else self.Compiled.index_of(neuron)
+        p = self.Assignment[index]
+        self.__workers[p][1].send(('sense', (int(np.searchsorted(self.Rows[p], index)), current)))
+
+    def write_state(self):
+        """ gather every partition's state into the CompiledNet and copy it onto the Neuron objects """
+        compiled = self.Compiled
+        draws = {}
+        for rows, (process, conn) in zip(self.Rows, self.__workers):
+            try:
+                conn.send(('state', None))
+            except OSError as e:
+                raise PartitionedNet.PartitionError("worker died: %r" % (e,))
+            state = self.__receive(conn)
+            for name in CompiledNet.State + CompiledNet.FlagState:
+                getattr(compiled, name)[rows] = state[name]
+            draws.update(zip(*state['_icDraws']))
+        compiled._icDraws[...] = [draws.get(i, 0) for i in compiled._ic.tolist()]
+        compiled.Step = self.Step
+        compiled.write_state()
+
+    def __receive(self, conn):
+        """ the next reply on conn, or PartitionError as soon as any worker has died """
+        sentinels = [process.sentinel for process, c in self.__workers]
+        if conn not in wait([conn] + sentinels):
+            self.__terminate()
+            raise PartitionedNet.PartitionError("worker died")
+        try:
+            return conn.recv()
+        except (OSError, EOFError) as e:
+            self.__terminate()
+            raise PartitionedNet.PartitionError("worker died: %r" % (e,))
+
+    def __terminate(self):
+        # the others would wait for a dead worker at the barrier forever, and as it may
+        # have died holding the barrier's lock, aborting the barrier could hang too
+        for process, conn in self.__workers:
+            process.terminate()
+
+    def close(self):
+        """ stop the workers and free the shared memory, also after a worker died """
+        try:
+            for process, conn in self.__workers:
+                try:
+                    if process.is_alive():
+                        conn.send(('stop', None))
+                except OSError:
+                    pass # can't be asked to stop, terminated below
+            for process, conn in self.__workers:
+                process.join(PartitionedNet.JoinTimeout)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+                conn.close()
+        finally:
+            self.__workers = []
+            if self.__memory is not None:
+                del self.__buffers
+                self.__memory.close()
+                self.__memory.unlink()
+                self.__memory = None
@@ -2,7 +2,8 @@
 import xml.dom.minidom as dom
 import sys
 
-class PickleToXML(object): pass
+class PickleToXML(object):
+    __slots__ = () # lets subclasses opt in to a compact __slots__ layout
 
 # helper function
 
@@ -38,6 +39,7 @@ def _pickleListItems(root, node, fabric):
 _pickleTupleItems = _pickleListItems
 
 _pickle_id = 0
+_pickled = [] # objects the current pickle() gave a __pickle_reference_id__
 def _getNextPickleID():
     global _pickle_id
     temp = _pickle_id
@@ -47,8 +49,10 @@ def _getNextPickleID():
 def pickle(obj, elementName="root", fabric=dom.Document()):
     global _pickle_id
     _pickle_id=0
-    root = _pickle(obj, fabric, elementName)
-    _remove_ref_ids(obj)
+    try:
+        root = _pickle(obj, fabric, elementName)
+    finally:
+        _remove_ref_ids() # also when pickling failed part way, e.g. out of stack
     fabric.unlink()
     return root
     
@@ -76,39 +80,12 @@ def _pickle(root, fabric, elementName="root"):
         node.appendChild(fabric.createTextNode(repr(root)))
     return node
 
-def _remove_ref_ids(root):
-    if isinstance(root, PickleToXML):
-        _remove_ref_ids_from_object(root)
-    elif isinstance(root, dict):
-        _remove_ref_ids_from_dict(root)
-    elif isinstance(root, list):
-        _remove_ref_ids_from_list(root)
-    elif isinstance(root, tuple):
-        _remove_ref_ids_from_tuple(root)
-
-def _remove_ref_ids_from_object(root):
-    if not hasattr(root, "__pickle_reference_id__"):
-        return
-    del root.__pickle_reference_id__
-    if hasattr(root, "__pickle_to_xml__"):
-        attributesToPickle = root.__pickle_to_xml__
-    else:
-        attributesToPickle = [ name for name in dir(root) if not name.startswith("__") ]
-    for name in attributesToPickle: 
-        obj = getattr(root, name)
-        if _isCallable(obj): continue
-        _remove_ref_ids(obj)
-
-def _remove_ref_ids_from_dict(root):
-    for key, value in root.items():
-        _remove_ref_ids(key)
-        _remove_ref_ids(value)
-
-def _remove_ref_ids_from_list(root):
-    for obj in root:
-        _remove_ref_ids(obj)
-
-_remove_ref_ids_from_tuple = _remove_ref_ids_from_list
+def _remove_ref_ids():
+    # a flat list rather than a walk of the object graph, which could run out of stack again
+    global _pickled
+    for root in _pickled:
+        del root.__pickle_reference_id__
+    _pickled = []
 
 def _pickleObjectWithAttributes(node, root, fabric, elementName):
 
@@ -118,6 +95,7 @@ def _pickleObjectWithAttributes(node, root, fabric, elementName):
         return node
     # otherwise add an object id tag and store it as an attribute
     root.__pickle_reference_id__ = _getNextPickleID()
+    _pickled.append(root)
     node.attributes["objectid"]=repr(root.__pickle_reference_id__)
 
     # pickle all members or just a subset ???
@@ -216,7 +194,14 @@ def _unpickle(node):
             visited[id] = obj
 
             for name, element in _getElementChilds(node):
-                setattr(obj, name, _unpickle(element))
+                value = _unpickle(element)
+                try:
+                    setattr(obj, name, value)
+                except AttributeError:
+                    # files written before a class moved to __slots__ may hold
+                    # copies of its class constants, which a slotted instance can't take
+                    if not hasattr(classType, name):
+                        raise
         return obj
 
 class XMLUnpicklingException(Exception): pass
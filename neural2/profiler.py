@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""
+    UpdateProfiler class
+
+    Per-phase timing of NeuralNet.update, enabled with NeuralNet.set_profiling.
+    Each phase keeps a rolling window of its most recent durations, so a
+    summary describes the net's recent behaviour rather than its whole life:
+
+        net.set_profiling(True)
+        ...
+        for phase, stats in net.get_profile().items():
+            print(phase, stats['mean'], stats['p99'], stats['max'])
+
+    Phases of a plain update are 'updateState', 'changeState', 'publish' (trace
+    and snapshot), 'callback' and 'total'.  Every top level SubNet also gets a
+    'subnet/<name>' phase, its share of updateState plus changeState.  Array
+    backed and event driven updates interleave the phases, so they are timed
+    as one 'store' or 'event_driven' phase.  A net with update divisors
+    (NeuralNet.set_update_divisor) or a specialized step function
+    (NeuralNet.set_specialized) is timed as one 'multirate' or 'specialized'
+    phase plus 'publish'.
+"""
+import bisect
+import time
+from collections import deque
+
+class RollingHistogram(object):
+    """ the last window samples of a duration, in seconds """
+    Percentiles = [50, 90, 99]
+
+    def __init__(self, window=1000):
+        self.Samples = deque(maxlen=window)
+        self.Count = 0 # samples ever added, including those rolled out of the window
+
+    def add(self, seconds):
+        self.Samples.append(seconds)
+        self.Count += 1
+
+    def summary(self):
+        """ dict of count (all time), window, mean, min, max and p50 / p90 / p99 over the window """
+        ordered = sorted(self.Samples)
+        stats = {'count': self.Count, 'window': len(ordered)}
+        if not ordered:
+            return stats
+        stats['mean'] = sum(ordered) / len(ordered)
+        stats['min'] = ordered[0]
+        stats['max'] = ordered[-1]
+        for p in RollingHistogram.Percentiles:
+            stats['p%d' % p] = ordered[min(len(ordered) - 1, len(ordered) * p // 100)]
+        return stats
+
+    def buckets(self, edges):
+        """ sample counts between consecutive edges, the last bucket is open ended """
+        counts = [0] * len(edges)
+        for s in self.Samples:
+            counts[max(bisect.bisect_right(edges, s) - 1, 0)] += 1
+        return counts
+
+class UpdateProfiler(object):
+    def __init__(self, window=1000, clock=time.perf_counter):
+        self.Window = window
+        self.Clock = clock
+        self.Phases = {} # phase name -> RollingHistogram
+
+    def record(self, phase, seconds):
+        histogram = self.Phases.get(phase)
+        if histogram is None:
+            histogram = self.Phases[phase] = RollingHistogram(self.Window)
+        histogram.add(seconds)
+
+    def summary(self):
+        """ phase name -> RollingHistogram.summary """
+        return dict((phase, histogram.summary()) for phase, histogram in self.Phases.items())
+
+    def reset(self):
+        self.Phases = {}
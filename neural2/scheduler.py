@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""
+    RateScheduler class
+
+    Fixed rate deadlines on the monotonic clock for NeuralNet's update thread.
+    Deadlines are absolute (start + n * period), so the time spent in update()
+    comes out of the period instead of being added to it, and sleep jitter
+    doesn't accumulate into drift.
+
+    When an update finishes past its deadline (an overrun) the catch up policy
+    decides what happens to the ticks that were missed:
+
+        skip  - drop them, the next tick is the next deadline still in the future
+        burst - run them back to back until caught up (up to burst_limit behind,
+                further than that re-anchors like slow)
+        slow  - forget them, deadlines restart from now so the net simply runs
+                slower while overloaded
+"""
+import math
+import time
+
+class RateScheduler(object):
+    Skip = 'skip'
+    Burst = 'burst'
+    Slow = 'slow'
+    Policies = [Skip, Burst, Slow]
+
+    class PolicyError(Exception):
+        pass
+
+    def __init__(self, period, policy=Skip, burst_limit=10, clock=time.monotonic):
+        self.Period = period
+        self.BurstLimit = burst_limit
+        self.Overruns = 0   # ticks that finished after their deadline
+        self.Skipped = 0    # ticks dropped by the skip policy
+        self.set_policy(policy)
+        self.__clock = clock
+        self.__deadline = None
+
+    def set_policy(self, policy):
+        if policy not in RateScheduler.Policies:
+            raise RateScheduler.PolicyError("unknown catch up policy '%s'" % policy)
+        self.Policy = policy
+
+    def start(self):
+        """ anchor the deadlines at now, the first tick is due immediately """
+        self.__deadline = self.__clock()
+
+    def tick(self):
+        """ call after each update, returns the seconds to wait before the next one """
+        if self.__deadline is None:
+            self.start()
+        self.__deadline += self.Period
+        now = self.__clock()
+        if now <= self.__deadline:
+            return self.__deadline - now
+
+        self.Overruns += 1
+        behind = now - self.__deadline
+        if self.Policy == RateScheduler.Skip and self.Period > 0:
+            missed = int(math.floor(behind / self.Period)) + 1
+            self.Skipped += missed
+            self.__deadline += missed * self.Period
+            return self.__deadline - now
+        if self.Policy == RateScheduler.Burst and behind < self.BurstLimit * self.Period:
+            return 0.0
+        self.__deadline = now
+        return 0.0
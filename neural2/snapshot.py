@@ -0,0 +1,32 @@
+#!/usr/bin/env python
+"""
+    Snapshot class
+
+    An immutable frame of a NeuralNet's firing frequencies, published at each
+    step boundary.  NeuralNet swaps in a new Snapshot with a single reference
+    assignment after an update has fully applied, so a reader on any thread
+    gets a consistent frame without locking and without stalling the update
+    thread:
+
+        snapshot = net.get_snapshot()
+        for name, activity in snapshot.items(): ...
+"""
+
+class Snapshot(object):
+    __slots__ = ['Step', 'Names', 'Activity', '_index']
+
+    def __init__(self, step, names, activity, index):
+        self.Step = step            # number of updates applied
+        self.Names = names          # tuple of neuron names, net order
+        self.Activity = activity    # tuple of firing frequencies, parallel to Names
+        self._index = index         # name -> position, shared between snapshots of one topology
+
+    def get(self, name, default=0.0):
+        i = self._index.get(name)
+        return default if i is None else self.Activity[i]
+
+    def items(self):
+        return zip(self.Names, self.Activity)
+
+    def __len__(self):
+        return len(self.Names)
@@ -14,6 +14,7 @@ import neuralnet
 
 class SubNet(neuron.Neuron):
     __pickle_to_xml__ = ['Path'] + neuron.Neuron.__pickle_to_xml__
+    __slots__ = ['Path', 'Net']
     def __init__(self, name=None, path=None):
         neuron.Neuron.__init__(self, name)
         self.Path = path
@@ -29,6 +30,7 @@ class SubNet(neuron.Neuron):
             return        
         neuron.Neuron.set_incoming(self, link)
         inputs[0].Incoming.append(link)
+        self.Net.invalidate() # inputs[0] is no longer an input of the inner net
 
     def set_outgoing(self, link):
         outputs = self.Net.get_output_neurons()
@@ -37,6 +39,7 @@ class SubNet(neuron.Neuron):
             return
         neuron.Neuron.set_outgoing(self, link)
         outputs[0].Outgoing.append(link)
+        self.Net.invalidate()
         # also rewire the link.Source to point at the internal neuron
         link.Source = outputs[0]
 
@@ -53,12 +56,12 @@ class SubNet(neuron.Neuron):
     def is_state_changed(self):
         return neuron.Neuron.is_state_changed(self)
 
-    def updateState(self):
+    def updateState(self, *args):
         self._stateChanged = False
         # walk through all the neurons, update there state based on
-        # current state of all connections
+        # current state of all connections, passing on the enclosing net's timestep if it set one
         for n in self.Net.Neurons:
-            n.updateState()
+            n.updateState(*args)
         
     def changeState(self):
         # walk through all the neurons, apply the current state
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""
+    Parameter sweeps
+
+    Runs a .net file once for every combination in a parameter grid, fanning the
+    runs out over a process pool.  The net is parsed and compiled once in the
+    calling process; each worker receives the pickled CompiledNet a single time
+    and copies it for every run.
+
+    grid maps a parameter to the list of values to try.  A bare parameter name
+    (one of CompiledNet.Parameters) sets that parameter on every neuron, while
+    'NeuronName.Parameter' sets it on one neuron only:
+
+        results = sweep('nets/nerve_sim_layout_1.net',
+                        {'Gain': [100, 1000], 'LC.ThresholdVoltage': [-0.004, -0.003]},
+                        steps=600)
+        for params, metrics in results:
+            print(params, metrics['mean_activity']['LC'])
+"""
+import copy
+import itertools
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from neuralnetio import NeuralNetIO
+from engine import CompiledNet
+
+_compiled = None # per worker process copy of the net being swept
+
+def _init_worker(compiled):
+    global _compiled
+    _compiled = compiled
+
+def _apply(compiled, params):
+    for key, value in params.items():
+        name, _, parameter = key.rpartition('.')
+        values = getattr(compiled, parameter)
+        if name:
+            values[compiled.index_of(name)] = value
+        else:
+            values[...] = value
+
+def _run(compiled, params, steps, sensors, seed):
+    """ run a fresh copy of compiled with params applied, returns the summary metrics """
+    compiled = copy.deepcopy(compiled)
+    _apply(compiled, params)
+    for name, current in sensors.items():
+        compiled._sensory_current[compiled.index_of(name)] = current
+    if seed is not None:
+        compiled.set_seed(seed)
+
+    total = np.zeros(len(compiled.Names))
+    active = np.zeros(len(compiled.Names))
+    changes = 0
+    for i in range(steps):
+        if compiled.update():
+            changes += 1
+        total += compiled._firingFrequency
+        active += compiled._firingFrequency > 0
+
+    steps = max(steps, 1)
+    return {'mean_activity': dict(zip(compiled.Names, (total / steps).tolist())),
+            'active_fraction': dict(zip(compiled.Names, (active / steps).tolist())),
+            'final_activity': dict(zip(compiled.Names, compiled._firingFrequency.tolist())),
+            'state_changes': changes}
+
+def _run_in_worker(args):
+    return _run(_compiled, *args)
+
+def expand_grid(grid):
+    """ list of parameter dicts, one per combination of the grid values """
+    keys = list(grid.keys())
+    return [dict(zip(keys, values)) for values in itertools.product(*[grid[k] for k in keys])]
+
+def sweep(path, grid, steps, sensors=None, seed=None, max_workers=None):
+    """ run path once per grid combination
+        param: path - .net file to load
+        param: grid - dict of parameter -> list of values
+        param: steps - number of updates per run
+        param: sensors - optional dict of neuron name -> constant sensory current
+        param: seed - gives every neuron its own seeded random stream (CompiledNet.set_seed), so
+            intrinsic currents repeat run to run whichever worker a run lands on
+        param: max_workers - process pool size, defaults to the number of cores
+        returns list of (params, metrics) in grid order
+    """
+    compiled = CompiledNet(NeuralNetIO().read(path))
+    sensors = sensors or {}
+    runs = expand_grid(grid)
+
+    # validate up front rather than failing inside a worker
+    for key in grid.keys():
+        name, _, parameter = key.rpartition('.')
+        if parameter not in CompiledNet.Parameters:
+            raise ValueError("can't sweep unknown parameter '%s'" % key)
+        if name:
+            compiled.index_of(name)
+    for name in sensors.keys():
+        compiled.index_of(name)
+
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker, initargs=(compiled,)) as executor:
+        metrics = list(executor.map(_run_in_worker, [(params, steps, sensors, seed) for params in runs]))
+    return list(zip(runs, metrics))
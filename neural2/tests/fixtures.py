@@ -0,0 +1,12 @@
+#!/usr/bin/env python
+"""Shared Test Fixtures"""
+from neuralnet import NeuralNet
+
+def build_pair(sensory=0):
+    """ net of a source neuron linked to a target, sensory - the source's sensory current """
+    net = NeuralNet()
+    source = net.add_neuron()
+    target = net.add_neuron()
+    net.add_link(source, target, 1e-6)
+    source._sensory_current = sensory
+    return net, source, target
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""Activity Trace Test Code"""
+import os
+import shutil
+import tempfile
+import unittest
+import numpy as np
+from tests.fixtures import build_pair
+from activitytrace import TraceWriter, TraceReader
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+
+class TestActivityTrace(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.path = os.path.join(self.dir, 'run.trace')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_RoundTrip(self):
+        with TraceWriter(self.path, ['a', 'b'], voltage=True, buffer_frames=3) as writer:
+            for step in range(0, _MIN_FREQ_):
+                writer.write(step, [step, -step], [0.5 * step, 0.0])
+            self.assertEqual(_MIN_FREQ_, len(writer))
+        trace = TraceReader(self.path)
+        self.assertEqual(['a', 'b'], trace.Names)
+        self.assertEqual(list(range(_MIN_FREQ_)), trace.steps().tolist())
+        self.assertEqual([-s for s in range(_MIN_FREQ_)], trace.column('b').tolist())
+        self.assertEqual(4.5, trace.column('a', 'voltage')[-1])
+        self.assertTrue(isinstance(trace.Blocks, np.memmap))
+        self.assertEqual([0, -1, -2], trace.Blocks['activity'][0, 1].tolist()) # a column per neuron
+
+    def test_FlushMidBlock(self):
+        writer = TraceWriter(self.path, ['a'], buffer_frames=4)
+        for step in range(0, _MIN_FREQ_):
+            writer.write(step, [step])
+            writer.flush()
+            self.assertEqual(list(range(step + 1)), TraceReader(self.path).column('a').tolist())
+        writer.close()
+        self.assertEqual(3, len(TraceReader(self.path).Blocks))
+
+    def test_PartialFrameIgnored(self):
+        writer = TraceWriter(self.path, ['a'])
+        writer.write(0, [1.0])
+        writer.write(1, [2.0])
+        writer.close()
+        with open(self.path, 'ab') as f:
+            f.write(b'\0' * 5)
+        self.assertEqual([1.0, 2.0], TraceReader(self.path).column('a').tolist())
+
+    def test_EmptyTrace(self):
+        TraceWriter(self.path, ['a']).close()
+        self.assertEqual(0, len(TraceReader(self.path)))
+
+    def test_NetUpdate(self):
+        net, source, target = build_pair(1e-6)
+        net.attach_trace(TraceWriter(self.path, net.get_trace_names(), voltage=True))
+        for step in range(0, 5 * _MIN_FREQ_):
+            net.update()
+        net.detach_trace().close()
+        trace = TraceReader(self.path)
+        self.assertEqual(5 * _MIN_FREQ_, len(trace))
+        self.assertEqual(target.get_activity(), trace.column(target.Name)[-1])
+        self.assertEqual(source._voltage, trace.column(source.Name, 'voltage')[-1])
+
+    def test_NetRunMatchesUpdate(self):
+        traces = []
+        for fused in (False, True):
+            net, source, target = build_pair(1e-6)
+            path = os.path.join(self.dir, 'run%d.trace' % fused)
+            net.attach_trace(TraceWriter(path, net.get_trace_names()))
+            if fused:
+                net.run(5 * _MIN_FREQ_)
+            else:
+                for step in range(0, 5 * _MIN_FREQ_):
+                    net.update()
+            net.detach_trace().close()
+            trace = TraceReader(path)
+            traces.append((trace.steps().tolist(), [trace.column(name).tolist() for name in trace.Names]))
+        self.assertEqual(traces[0], traces[1])
+
+    def test_ColumnsMustMatch(self):
+        net, source, target = build_pair(1e-6)
+        writer = TraceWriter(self.path, ['a'])
+        self.assertRaises(ValueError, net.attach_trace, writer)
+        writer.close()
+
+if __name__ == '__main__':
+    unittest.main()
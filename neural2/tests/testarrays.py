@@ -0,0 +1,76 @@
+#!/usr/bin/env python
+"""NeuralNet.from_arrays / to_arrays Test Code"""
+import os
+import random
+import unittest
+from link import Link
+from neuralnet import NeuralNet
+from neuralnetio import NeuralNetIO
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+class TestFromArrays(unittest.TestCase):
+    def test_Build(self):
+        net = NeuralNet.from_arrays(['a', 'b', 'c'], {'Gain': [10, 20, 30], 'LIC': [0.1, 0.2, 0.3]},
+                                    src=[0, 1], dst=[1, 2], weights=[0.5, 0.25], gate_src=[-1, 0], gate_weights=[0, 2.0])
+        a, b, c = net.Neurons
+        self.assertEqual([10, 20, 30], [n.Gain for n in net.Neurons])
+        self.assertEqual([0.1, 0.2, 0.3], c.LIC)
+        self.assertEqual(0.25, c.Incoming[0].Weight)
+        self.assertTrue(b.Outgoing[0] is c.Incoming[0])
+        self.assertTrue(c.Incoming[0].GateSource is a)
+        self.assertEqual(2.0, c.Incoming[0].GateWeight)
+        self.assertEqual(None, b.Incoming[0].GateSource)
+        self.assertEqual([a], net.get_input_neurons())
+        self.assertTrue(net.lookup_neuron_by_name('c') is c)
+        self.assertTrue(type(c.Gain) is int)
+
+    def test_Validation(self):
+        self.assertRaises(ValueError, NeuralNet.from_arrays, ['a', 'a'])
+        self.assertRaises(ValueError, NeuralNet.from_arrays, ['a', 'b'], src=[0], dst=[2])
+        self.assertRaises(ValueError, NeuralNet.from_arrays, ['a', 'b'], src=[0, 0], dst=[1, 1])
+        self.assertRaises(ValueError, NeuralNet.from_arrays, ['a', 'b'], src=[0], dst=[1, 0])
+        self.assertRaises(ValueError, NeuralNet.from_arrays, ['a', 'b'], src=[0], dst=[1], weights=[1, 2])
+        self.assertRaises(ValueError, NeuralNet.from_arrays, ['a', 'b'], src=[0], dst=[1], gate_src=[5])
+        self.assertRaises(ValueError, NeuralNet.from_arrays, ['a', 'b'], {'Bogus': 1})
+        self.assertRaises(ValueError, NeuralNet.from_arrays, ['a', 'b'], {'Gain': [1, 2, 3]})
+        self.assertRaises(ValueError, NeuralNet.from_arrays, ['a', 'b'], {'HIC': [1, 2, 3]})
+
+class TestToArrays(unittest.TestCase):
+    def test_RoundTrip(self):
+        net = NeuralNetIO().read(_NET_PATH_)
+        arrays = net.to_arrays()
+        copy = NeuralNet.from_arrays(**arrays)
+        again = copy.to_arrays()
+        self.assertEqual(arrays['names'], again['names'])
+        for key in ('src', 'dst', 'weights', 'gate_src', 'gate_weights', 'gate_types', 'gate_states'):
+            self.assertEqual(arrays[key].tolist(), again[key].tolist())
+        for name in NeuralNet.ArrayParameters:
+            self.assertEqual(arrays['params'][name].tolist(), again['params'][name].tolist())
+
+        random.seed(0)
+        for i in range(0, 600):
+            net.update()
+        random.seed(0)
+        for i in range(0, 600):
+            copy.update()
+        self.assertEqual([n._voltage for n in net.Neurons], [n._voltage for n in copy.Neurons])
+
+    def test_GatedLinks(self):
+        net = NeuralNet()
+        source, gate, target = net.add_neuron(), net.add_neuron(), net.add_neuron()
+        link = net.add_link(source, target, 1e-6)
+        link.GateSource = gate
+        link.GateType = Link.GateType_Modulation
+        arrays = net.to_arrays()
+        self.assertEqual([1], arrays['gate_src'].tolist())
+        self.assertEqual([Link.GateType_Modulation], arrays['gate_types'].tolist())
+
+    def test_Empty(self):
+        arrays = NeuralNet().to_arrays()
+        self.assertEqual(0, len(arrays['src']))
+        self.assertEqual(0, len(NeuralNet.from_arrays(**arrays).Neurons))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""Benchmark Suite Test Code"""
+import os
+import shutil
+import tempfile
+import unittest
+from neuron import Neuron
+import benchmark
+
+class TestGenerate(unittest.TestCase):
+    def test_Shape(self):
+        net = benchmark.generate(200, fan_in=3, gating_ratio=0.5, ic_share=0.5, seed=1)
+        arrays = net.to_arrays()
+        self.assertEqual(200, len(arrays['names']))
+        self.assertTrue(500 < len(arrays['src']) <= 199 * 3)
+        self.assertTrue(0.3 < (arrays['gate_src'] >= 0).mean() < 0.7)
+        self.assertTrue(0.3 < (arrays['params']['IntrinsicCurrent'] != Neuron.ICType_None).mean() < 0.7)
+        self.assertEqual([net.Neurons[0]], net.get_input_neurons())
+        self.assertTrue(net.Neurons[-1] in net.get_output_neurons())
+
+    def test_Seeded(self):
+        a = benchmark.generate(50, gating_ratio=0.2, seed=3).to_arrays()
+        b = benchmark.generate(50, gating_ratio=0.2, seed=3).to_arrays()
+        self.assertEqual(a['src'].tolist(), b['src'].tolist())
+        self.assertEqual(a['weights'].tolist(), b['weights'].tolist())
+
+    def test_SubnetDepth(self):
+        net = benchmark.generate(10, subnet_depth=2)
+        names = net.to_arrays()['names']
+        self.assertEqual(14, len(names))
+        self.assertTrue('sub/sub/n9' in names)
+
+class TestFormats(unittest.TestCase):
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def test_NerveSimRoundTrip(self):
+        arrays = benchmark.generate(30, gating_ratio=0.3, ic_share=0.3).to_arrays()
+        path = os.path.join(self.dir, 'bench.neu')
+        benchmark.write_neu(arrays, path)
+        read = benchmark._nervesim_reader()(path).Net.Net.to_arrays()
+        self.assertEqual(sorted(arrays['names']), sorted(read['names']))
+        pairs = lambda a: sorted((a['names'][s], a['names'][t], w) for s, t, w in zip(a['src'], a['dst'], a['weights']))
+        self.assertEqual(pairs(arrays), pairs(read))
+
+    def test_SubnetFiles(self):
+        net = benchmark.generate(10, subnet_depth=2)
+        path = os.path.join(self.dir, 'bench.net')
+        benchmark.write_net(path, net)
+        self.assertEqual(net.to_arrays()['names'], benchmark.NeuralNetIO().read(path).to_arrays()['names'])
+
+class TestResults(unittest.TestCase):
+    def test_Bench(self):
+        result = benchmark.bench(50, min_time=0.01, parse_limit=50)
+        metrics = result['metrics']
+        self.assertEqual(50, result['config']['neurons'])
+        self.assertTrue(metrics['steps_per_sec'] > 0)
+        self.assertTrue(metrics['memory_per_neuron'] > 0)
+        self.assertTrue(metrics['nervesim_parse_sec'] > 0)
+
+    def test_DeepIO(self):
+        # deep enough that NeuralNetIO overflows the default recursion limit
+        result = benchmark.bench(300, min_time=0.01, io_limit=300, parse_limit=0)
+        self.assertEqual([], result['metrics']['errors'])
+        self.assertTrue(result['metrics']['io_write_sec'] > 0)
+        self.assertTrue(result['metrics']['io_read_sec'] > 0)
+
+    def test_Compare(self):
+        config = {'neurons': 100}
+        baseline = {'runs': [{'config': config, 'metrics': {'steps_per_sec': 100.0, 'io_read_sec': 1.0, 'io_write_sec': None}}]}
+        results = {'runs': [{'config': config, 'metrics': {'steps_per_sec': 70.0, 'io_read_sec': 1.1, 'io_write_sec': 2.0}}]}
+        self.assertEqual([(config, 'steps_per_sec', 100.0, 70.0)], benchmark.compare(baseline, results, 0.2))
+        self.assertEqual([], benchmark.compare(baseline, {'runs': [{'config': {'neurons': 5}, 'metrics': {}}]}))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,119 @@
+#!/usr/bin/env python
+"""Checkpoint / Restore Test Code"""
+import io
+import os
+import random
+import tempfile
+import unittest
+import numpy as np
+from neuron import Neuron
+from neuralnetio import NeuralNetIO
+from flatten import FlatNet
+from benchmark import generate
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+def build_net():
+    return generate(60, fan_in=3, gating_ratio=0.3, ic_share=0.4, seed=6, subnet_depth=1)
+
+def state(net):
+    return [(n._voltage, n._firingFrequency, n._current, n._lastVoltage, n._isHighIC,
+             n._lastChangeTimeIC, n._maxChangeTimeIC, n._stateChanged) for n in FlatNet(net).Neurons]
+
+def step(net, steps):
+    for i in range(0, steps):
+        net.update()
+    return state(net)
+
+class TestCheckpoint(unittest.TestCase):
+    def test_Rollback(self):
+        net = build_net()
+        random.seed(2)
+        step(net, 3 * _MIN_FREQ_)
+        blob = net.checkpoint()
+        expected = step(net, 3 * _MIN_FREQ_)
+        self.assertTrue(any(s[4] for s in expected)) # intrinsic currents switched on
+        net.restore(blob)
+        self.assertEqual(expected, step(net, 3 * _MIN_FREQ_))
+        self.assertEqual(6 * _MIN_FREQ_, net.get_snapshot().Step)
+
+    def test_ResumeAfterRestart(self):
+        net = NeuralNetIO().read(_NET_PATH_)
+        net.set_timestep(None, Neuron.Integrator_Exponential)
+        random.seed(4)
+        step(net, 5 * _MIN_FREQ_)
+        path = os.path.join(tempfile.mkdtemp(), 'net.ckpt')
+        net.checkpoint(path)
+        expected = step(net, 5 * _MIN_FREQ_)
+
+        restarted = NeuralNetIO().read(_NET_PATH_)
+        random.seed(0)
+        restarted.restore(path)
+        self.assertEqual((Neuron.TimeConstant, Neuron.Integrator_Exponential), restarted.get_timestep())
+        self.assertEqual(expected, step(restarted, 5 * _MIN_FREQ_))
+
+    def test_ParametersRestored(self):
+        net = build_net()
+        blob = net.checkpoint()
+        neuron = FlatNet(net).Neurons[5]
+        gain, weight, lic = neuron.Gain, neuron.Incoming[0].Weight, list(neuron.LIC)
+        neuron.Gain = 1.0
+        neuron.Incoming[0].Weight = 0.0
+        neuron.LIC[0] = 5.0
+        net.restore(blob)
+        self.assertEqual((gain, weight, lic), (neuron.Gain, neuron.Incoming[0].Weight, neuron.LIC))
+
+    def test_StoreAttached(self):
+        nets = [build_net(), build_net()]
+        nets[1].attach_store()
+        random.seed(8)
+        step(nets[0], 2 * _MIN_FREQ_)
+        step(nets[1], 3 * _MIN_FREQ_)
+        blob = nets[0].checkpoint()
+        nets[1].restore(blob)
+        expected = step(nets[1], 3 * _MIN_FREQ_)
+        nets[0].restore(blob) # and the random state with it
+        self.assertEqual(expected, step(nets[0], 3 * _MIN_FREQ_))
+
+    def test_StateOnly(self):
+        net = build_net()
+        random.seed(5)
+        step(net, 2 * _MIN_FREQ_)
+        blob = net.checkpoint()
+        expected = step(net, 2 * _MIN_FREQ_)
+        neuron = FlatNet(net).Neurons[5]
+        neuron.Gain, neuron.Incoming[0].Weight = 500.0, 0.0 # edited since, same topology
+        net.set_timestep(None, Neuron.Integrator_Exponential)
+        net.restore(blob, parameters=False)
+        self.assertEqual((500.0, 0.0), (neuron.Gain, neuron.Incoming[0].Weight))
+        self.assertEqual(Neuron.Integrator_Exponential, net.get_timestep()[1])
+        self.assertEqual(2 * _MIN_FREQ_, net.get_snapshot().Step)
+        net.restore(blob)
+        self.assertEqual(expected, step(net, 2 * _MIN_FREQ_))
+
+    def test_Damaged(self):
+        net = build_net()
+        random.seed(1)
+        step(net, _MIN_FREQ_)
+        blob = net.checkpoint()
+        before = step(net, 0)
+        self.assertRaises(ValueError, net.restore, blob[:len(blob) // 2])
+        self.assertRaises(ValueError, net.restore, b'')
+        with np.load(io.BytesIO(blob)) as data:
+            arrays = dict(data.items())
+        del arrays['state._voltage']
+        buffer = io.BytesIO()
+        np.savez(buffer, **arrays)
+        self.assertRaises(ValueError, net.restore, buffer.getvalue())
+        self.assertEqual(before, step(net, 0)) # untouched
+
+    def test_DifferentNet(self):
+        blob = build_net().checkpoint()
+        self.assertRaises(ValueError, NeuralNetIO().read(_NET_PATH_).restore, blob)
+        other = build_net()
+        other.add_link(other.Neurons[0], other.Neurons[-1], 1e-8)
+        self.assertRaises(ValueError, other.restore, blob)
+
+if __name__ == '__main__':
+    unittest.main()
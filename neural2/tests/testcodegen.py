@@ -0,0 +1,107 @@
+#!/usr/bin/env python
+"""Specialized Step Function Test Code"""
+import os
+import random
+import unittest
+from neuron import Neuron
+from neuralnet import NeuralNet
+from neuralnetio import NeuralNetIO
+from flatten import FlatNet
+from subnet import SubNet
+from codegen import specialize, SpecializeError
+from benchmark import generate
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+class CountingNeuron(Neuron):
+    pass
+
+def build_net(integrator=Neuron.Integrator_Euler):
+    net = generate(80, fan_in=3, gating_ratio=0.3, ic_share=0.4, seed=5, subnet_depth=2)
+    net.set_timestep(None, integrator)
+    return net
+
+def state(net):
+    return [(n._voltage, n._firingFrequency, n._current, n._isHighIC, n._maxChangeTimeIC, n._stateChanged)
+            for n in FlatNet(net).Neurons]
+
+class TestSpecialized(unittest.TestCase):
+    def assertSameSteps(self, plain, special, steps=6 * _MIN_FREQ_):
+        special.set_specialized(True)
+        for net in (plain, special):
+            random.seed(11)
+            for i in range(0, steps):
+                net.update()
+        self.assertEqual(state(plain), state(special))
+        self.assertEqual(plain.Neurons[1]._stateChanged, special.Neurons[1]._stateChanged) # the SubNet
+        return state(plain)
+
+    def test_MatchesNeurons(self):
+        steps = self.assertSameSteps(build_net(), build_net())
+        self.assertTrue(any(s[3] for s in steps)) # intrinsic currents switched on
+
+    def test_Exponential(self):
+        self.assertSameSteps(build_net(Neuron.Integrator_Exponential), build_net(Neuron.Integrator_Exponential))
+
+    def test_LoadedNet(self):
+        self.assertSameSteps(NeuralNetIO().read(_NET_PATH_), NeuralNetIO().read(_NET_PATH_))
+
+    def test_StraightLine(self):
+        step = specialize(build_net())
+        self.assertFalse('Incoming' in step.Source)
+        self.assertFalse('GateType' in step.Source)
+        self.assertFalse('IntrinsicCurrent' in step.Source)
+
+    def test_RegeneratedAfterEdits(self):
+        nets = [build_net(), build_net()]
+        nets[1].set_specialized(True)
+        for net in nets:
+            random.seed(3)
+            for i in range(0, _MIN_FREQ_):
+                net.update()
+            source, target = net.Neurons[0], net.Neurons[-1]
+            net.add_link(source, target, 5e-8)
+            for i in range(0, _MIN_FREQ_):
+                net.update()
+        self.assertEqual(state(nets[0]), state(nets[1]))
+
+    def test_InnerNetEdited(self):
+        nets = [build_net(), build_net()]
+        nets[1].set_specialized(True)
+        for net in nets:
+            random.seed(3)
+            for i in range(0, _MIN_FREQ_):
+                net.update()
+            inner = net.Neurons[1].Net
+            self.assertTrue(isinstance(net.Neurons[1], SubNet))
+            inner.add_link(inner.Neurons[0], inner.Neurons[-1], 5e-8) # no invalidate() on the outer net
+            for i in range(0, _MIN_FREQ_):
+                net.update()
+            inner.Neurons[2].Incoming[0].Weight = 1e-7
+            inner.invalidate()
+            for i in range(0, _MIN_FREQ_):
+                net.update()
+        self.assertEqual(state(nets[0]), state(nets[1]))
+
+    def test_NotSpecializable(self):
+        net = NeuralNet()
+        net.Neurons.append(CountingNeuron('counting'))
+        net.invalidate()
+        self.assertRaises(SpecializeError, specialize, net)
+        net.set_specialized(True)
+        net.update() # stepped as usual
+
+        net = build_net()
+        net.set_update_divisor(net.Neurons[0], 2)
+        self.assertRaises(SpecializeError, specialize, net)
+
+    def test_Profiled(self):
+        net = build_net()
+        net.set_specialized(True)
+        net.set_profiling(True)
+        net.update()
+        self.assertEqual(1, net.get_profile()['specialized']['count'])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+"""Compiled Neural Net Engine Test Code"""
+import os
+import random
+import unittest
+import numpy as np
+from neuralnet import NeuralNet
+from neuralnetio import NeuralNetIO
+from subnet import SubNet
+from link import Link
+from engine import CompiledNet, CSRMatrix
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+class TestCompiledNetActivity(unittest.TestCase):
+    def setUp(self):
+        net = NeuralNet()
+        self.in1 = net.add_neuron()
+        self.in2 = net.add_neuron()
+        self.mid1 = net.add_neuron()
+        self.out1 = net.add_neuron()
+        net.add_link(self.in1, self.mid1, 1.0)
+        net.add_link(self.in2, self.mid1, -1.0)
+        net.add_link(self.mid1, self.out1, 1.0)
+        self.net = net
+
+    def test_CompileNet(self):
+        compiled = self.net.compile()
+        self.assertTrue(isinstance(compiled, CompiledNet))
+        self.assertEqual(4, len(compiled.get_activity()))
+        self.assertEqual(2, compiled.index_of(self.mid1))
+        self.assertEqual(2, compiled.index_of(self.mid1.Name))
+
+    def test_SensoryCurrentTurnsOnOutput(self):
+        self.in1._sensory_current = 1e-6
+        compiled = self.net.compile()
+        for i in range(0, _MIN_FREQ_):
+            compiled.update()
+        self.assertEqual(0.0, compiled.get_activity()[compiled.index_of(self.in2)])
+        self.assertTrue(compiled.get_activity()[compiled.index_of(self.out1)] > 0.0)
+
+    def test_WriteState(self):
+        self.in1._sensory_current = 1e-6
+        compiled = self.net.compile()
+        for i in range(0, _MIN_FREQ_):
+            compiled.update()
+        compiled.write_state()
+        self.assertEqual(compiled.get_activity()[3], self.out1.get_activity())
+
+    def test_UnconnectedSubNetLinkNotCompiled(self):
+        sub = SubNet('sub') # no inner neurons, so links out of it lose their source
+        self.net.Neurons.append(sub)
+        self.mid1.Incoming.append(Link(sub))
+        self.assertRaises(CompiledNet.CompileError, self.net.compile)
+
+class TestCompiledNetBatch(unittest.TestCase):
+    def setUp(self):
+        net = NeuralNet()
+        self.in1 = net.add_neuron()
+        self.in2 = net.add_neuron()
+        self.out1 = net.add_neuron()
+        net.add_link(self.in1, self.out1, 1.0)
+        net.add_link(self.in2, self.out1, -1.0)
+        self.net = net
+
+    def test_BatchShape(self):
+        compiled = self.net.compile(batch=4)
+        self.assertEqual((4, 3), compiled.get_activity().shape)
+        self.assertEqual((3,), compiled.Gain.shape)
+
+    def test_InstancesMatchSingleNets(self):
+        currents = [(0.0, 0.0), (1e-6, 0.0), (1e-6, 1e-6)]
+        batch = self.net.compile(batch=len(currents))
+        singles = [self.net.compile() for c in currents]
+        for b, (c1, c2) in enumerate(currents):
+            batch._sensory_current[b, 0:2] = (c1, c2)
+            singles[b]._sensory_current[0:2] = (c1, c2)
+        for i in range(0, _MIN_FREQ_):
+            batch.update()
+            for single in singles:
+                single.update()
+        for b, single in enumerate(singles):
+            self.assertEqual(single._voltage.tolist(), batch._voltage[b].tolist())
+        self.assertEqual(0.0, batch.get_activity()[0, 2])
+        self.assertTrue(batch.get_activity()[1, 2] > 0.0)
+
+    def test_WriteStateInstance(self):
+        batch = self.net.compile(batch=2)
+        batch._sensory_current[1, 0] = 1e-6
+        for i in range(0, _MIN_FREQ_):
+            batch.update()
+        batch.write_state(1)
+        self.assertEqual(batch.get_activity()[1, 2], self.out1.get_activity())
+
+class TestCSRMatrix(unittest.TestCase):
+    def test_Dot(self):
+        m = CSRMatrix([0, 2, 2, 3], [1, 2, 0], [2.0, -1.0, 0.5], (3, 3))
+        self.assertEqual([-1.0, 0.0, 0.5], m.dot(np.array([1.0, 1.0, 3.0])).tolist())
+
+class TestCompiledNetGating(unittest.TestCase):
+    def setUp(self):
+        net = NeuralNet()
+        self.source = net.add_neuron()
+        self.gate = net.add_neuron()
+        self.targets = [net.add_neuron() for i in range(0, 3)]
+        self.source._sensory_current = 1e-6
+        self.gate._sensory_current = 1e-6
+        for target, gate_type, gate_weight in [(self.targets[0], Link.GateType_Gate, 1e-9),
+                                               (self.targets[1], Link.GateType_Modulation, 1e-9),
+                                               (self.targets[2], Link.GateType_Modulation, -1e-9)]:
+            link = net.add_link(self.source, target, 1e-6)
+            link.GateSource = self.gate
+            link.GateWeight = gate_weight
+            link.GateType = gate_type
+        self.net = net
+
+    def test_GatesMatchNeuralNet(self):
+        compiled = self.net.compile()
+        for i in range(0, _MIN_FREQ_):
+            self.net.update()
+            compiled.update()
+        self.assertEqual([n._voltage for n in self.net.Neurons], compiled._voltage.tolist())
+        self.assertEqual([n._current for n in self.net.Neurons], compiled._current.tolist())
+
+class TestCompiledNetMatchesNeuralNet(unittest.TestCase):
+    def test_BitForBit(self):
+        stream = NeuralNetIO()
+        net = stream.read(_NET_PATH_)
+        compiled = stream.read(_NET_PATH_).compile()
+
+        random.seed(0)
+        for i in range(0, 1000):
+            net.update()
+        random.seed(0)
+        for i in range(0, 1000):
+            compiled.update()
+
+        self.assertEqual([n._voltage for n in net.Neurons], compiled._voltage.tolist())
+        self.assertEqual([n._firingFrequency for n in net.Neurons], compiled._firingFrequency.tolist())
+
+    def test_BatchOfOne(self):
+        stream = NeuralNetIO()
+        net = stream.read(_NET_PATH_)
+        compiled = net.compile()
+        batch = net.compile(batch=1)
+
+        random.seed(0)
+        for i in range(0, 1000):
+            compiled.update()
+        random.seed(0)
+        for i in range(0, 1000):
+            batch.update()
+
+        self.assertEqual(compiled._voltage.tolist(), batch._voltage[0].tolist())
+
+class TestCompiledNetSeeded(unittest.TestCase):
+    def setUp(self):
+        self.net = NeuralNetIO().read(_NET_PATH_)
+
+    def run_seeded(self, seed, batch=None, steps=600):
+        compiled = self.net.compile(batch)
+        compiled.set_seed(seed)
+        random.seed() # seeded streams must not depend on the global one
+        for i in range(0, steps):
+            compiled.update()
+        return compiled
+
+    def test_Repeatable(self):
+        first = self.run_seeded(7)
+        second = self.run_seeded(7)
+        self.assertEqual(first._voltage.tolist(), second._voltage.tolist())
+        self.assertEqual(first._maxChangeTimeIC.tolist(), second._maxChangeTimeIC.tolist())
+        self.assertTrue(first._icDraws.sum() > 0)
+
+    def test_BatchInstancesAreIndependent(self):
+        single = self.run_seeded(7)
+        batch = self.run_seeded(7, batch=3)
+        self.assertEqual(single._voltage.tolist(), batch._voltage[0].tolist())
+        self.assertNotEqual(batch._maxChangeTimeIC[0].tolist(), batch._maxChangeTimeIC[1].tolist())
+
+    def test_DrawsWithinRange(self):
+        compiled = self.run_seeded(3, batch=8, steps=2000)
+        rb = compiled.index_of('RBL')
+        for high, value in zip(compiled._isHighIC[:, rb].tolist(), compiled._maxChangeTimeIC[:, rb].tolist()):
+            low_time, high_time = (compiled.HIC[rb] if high else compiled.LIC[rb, :2]).tolist()
+            self.assertTrue(low_time - 1e-9 <= value <= high_time + 1e-9)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Event Driven NeuralNet Update Test Code"""
+import os
+import random
+import unittest
+from neuron import Neuron
+from neuralnet import NeuralNet
+from neuralnetio import NeuralNetIO
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+class CountingNeuron(Neuron):
+    def __init__(self, name=None):
+        Neuron.__init__(self, name)
+        self.Updates = 0
+
+    def updateState(self):
+        self.Updates += 1
+        Neuron.updateState(self)
+
+def build_chain(length):
+    net = NeuralNet()
+    chain = [CountingNeuron('n%d' % i) for i in range(length)]
+    net.Neurons.extend(chain)
+    for source, target in zip(chain[:-1], chain[1:]):
+        net.add_link(source, target, 1e-6)
+    return net, chain
+
+class TestEventDriven(unittest.TestCase):
+    def test_RestingNeuronsAreSkipped(self):
+        net, chain = build_chain(20)
+        net.set_event_driven(True)
+        for i in range(0, _MIN_FREQ_):
+            net.update()
+        self.assertEqual(1, chain[0].Updates)
+        self.assertEqual(1, chain[-1].Updates)
+
+    def test_SensoryCurrentWakesNeuron(self):
+        net, chain = build_chain(5)
+        net.set_event_driven(True)
+        net.update()
+        net.set_sensory_current(chain[0], 1e-6)
+        for i in range(0, 5 * _MIN_FREQ_):
+            net.update()
+        self.assertTrue(chain[-1].get_activity() > 0.0)
+
+    def test_WakesOnlyQueuedWhenEventDriven(self):
+        net, chain = build_chain(3)
+        for i in range(0, _MIN_FREQ_):
+            net.set_sensory_current(chain[0], 1e-6)
+            net.update()
+        self.assertEqual(0, len(net._NeuralNet__wakes))
+        net.set_event_driven(True)
+        for i in range(0, _MIN_FREQ_):
+            net.set_sensory_current(chain[0], 1e-6)
+            net.wake(chain[0])
+        self.assertEqual(2, len(net._NeuralNet__wakes)) # every neuron, and chain[0]
+        net.update()
+        self.assertEqual(0, len(net._NeuralNet__wakes))
+
+    def test_MatchesPlainUpdate(self):
+        stream = NeuralNetIO()
+        plain = stream.read(_NET_PATH_)
+        driven = stream.read(_NET_PATH_)
+        driven.set_event_driven(True)
+
+        random.seed(0)
+        for i in range(0, 1000):
+            plain.update()
+        random.seed(0)
+        for i in range(0, 1000):
+            driven.update()
+        driven.set_event_driven(False)
+
+        self.assertEqual([n._voltage for n in plain.Neurons], [n._voltage for n in driven.Neurons])
+        self.assertEqual([n._lastChangeTimeIC for n in plain.Neurons], [n._lastChangeTimeIC for n in driven.Neurons])
+
+    def test_IntrinsicCurrentTimerWakesNeuron(self):
+        nets = []
+        for i in range(0, 2):
+            net, chain = build_chain(2)
+            chain[0].IntrinsicCurrent = Neuron.ICType_Random
+            chain[0].LIC = [0.5, 1.0, 0.0]
+            chain[0].HIC = [0.1, 0.2]
+            chain[0].HighIC = 1e-6
+            nets.append((net, chain))
+        nets[1][0].set_event_driven(True)
+
+        for net, chain in nets:
+            random.seed(0)
+            for i in range(0, 300):
+                net.update()
+        nets[1][0].set_event_driven(False)
+
+        plain, driven = nets[0][1], nets[1][1]
+        self.assertEqual([n._voltage for n in plain], [n._voltage for n in driven])
+        self.assertEqual([n._lastChangeTimeIC for n in plain], [n._lastChangeTimeIC for n in driven])
+        self.assertTrue(driven[0].Updates < plain[0].Updates)
+
+if __name__ == '__main__':
+    unittest.main()
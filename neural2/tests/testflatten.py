@@ -0,0 +1,63 @@
+#!/usr/bin/env python
+"""SubNet Flattening Test Code"""
+import unittest
+from neuralnet import NeuralNet
+from subnet import SubNet
+from flatten import FlatNet
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+
+def build_subnet(name):
+    sub = SubNet(name)
+    sub_in = sub.Net.add_neuron()
+    sub_in.Name = "in"
+    sub_out = sub.Net.add_neuron()
+    sub_out.Name = "out"
+    sub.Net.add_link(sub_in, sub_out, 1e-6)
+    return sub, sub_in, sub_out
+
+class TestFlatNet(unittest.TestCase):
+    def setUp(self):
+        self.net = net = NeuralNet()
+        self.in1 = net.add_neuron()
+        self.in1.Name = "input"
+        self.sub, self.sub_in, self.sub_out = build_subnet("sub")
+        # nest a second subnet inside the first one, between its output and a new output
+        self.inner, self.inner_in, self.inner_out = build_subnet("inner")
+        self.sub.Net.Neurons.append(self.inner)
+        self.sub_post = self.sub.Net.add_neuron()
+        self.sub_post.Name = "post"
+        self.sub.Net.add_link(self.sub_out, self.inner, 1e-6)
+        self.sub.Net.add_link(self.inner, self.sub_post, 1e-6)
+        net.Neurons.append(self.sub)
+        self.out1 = net.add_neuron()
+        self.out1.Name = "output"
+        net.add_link(self.in1, self.sub, 1e-6)
+        net.add_link(self.sub, self.out1, 1e-6)
+
+    def test_QualifiedNames(self):
+        flat = FlatNet(self.net)
+        self.assertEqual(['input', 'sub/in', 'sub/out', 'sub/inner/in', 'sub/inner/out', 'sub/post', 'output'], flat.Names)
+
+    def test_Links(self):
+        flat = FlatNet(self.net)
+        self.assertEqual([(0, 1), (1, 2), (2, 3), (3, 4), (4, 5), (5, 6)], [(s, t) for s, t, g, l in flat.Links])
+
+    def test_Lookup(self):
+        flat = FlatNet(self.net)
+        self.assertEqual(((self.sub, self.inner), self.inner_out), flat.lookup(4))
+        self.assertEqual(((), self.out1), flat.lookup(6))
+        self.assertEqual(3, flat.index_of(self.inner_in))
+
+    def test_CompiledSubNetsMatchNeuralNet(self):
+        self.in1._sensory_current = 1e-6
+        compiled = self.net.compile()
+        for i in range(0, 5 * _MIN_FREQ_):
+            self.net.update()
+            compiled.update()
+        self.assertTrue(self.out1.get_activity() > 0.0)
+        self.assertEqual([n._voltage for n in FlatNet(self.net).Neurons], compiled._voltage.tolist())
+        self.assertEqual(compiled.index_of('sub/inner/out'), 4)
+
+if __name__ == '__main__':
+    unittest.main()
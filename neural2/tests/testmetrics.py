@@ -0,0 +1,81 @@
+#!/usr/bin/env python
+"""Runtime Metrics Test Code"""
+import unittest
+from tests.fixtures import build_pair
+from metrics import RuntimeMetrics
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+
+class FakeClock(object):
+    def __init__(self):
+        self.Now = 100.0
+
+    def __call__(self):
+        return self.Now
+
+class TestRuntimeMetrics(unittest.TestCase):
+    def test_Gauges(self):
+        clock = FakeClock()
+        metrics = RuntimeMetrics(window=10, clock=clock)
+        self.assertEqual(0.0, metrics.rate())
+        for i in range(0, 20):
+            metrics.step(i % 2)
+            clock.Now += 0.01 if i < 15 else 0.1
+        stats = metrics.stats()
+        self.assertEqual(20, stats['steps'])
+        self.assertEqual(10, stats['changed'])
+        self.assertEqual(1, stats['changed_last'])
+        # the window spans the last nine step intervals, five of 10 ms and four of 100 ms
+        self.assertAlmostEqual(9 / (5 * 0.01 + 4 * 0.1), stats['rate'])
+        self.assertAlmostEqual(5 / 9.0, stats['changed_per_step'])
+
+class TestNetStats(unittest.TestCase):
+    def test_Counters(self):
+        net, source, target = build_pair()
+        calls = []
+        net.set_callback(lambda: calls.append(1))
+        net.set_sensory_current(source, 1e-6)
+        for i in range(0, 5 * _MIN_FREQ_):
+            net.update()
+        stats = net.get_stats()
+        self.assertEqual(5 * _MIN_FREQ_, stats['steps'])
+        self.assertEqual(1, stats['sensor_writes'])
+        self.assertEqual(len(calls), stats['callbacks'])
+        self.assertTrue(0 < len(calls) < 5 * _MIN_FREQ_)
+        self.assertTrue(stats['changed'] >= len(calls))
+        self.assertTrue(stats['rate'] > 0.0)
+        self.assertEqual(0.0, stats['target_rate'])
+        self.assertEqual(0, stats['overruns'])
+        self.assertFalse(stats['running'])
+
+    def test_ChangedCountsMatchAcrossModes(self):
+        counts = []
+        for mode in ('plain', 'event_driven', 'store'):
+            net, source, target = build_pair()
+            if mode == 'event_driven':
+                net.set_event_driven(True)
+            elif mode == 'store':
+                net.attach_store()
+            net.set_sensory_current(source, 1e-6)
+            for i in range(0, 5 * _MIN_FREQ_):
+                net.update()
+            counts.append(net.get_stats()['changed'])
+        self.assertEqual([counts[0]] * 3, counts)
+        self.assertTrue(counts[0] > 0)
+
+    def test_FusedRun(self):
+        net, source, target = build_pair()
+        net.run(_MIN_FREQ_)
+        self.assertEqual(_MIN_FREQ_, net.get_stats()['steps'])
+
+    def test_TargetRate(self):
+        net, source, target = build_pair()
+        net.set_period(0.01)
+        try:
+            self.assertAlmostEqual(100.0, net.get_stats()['target_rate'])
+            self.assertTrue(net.get_stats()['running'])
+        finally:
+            net.set_period(0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,192 @@
+#!/usr/bin/env python
+"""Multi-Rate Update Test Code"""
+import random
+import unittest
+from neuron import Neuron
+from neuralnet import NeuralNet
+from flatten import FlatNet
+from benchmark import generate
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+
+class CountingNeuron(Neuron):
+    Integrations = 0
+
+    def integrate(self, *args):
+        CountingNeuron.Integrations += 1
+        Neuron.integrate(self, *args)
+
+def build_chain(length, cls=Neuron, current=1e-8):
+    net = NeuralNet()
+    chain = [cls('n%d' % i) for i in range(length)]
+    net.Neurons.extend(chain)
+    for source, target in zip(chain[:-1], chain[1:]):
+        net.add_link(source, target, 1e-6)
+    net.set_sensory_current(chain[0], current)
+    return net, chain
+
+def build_mixed(integrator=Neuron.Integrator_Euler):
+    # gated links and intrinsic currents, a SubNet at divisor 3 holding a group
+    # at divisor 2 (6 overall), top level neurons at divisors 2, 4 and 1
+    net = generate(40, fan_in=3, gating_ratio=0.3, ic_share=0.4, seed=2, subnet_depth=1)
+    source, sub, target = net.Neurons
+    net.add_link(source, net.add_neuron(), 1e-8)
+    net.set_update_divisor(sub, 3)
+    sub.Net.set_update_divisor(sub.Net.Neurons[5:15], 2)
+    net.set_update_divisor(source, 2)
+    net.set_update_divisor(target, 4)
+    net.set_timestep(None, integrator)
+    return net
+
+def state(net):
+    return [(n._voltage, n._firingFrequency, n._lastChangeTimeIC, n._inputCurrent) for n in FlatNet(net).Neurons]
+
+class TestUpdateDivisor(unittest.TestCase):
+    def test_DivisorOneIsPlain(self):
+        plain, a = build_chain(5)
+        reset, b = build_chain(5)
+        reset.set_update_divisor(b[2:], 3)
+        reset.set_update_divisor(b[2:], 1)
+        for i in range(0, _MIN_FREQ_):
+            plain.update()
+            reset.update()
+        self.assertEqual(state(plain), state(reset))
+
+    def test_SlowNeuronsUpdateEveryKthStep(self):
+        net, chain = build_chain(3)
+        net.set_update_divisor(chain[2], 4)
+        voltages = []
+        for i in range(0, 4 * _MIN_FREQ_):
+            net.update()
+            voltages.append(chain[2]._voltage)
+        changes = [i for i in range(1, len(voltages)) if voltages[i] != voltages[i - 1]]
+        self.assertTrue(changes)
+        self.assertTrue(all((i + 1) % 4 == 0 for i in changes))
+
+    def test_FewerIntegrations(self):
+        net, chain = build_chain(20, CountingNeuron)
+        net.set_update_divisor(chain[10:], 5)
+        CountingNeuron.Integrations = 0
+        for i in range(0, 5 * _MIN_FREQ_):
+            net.update()
+        self.assertEqual(5 * _MIN_FREQ_ * 10 + _MIN_FREQ_ * 10, CountingNeuron.Integrations)
+
+    def test_InputIsAveraged(self):
+        net = NeuralNet()
+        neuron = net.add_neuron()
+        net.set_update_divisor(neuron, 4)
+        inputs = [1e-8, 3e-8, 0.0, 2e-8]
+        for current in inputs:
+            net.set_sensory_current(neuron, current)
+            net.update()
+        expected = Neuron()
+        expected.integrate(0.0, sum(inputs) / 4, 4 * Neuron.TimeConstant, Neuron.Integrator_Exponential)
+        self.assertEqual(expected._voltage, neuron._voltage)
+        self.assertEqual(0, neuron._inputSteps)
+
+    def test_GroupMatchesLongerTimestep(self):
+        # with a constant input a group at divisor k is the same group stepped exactly at k times the timestep
+        slow, a = build_chain(4, current=2.0 ** -27) # sums to 3x exactly, so the mean is exact
+        slow.set_update_divisor(a, 3)
+        coarse, b = build_chain(4, current=2.0 ** -27)
+        coarse.set_timestep(3 * Neuron.TimeConstant, Neuron.Integrator_Exponential)
+        for i in range(0, _MIN_FREQ_):
+            for j in range(3):
+                slow.update()
+            coarse.update()
+        self.assertEqual([n._voltage for n in b], [n._voltage for n in a])
+        self.assertTrue(a[-1]._voltage != 0.0)
+
+    def test_SlowNeuronsStable(self):
+        # k dt is past forward Euler's 2 C / G from divisor 3 at the default parameters
+        self.assertTrue(3 * Neuron.TimeConstant > 2 * 1e-8 / 5e-7)
+        settled = []
+        for divisor in (1, 3, 4, 8):
+            for store in (False, True):
+                net, chain = build_chain(2, current=5e-15)
+                net.set_update_divisor(chain[1], divisor)
+                if store:
+                    net.attach_store()
+                for i in range(0, 600):
+                    net.update()
+                settled.append((chain[1]._voltage, chain[1].get_activity()))
+        for voltage, activity in settled:
+            self.assertAlmostEqual(settled[0][0], voltage, places=12)
+            self.assertAlmostEqual(settled[0][1], activity, places=9)
+        self.assertTrue(0.0 < settled[0][1] < 1.0)
+
+    def test_SubNetDivisorsMultiply(self):
+        net = build_mixed()
+        divisors = net.get_update_divisors()
+        self.assertEqual([2] + [3] * 5 + [6] * 10 + [3] * 25 + [4, 1], divisors)
+        self.assertEqual(3, net.get_update_divisor(net.Neurons[1]))
+
+    def test_Validation(self):
+        net, chain = build_chain(2)
+        self.assertRaises(ValueError, net.set_update_divisor, chain[0], 0)
+        self.assertRaises(ValueError, net.set_update_divisor, chain[0], 1.5)
+        net.set_update_divisor(chain[0], 2)
+        self.assertRaises(ValueError, net.set_event_driven, True)
+        net.set_update_divisor(chain[0], 1)
+        net.set_event_driven(True)
+        self.assertRaises(ValueError, net.set_update_divisor, chain[0], 2)
+
+    def test_NotMember(self):
+        net = build_mixed()
+        sub = net.Neurons[1]
+        with self.assertRaises(ValueError) as raised:
+            net.set_update_divisor(sub.Net.Neurons[3], 4)
+        self.assertTrue("SubNet 'sub'" in str(raised.exception))
+        self.assertRaises(ValueError, net.set_update_divisor, [net.Neurons[0], Neuron('foreign')], 4)
+        self.assertEqual(2, net.get_update_divisor(net.Neurons[0])) # nothing changed
+        self.assertEqual(1, net.get_update_divisor(sub.Net.Neurons[3]))
+
+    def test_Profiled(self):
+        net, chain = build_chain(3)
+        net.set_update_divisor(chain[1:], 2)
+        net.set_profiling(True)
+        net.update()
+        self.assertEqual(1, net.get_profile()['multirate']['count'])
+
+class TestMultiRateCompiled(unittest.TestCase):
+    def run_paths(self, integrator):
+        nets = [build_mixed(integrator) for i in range(2)]
+        nets[1].attach_store()
+        for net in nets:
+            random.seed(7)
+            for i in range(0, 3 * _MIN_FREQ_):
+                net.update()
+            net.run(2 * _MIN_FREQ_)
+        nets[1].detach_store()
+        return [state(net) for net in nets]
+
+    def test_StoreAndRunMatchObjects(self):
+        plain, store = self.run_paths(Neuron.Integrator_Euler)
+        self.assertEqual(plain, store)
+        self.assertTrue(any(s[0] != 0.0 for s in plain))
+
+    def test_Exponential(self):
+        plain, store = self.run_paths(Neuron.Integrator_Exponential)
+        self.assertEqual(plain, store)
+
+    def test_RunMatchesUpdate(self):
+        nets = [build_mixed() for i in range(2)]
+        random.seed(7)
+        for i in range(0, 3 * _MIN_FREQ_):
+            nets[0].update()
+        random.seed(7)
+        nets[1].run(3 * _MIN_FREQ_)
+        self.assertEqual(state(nets[0]), state(nets[1]))
+
+    def test_BatchMatchesSingle(self):
+        net = build_mixed()
+        compiled = net.compile(batch=2)
+        single = build_mixed().compile()
+        for c in (compiled, single):
+            c.set_seed(5)
+            c.run(3 * _MIN_FREQ_)
+        self.assertEqual(single._voltage.tolist(), compiled._voltage[0].tolist())
+        self.assertEqual(single._inputCurrent.tolist(), compiled._inputCurrent[0].tolist())
+
+if __name__ == '__main__':
+    unittest.main()
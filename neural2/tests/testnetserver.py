@@ -36,12 +36,15 @@ class TestServer(unittest.TestCase):
                        'get_low_threshold',
                        'get_neuron_list',
                        'get_output_list',
+                       'get_profile',
+                       'get_stats',
                        'get_update_period',
                        'get_weight',
                        'load_net',
                        'set_activation',
                        'set_high_threshold',
                        'set_low_threshold',
+                       'set_profiling',
                        'set_update_period',
                        'set_weight',
                        'system.listMethods',
@@ -0,0 +1,68 @@
+#!/usr/bin/env python
+"""Neural Net Server State Test Code"""
+import os
+import unittest
+from neuron import Neuron
+from neuralnet import NeuralNet
+from netserver import NetServerState
+
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+class ThresholdNeuron(Neuron):
+    def __init__(self, name=None):
+        Neuron.__init__(self, name)
+        self.LowThreshold = 1.0
+        self.Updates = 0
+
+    def updateState(self):
+        self.Updates += 1
+        Neuron.updateState(self)
+
+class TestServerState(unittest.TestCase):
+    def setUp(self):
+        self.state = NetServerState()
+        self.state.load_net(_NET_PATH_)
+
+    def test_Profiling(self):
+        self.assertEqual({}, self.state.get_profile())
+        self.assertTrue(self.state.set_profiling(True))
+        self.assertTrue(self.state.update())
+        profile = self.state.get_profile()
+        self.assertEqual(1, profile['total']['count'])
+        self.assertTrue(profile['total']['max'] >= profile['updateState']['max'])
+        self.assertTrue(self.state.set_profiling(False))
+        self.assertEqual({}, self.state.get_profile())
+
+    def test_Stats(self):
+        steps = self.state.get_stats()['steps']
+        self.assertTrue(self.state.update())
+        stats = self.state.get_stats()
+        self.assertEqual(steps + 1, stats['steps'])
+        self.assertEqual(0.0, stats['target_rate'])
+
+    def test_SettersWakeNeurons(self):
+        self.state.Net = NeuralNet()
+        n = ThresholdNeuron('n')
+        self.state.Net.Neurons.extend([n, Neuron('plain')])
+        self.state.Net.set_event_driven(True)
+        for i in range(0, 3):
+            self.state.update()
+        updates = n.Updates
+        self.state.update()
+        self.assertEqual(updates, n.Updates) # at rest, skipped
+        self.assertTrue(self.state.set_low_threshold('n', 0.5))
+        self.state.update()
+        self.assertEqual(updates + 1, n.Updates)
+        self.assertEqual(0.5, self.state.get_low_threshold('n'))
+        self.assertEqual(0.0, self.state.get_high_threshold('plain'))
+        self.assertTrue(self.state.set_high_threshold('plain', 0.5))
+        self.assertEqual(0.5, self.state.get_high_threshold('plain'))
+
+    def test_NoNet(self):
+        state = NetServerState()
+        self.assertEqual({}, state.get_profile())
+        self.assertEqual({}, state.get_stats())
+        self.assertFalse(state.set_profiling(True))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python
+"""NeuronStore Test Code"""
+import os
+import random
+import unittest
+import pickletoxml
+from neuron import Neuron
+from tests.fixtures import build_pair
+from neuralnetio import NeuralNetIO
+from neuronstore import NeuronStore
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+class TestNeuronStore(unittest.TestCase):
+    def test_ViewsWriteThrough(self):
+        net, source, target = build_pair()
+        store = NeuronStore(net.Neurons)
+        source._sensory_current = 1e-6
+        target.Gain = 500
+        self.assertEqual(1e-6, store._sensory_current[0])
+        self.assertEqual(500, store.Gain[1])
+        store._voltage[1] = 0.25
+        self.assertEqual(0.25, target._voltage)
+        self.assertTrue(isinstance(target, Neuron))
+
+    def test_DetachRestoresNeurons(self):
+        net, source, target = build_pair()
+        store = NeuronStore(net.Neurons)
+        target.LIC = [0.1, 0.2, 0.3]
+        store._firingFrequency[1] = 0.5
+        store.detach()
+        self.assertTrue(type(target) is Neuron)
+        self.assertEqual(None, target._store)
+        self.assertEqual([0.1, 0.2, 0.3], target.LIC)
+        self.assertEqual(0.5, target.get_activity())
+
+    def test_NeuronInOneStoreOnly(self):
+        net, source, target = build_pair()
+        NeuronStore(net.Neurons)
+        self.assertRaises(NeuronStore.StoreError, NeuronStore, [source])
+
+    def test_PickleAttached(self):
+        net, source, target = build_pair()
+        net.attach_store()
+        target.ThresholdVoltage = -0.004
+        copy = pickletoxml.unpickle(pickletoxml.pickle(net))
+        self.assertTrue(type(copy.Neurons[1]) is Neuron)
+        self.assertEqual(-0.004, copy.Neurons[1].ThresholdVoltage)
+        self.assertEqual(1e-6, copy.Neurons[1].Incoming[0].Weight)
+
+    def test_SensoryCurrentReachesKernel(self):
+        net, source, target = build_pair()
+        net.attach_store()
+        net.set_sensory_current(source, 1e-6)
+        for i in range(0, 5 * _MIN_FREQ_):
+            net.update()
+        self.assertTrue(target.get_activity() > 0.0)
+
+    def test_InvalidateAfterAddNeuron(self):
+        net, source, target = build_pair()
+        net.attach_store()
+        net.update()
+        extra = net.add_neuron()
+        net.add_link(target, extra, 1e-6)
+        net.set_sensory_current(source, 1e-6)
+        for i in range(0, 10 * _MIN_FREQ_):
+            net.update()
+        self.assertTrue(extra is net.get_store().Neurons[2])
+        self.assertTrue(extra.get_activity() > 0.0)
+
+    def test_MatchesPlainUpdate(self):
+        stream = NeuralNetIO()
+        plain = stream.read(_NET_PATH_)
+        stored = stream.read(_NET_PATH_)
+        stored.attach_store()
+
+        random.seed(0)
+        for i in range(0, 1000):
+            plain.update()
+        random.seed(0)
+        for i in range(0, 1000):
+            stored.update()
+        stored.detach_store()
+
+        self.assertEqual([n._voltage for n in plain.Neurons], [n._voltage for n in stored.Neurons])
+        self.assertEqual([n._firingFrequency for n in plain.Neurons], [n._firingFrequency for n in stored.Neurons])
+
+if __name__ == '__main__':
+    unittest.main()
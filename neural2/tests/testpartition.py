@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""Partitioned Stepping Test Code"""
+import multiprocessing
+import threading
+import time
+import unittest
+from multiprocessing import shared_memory
+from neuron import Neuron
+from neuralnet import NeuralNet
+from partition import partition_graph, cut_links, link_edges, PartitionedNet
+from benchmark import generate
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+
+def build_net():
+    net = generate(120, fan_in=3, gating_ratio=0.2, ic_share=0.3, seed=4)
+    net.set_timestep(None, Neuron.Integrator_Exponential)
+    net.set_update_divisor(net.Neurons[30:50], 3)
+    return net
+
+class TestPartitionGraph(unittest.TestCase):
+    def test_Balanced(self):
+        edges = [(i, (i * 7 + 3) % 100) for i in range(100)]
+        assign = partition_graph(100, edges, 4)
+        sizes = [assign.count(p) for p in range(4)]
+        self.assertEqual(100, sum(sizes))
+        self.assertTrue(all(24 <= s <= 27 for s in sizes))
+
+    def test_ClustersAreNotCut(self):
+        # two rings joined by a single link, split into two
+        edges = [(i, (i + 1) % 10) for i in range(10)] + [(10 + i, 10 + (i + 1) % 10) for i in range(10)] + [(0, 10)]
+        assign = partition_graph(20, edges, 2)
+        self.assertEqual(1, cut_links(assign, edges))
+
+    def test_FewerCutsThanRoundRobin(self):
+        net = build_net()
+        edges = link_edges(net.compile())
+        assign = partition_graph(120, edges, 4)
+        self.assertTrue(cut_links(assign, edges) < cut_links([i % 4 for i in range(120)], edges))
+
+    def test_MorePartsThanVertices(self):
+        self.assertEqual([0, 1], partition_graph(2, [(0, 1)], 8))
+        self.assertEqual([], partition_graph(0, [], 2))
+
+class TestPartitionedNet(unittest.TestCase):
+    def test_MatchesCompiled(self):
+        net = build_net()
+        compiled = net.compile()
+        compiled.set_seed(0)
+        for i in range(0, 3 * _MIN_FREQ_):
+            compiled.update()
+        with net.partition(3) as parted:
+            self.assertEqual(3, len(parted.Rows))
+            self.assertTrue(parted.step(3 * _MIN_FREQ_) > 0)
+            self.assertEqual(compiled._firingFrequency.tolist(), parted.get_activity().tolist())
+            parted.write_state()
+        self.assertEqual(compiled._voltage.tolist(), parted.Compiled._voltage.tolist())
+        self.assertEqual(compiled._icDraws.tolist(), parted.Compiled._icDraws.tolist())
+        self.assertEqual(compiled._voltage.tolist(), [n._voltage for n in net.Neurons])
+
+    def test_SensoryCurrent(self):
+        net = NeuralNet()
+        chain = [net.add_neuron() for i in range(6)]
+        for source, target in zip(chain[:-1], chain[1:]):
+            net.add_link(source, target, 1e-6)
+        with net.partition(2) as parted:
+            parted.step(_MIN_FREQ_)
+            self.assertEqual(0.0, parted.get_activity().max())
+            parted.set_sensory_current(chain[0], 1e-8)
+            parted.step(_MIN_FREQ_)
+            self.assertTrue(parted.get_activity()[-1] > 0.0)
+            self.assertEqual(1, parted.CutLinks)
+
+    def test_Spawned(self):
+        net = build_net()
+        compiled = net.compile()
+        compiled.set_seed(0)
+        for i in range(0, _MIN_FREQ_):
+            compiled.update()
+        with PartitionedNet(net.compile(), 2, context=multiprocessing.get_context('spawn')) as parted:
+            parted.step(_MIN_FREQ_)
+            self.assertEqual(compiled._firingFrequency.tolist(), parted.get_activity().tolist())
+
+    def test_WorkersDied(self):
+        parted = build_net().partition(2)
+        for process in multiprocessing.active_children():
+            process.kill()
+            process.join()
+        self.assertRaises(PartitionedNet.PartitionError, parted.step)
+        parted.close() # no BrokenPipeError, and the shared memory is freed
+
+    def test_OneWorkerDied(self):
+        parted = build_net().partition(2)
+        name = parted._PartitionedNet__memory.name
+        parted.step(_MIN_FREQ_)
+        killer = threading.Timer(0.2, parted._PartitionedNet__workers[1][0].kill) # mid step
+        killer.start()
+        start = time.monotonic()
+        self.assertRaises(PartitionedNet.PartitionError, parted.step, 10 ** 9)
+        killer.join()
+        self.assertRaises(PartitionedNet.PartitionError, parted.write_state)
+        parted.close() # the survivor stops rather than waiting at the barrier
+        self.assertTrue(time.monotonic() - start < PartitionedNet.JoinTimeout)
+        self.assertFalse(any(p.is_alive() for p in multiprocessing.active_children()))
+        self.assertRaises(FileNotFoundError, shared_memory.SharedMemory, name=name)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""PickleToXML Slotted Class Test Code"""
+import os
+import sys
+import unittest
+from xml.dom.minidom import parseString
+import pickletoxml
+from neuron import Neuron
+from link import Link
+from subnet import SubNet
+from neuralnet import NeuralNet
+from neuralnetio import NeuralNetIO
+
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+class TestSlottedPickle(unittest.TestCase):
+    def test_NoInstanceDict(self):
+        self.assertFalse(hasattr(Link(), '__dict__'))
+        self.assertEqual({}, Neuron().__dict__)
+        self.assertEqual({}, SubNet().__dict__)
+
+    def test_NeuronTakesOtherAttributes(self):
+        n = Neuron()
+        n.LowThreshold = -1.0
+        self.assertEqual(-1.0, n.LowThreshold)
+        self.assertEqual({'LowThreshold': -1.0}, n.__dict__)
+
+    def test_ReadsOlderNeuronFiles(self):
+        # the saved test nets carry LowThreshold, HighThreshold and Activation,
+        # written from the neural package this tree imports as flat modules
+        for name in ('test.pickle.xml', 'test2.pickle.xml', 'test3.pickle.xml'):
+            with open(os.path.join(os.path.dirname(__file__), '..', name)) as f:
+                text = f.read().replace('module="neural.', 'module="')
+            net = pickletoxml.unpickle(parseString(text).documentElement)
+            self.assertTrue(len(net.Neurons) > 0)
+            self.assertEqual(1.0, net.Neurons[0].LowThreshold)
+
+    def test_RoundTrip(self):
+        net = NeuralNet()
+        n1 = net.add_neuron()
+        n2 = net.add_neuron()
+        n2.Gain = 50.0
+        lnk = net.add_link(n1, n2, -0.5)
+        lnk.GateSource = n1
+        lnk.GateType = Link.GateType_Modulation
+
+        copy = pickletoxml.unpickle(pickletoxml.pickle(net))
+        c1, c2 = copy.Neurons
+        self.assertEqual(50.0, c2.Gain)
+        self.assertTrue(c1.Outgoing[0] is c2.Incoming[0])
+        self.assertEqual(-0.5, c2.Incoming[0].Weight)
+        self.assertTrue(c2.Incoming[0].GateSource is c1)
+        self.assertEqual(Link.GateType_Modulation, c2.Incoming[0].GateType)
+        self.assertFalse(hasattr(n1, '__pickle_reference_id__'))
+
+    def test_ReadsFilesWithLinkConstants(self):
+        # older files pickled Link.GateType_Gate / GateType_Modulation with every link
+        net = NeuralNetIO().read(_NET_PATH_)
+        self.assertEqual(78, len(net.Neurons))
+        self.assertEqual(Link.GateType_Gate, Link().GateType)
+
+    def test_FailedPickleCleansUp(self):
+        net = NeuralNet()
+        chain = [net.add_neuron() for i in range(0, 100)]
+        for source, target in zip(chain[:-1], chain[1:]):
+            net.add_link(source, target)
+        limit = sys.getrecursionlimit()
+        sys.setrecursionlimit(100)
+        try:
+            self.assertRaises(RecursionError, pickletoxml.pickle, net)
+        finally:
+            sys.setrecursionlimit(limit)
+        self.assertFalse(any(hasattr(n, '__pickle_reference_id__') for n in chain))
+        copy = pickletoxml.unpickle(pickletoxml.pickle(net)) # written in full, not as references
+        self.assertTrue(copy.Neurons[-1].Incoming[0].Source is copy.Neurons[-2])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,102 @@
+#!/usr/bin/env python
+"""Update Profiling Test Code"""
+import unittest
+from neuralnet import NeuralNet
+from subnet import SubNet
+from profiler import RollingHistogram
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+
+class FakeClock(object):
+    def __init__(self):
+        self.Now = 0.0
+
+    def __call__(self):
+        self.Now += 0.001 # every reading is a millisecond after the last
+        return self.Now
+
+def build_net():
+    net = NeuralNet()
+    source = net.add_neuron()
+    sub = SubNet('sub')
+    sub_in = sub.Net.add_neuron()
+    sub_out = sub.Net.add_neuron()
+    sub.Net.add_link(sub_in, sub_out, 1e-6)
+    net.Neurons.append(sub)
+    target = net.add_neuron()
+    net.add_link(source, sub, 1e-6)
+    net.add_link(sub, target, 1e-6)
+    net.set_sensory_current(source, 1e-6)
+    return net, source, target
+
+class TestRollingHistogram(unittest.TestCase):
+    def test_Summary(self):
+        histogram = RollingHistogram(window=100)
+        for i in range(1, 201):
+            histogram.add(i * 0.001)
+        stats = histogram.summary()
+        self.assertEqual(200, stats['count'])
+        self.assertEqual(100, stats['window'])
+        self.assertAlmostEqual(0.101, stats['min'])
+        self.assertAlmostEqual(0.2, stats['max'])
+        self.assertAlmostEqual(0.151, stats['p50'])
+        self.assertAlmostEqual(0.2, stats['p99'])
+        self.assertAlmostEqual(0.1505, stats['mean'])
+
+    def test_Empty(self):
+        self.assertEqual({'count': 0, 'window': 0}, RollingHistogram().summary())
+
+    def test_Buckets(self):
+        histogram = RollingHistogram()
+        for s in [0.0005, 0.002, 0.003, 0.5]:
+            histogram.add(s)
+        self.assertEqual([1, 2, 1], histogram.buckets([0.0, 0.001, 0.01]))
+
+class TestNetProfiling(unittest.TestCase):
+    def test_DisabledByDefault(self):
+        net, source, target = build_net()
+        net.update()
+        self.assertEqual({}, net.get_profile())
+
+    def test_Phases(self):
+        net, source, target = build_net()
+        calls = []
+        net.set_callback(lambda: calls.append(1))
+        net.set_profiling(True)
+        net._NeuralNet__profiler.Clock = FakeClock()
+        for i in range(0, 5 * _MIN_FREQ_):
+            net.update()
+        profile = net.get_profile()
+        self.assertEqual(set(['updateState', 'changeState', 'publish', 'subnet/sub', 'callback', 'total']), set(profile.keys()))
+        self.assertEqual(5 * _MIN_FREQ_, profile['total']['count'])
+        self.assertEqual(len(calls), profile['callback']['count'])
+        # the subnet is timed inside both neuron passes
+        self.assertAlmostEqual(0.002, profile['subnet/sub']['mean'])
+        self.assertAlmostEqual(0.003, profile['updateState']['min'])
+
+    def test_MatchesUnprofiled(self):
+        plain, a, b = build_net()
+        profiled, c, d = build_net()
+        profiled.set_profiling(True)
+        for i in range(0, 5 * _MIN_FREQ_):
+            plain.update()
+            profiled.update()
+        self.assertTrue(b.get_activity() > 0.0)
+        self.assertEqual(b.get_activity(), d.get_activity())
+        self.assertEqual(plain.get_snapshot().Activity, profiled.get_snapshot().Activity)
+
+    def test_OtherModes(self):
+        net, source, target = build_net()
+        net.set_profiling(True)
+        net.set_event_driven(True)
+        net.update()
+        self.assertEqual(1, net.get_profile()['event_driven']['count'])
+        net.set_event_driven(False)
+        net.attach_store()
+        net.update()
+        self.assertEqual(1, net.get_profile()['store']['count'])
+        net.set_profiling(False)
+        self.assertEqual({}, net.get_profile())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""NeuralNet.run Test Code"""
+import os
+import random
+import unittest
+import numpy as np
+from neuralnet import NeuralNet
+from neuralnetio import NeuralNetIO
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+def build_chain(length):
+    net = NeuralNet()
+    chain = [net.add_neuron() for i in range(length)]
+    for source, target in zip(chain[:-1], chain[1:]):
+        net.add_link(source, target, 1e-6)
+    return net, chain
+
+class TestRun(unittest.TestCase):
+    def test_MatchesUpdate(self):
+        stream = NeuralNetIO()
+        stepped = stream.read(_NET_PATH_)
+        run = stream.read(_NET_PATH_)
+
+        random.seed(0)
+        expected = []
+        for i in range(0, 600):
+            stepped.update()
+            expected.append([n.get_activity() for n in stepped.Neurons])
+        random.seed(0)
+        trace = run.run(600)
+
+        self.assertEqual((600, len(run.Neurons)), trace.shape)
+        self.assertEqual(expected, trace.tolist())
+        self.assertEqual([n._voltage for n in stepped.Neurons], [n._voltage for n in run.Neurons])
+
+    def test_RecordByName(self):
+        net, chain = build_chain(3)
+        chain[0]._sensory_current = 1e-6
+        trace = net.run(5 * _MIN_FREQ_, record=[chain[2].Name, 0])
+        self.assertEqual((5 * _MIN_FREQ_, 2), trace.shape)
+        self.assertEqual(chain[2].get_activity(), trace[-1, 0])
+        self.assertEqual(chain[0].get_activity(), trace[-1, 1])
+
+    def test_SensorArray(self):
+        net, chain = build_chain(2)
+        sensors = np.zeros((4 * _MIN_FREQ_, 1))
+        sensors[_MIN_FREQ_:] = 1e-6
+        trace = net.run(len(sensors), record=[0], sensors=sensors, sense=[chain[0]])
+        self.assertEqual(0.0, trace[_MIN_FREQ_ - 1, 0])
+        self.assertTrue(trace[-1, 0] > 0.0)
+        self.assertEqual(1e-6, chain[0]._sensory_current)
+
+    def test_SensorCallable(self):
+        net, chain = build_chain(2)
+        seen = []
+        def sensors(step, activity):
+            seen.append(step)
+            return [1e-6] if step == 0 else None
+        trace = net.run(_MIN_FREQ_, sensors=sensors, sense=[0])
+        self.assertEqual(list(range(_MIN_FREQ_)), seen)
+        self.assertTrue(trace[-1, 0] > 0.0)
+
+    def test_CallbackOnce(self):
+        net, chain = build_chain(2)
+        calls = []
+        net.set_callback(lambda: calls.append(1))
+        chain[0]._sensory_current = 1e-6
+        net.run(5 * _MIN_FREQ_)
+        self.assertEqual(1, len(calls))
+
+    def test_StoreAttached(self):
+        net, chain = build_chain(3)
+        net.attach_store()
+        net.set_sensory_current(chain[0], 1e-6)
+        trace = net.run(5 * _MIN_FREQ_, record=[2])
+        self.assertEqual(net.get_store()._firingFrequency[2], trace[-1, 0])
+        self.assertTrue(trace[-1, 0] > 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
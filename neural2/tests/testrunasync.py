@@ -0,0 +1,57 @@
+#!/usr/bin/env python
+"""NeuralNet.run_async Test Code"""
+import asyncio
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from tests.fixtures import build_pair
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+
+class TestRunAsync(unittest.TestCase):
+    def test_Steps(self):
+        net, source, target = build_pair(1e-6)
+        seen = []
+        count = asyncio.run(net.run_async(steps=5 * _MIN_FREQ_, on_step=seen.append))
+        self.assertEqual(5 * _MIN_FREQ_, count)
+        self.assertEqual(list(range(1, count + 1)), seen)
+        self.assertTrue(target.get_activity() > 0.0)
+
+    def test_CoroutineCallbackAndExecutor(self):
+        net, source, target = build_pair(1e-6)
+        seen = []
+        async def on_step(step):
+            seen.append(step)
+        with ThreadPoolExecutor(1) as executor:
+            asyncio.run(net.run_async(steps=_MIN_FREQ_, on_step=on_step, executor=executor))
+        self.assertEqual(_MIN_FREQ_, len(seen))
+
+    def test_NetsShareLoop(self):
+        nets = [build_pair(1e-6) for i in range(0, 3)]
+        async def main():
+            return await asyncio.gather(*[net.run_async(rate=200, steps=_MIN_FREQ_) for net, s, t in nets])
+        start = time.monotonic()
+        self.assertEqual([_MIN_FREQ_] * 3, asyncio.run(main()))
+        # interleaved on one loop, not one after another
+        self.assertTrue(time.monotonic() - start < 2.5 * _MIN_FREQ_ / 200.0)
+
+    def test_StopAndCancel(self):
+        net, source, target = build_pair(1e-6)
+        def on_step(step):
+            if step == _MIN_FREQ_:
+                net.stop()
+        self.assertEqual(_MIN_FREQ_, asyncio.run(net.run_async(on_step=on_step)))
+
+        async def cancelled():
+            task = asyncio.ensure_future(net.run_async(rate=100))
+            await asyncio.sleep(0.05)
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
+        asyncio.run(cancelled())
+        self.assertEqual(_MIN_FREQ_, asyncio.run(net.run_async(steps=_MIN_FREQ_))) # not left running
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+"""RateScheduler Test Code"""
+import time
+import unittest
+from neuralnet import NeuralNet
+from scheduler import RateScheduler
+
+class FakeClock(object):
+    def __init__(self):
+        self.Now = 100.0
+
+    def __call__(self):
+        return self.Now
+
+class TestRateScheduler(unittest.TestCase):
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def scheduler(self, policy):
+        scheduler = RateScheduler(0.1, policy, burst_limit=5, clock=self.clock)
+        scheduler.start()
+        return scheduler
+
+    def test_ComputeTimeIsAbsorbed(self):
+        scheduler = self.scheduler(RateScheduler.Skip)
+        self.clock.Now += 0.03 # update took 30ms
+        self.assertAlmostEqual(0.07, scheduler.tick())
+        self.clock.Now += 0.07 + 0.05
+        self.assertAlmostEqual(0.05, scheduler.tick())
+        self.assertEqual(0, scheduler.Overruns)
+
+    def test_Skip(self):
+        scheduler = self.scheduler(RateScheduler.Skip)
+        self.clock.Now += 0.35
+        self.assertAlmostEqual(0.05, scheduler.tick())
+        self.assertEqual(1, scheduler.Overruns)
+        self.assertEqual(3, scheduler.Skipped)
+
+    def test_Burst(self):
+        scheduler = self.scheduler(RateScheduler.Burst)
+        self.clock.Now += 0.35
+        self.assertEqual(0.0, scheduler.tick()) # deadline 100.1
+        self.assertEqual(0.0, scheduler.tick()) # deadline 100.2
+        self.assertEqual(0.0, scheduler.tick()) # deadline 100.3
+        self.assertAlmostEqual(0.05, scheduler.tick())
+        self.assertEqual(3, scheduler.Overruns)
+
+    def test_BurstLimit(self):
+        scheduler = self.scheduler(RateScheduler.Burst)
+        self.clock.Now += 2.0
+        self.assertEqual(0.0, scheduler.tick())
+        self.assertAlmostEqual(0.1, scheduler.tick()) # re-anchored at now
+
+    def test_Slow(self):
+        scheduler = self.scheduler(RateScheduler.Slow)
+        self.clock.Now += 0.35
+        self.assertEqual(0.0, scheduler.tick())
+        self.assertAlmostEqual(0.1, scheduler.tick())
+        self.assertEqual(1, scheduler.Overruns)
+
+    def test_UnknownPolicy(self):
+        self.assertRaises(RateScheduler.PolicyError, RateScheduler, 0.1, 'bogus')
+
+class TestNeuralNetRate(unittest.TestCase):
+    def test_RateHeld(self):
+        net = NeuralNet()
+        net.add_neuron()
+        updates = []
+        net.update = lambda: updates.append(time.monotonic())
+        net.set_period(0.01)
+        time.sleep(0.5)
+        net.set_period(0)
+        # 50 due.  With 0.1 s sleep slices plus compute time this used to be about 5; only
+        # a lower bound, a loaded machine can delay the thread but the deadlines keep it
+        # from running ahead (covered with a fake clock above)
+        self.assertTrue(len(updates) >= 20, len(updates))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""NeuralNet Snapshot Test Code"""
+import random
+import time
+import unittest
+from tests.fixtures import build_pair
+from benchmark import generate
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+
+class TestSnapshot(unittest.TestCase):
+    def test_PublishedEachStep(self):
+        net, source, target = build_pair()
+        net.set_sensory_current(source, 1e-6)
+        for i in range(0, 5 * _MIN_FREQ_):
+            net.update()
+        snapshot = net.get_snapshot()
+        self.assertEqual(5 * _MIN_FREQ_, snapshot.Step)
+        self.assertEqual((source.Name, target.Name), snapshot.Names)
+        self.assertEqual(target.get_activity(), snapshot.get(target.Name))
+        self.assertTrue(snapshot.get(target.Name) > 0.0)
+        self.assertEqual(0.0, snapshot.get('bogus'))
+
+    def test_Immutable(self):
+        net, source, target = build_pair()
+        net.set_sensory_current(source, 1e-6)
+        net.update()
+        before = net.get_snapshot()
+        values = list(before.items())
+        for i in range(0, 5 * _MIN_FREQ_):
+            net.update()
+        self.assertEqual(values, list(before.items()))
+        self.assertNotEqual(values, list(net.get_snapshot().items()))
+
+    def test_UnchangedFramesShareActivity(self):
+        net, source, target = build_pair()
+        net.update()
+        first = net.get_snapshot()
+        net.update()
+        self.assertTrue(first.Activity is net.get_snapshot().Activity)
+
+    def test_PokesVisibleWhenStopped(self):
+        net, source, target = build_pair()
+        net.update()
+        target._firingFrequency = target._nextFiringFrequency = 0.5
+        net.wake(target)
+        self.assertEqual(0.5, net.get_snapshot().get(target.Name))
+
+    def test_TopologyChange(self):
+        net, source, target = build_pair()
+        net.update()
+        extra = net.add_neuron()
+        net.update()
+        self.assertEqual(3, len(net.get_snapshot()))
+        self.assertEqual(extra.Name, net.get_snapshot().Names[-1])
+
+    def test_UnreadStepsBuildNoFrames(self):
+        net, source, target = build_pair()
+        net.set_sensory_current(source, 1e-6)
+        for i in range(0, _MIN_FREQ_):
+            net.update()
+        self.assertEqual((), net._NeuralNet__snapshot.Activity)
+        snapshot = net.get_snapshot()
+        self.assertEqual(_MIN_FREQ_, snapshot.Step)
+        self.assertEqual(target.get_activity(), snapshot.get(target.Name))
+        net.update()
+        self.assertEqual(_MIN_FREQ_ + 1, net._NeuralNet__snapshot.Step) # published once read
+
+    def test_StoreMatchesObjects(self):
+        net = generate(30, fan_in=3, ic_share=0.4, seed=3, subnet_depth=1)
+        plain = generate(30, fan_in=3, ic_share=0.4, seed=3, subnet_depth=1)
+        net.attach_store()
+        for n in (net, plain):
+            n.set_sensory_current(n.Neurons[0], 1e-6)
+            n.get_snapshot()
+            random.seed(4)
+            for i in range(0, _MIN_FREQ_):
+                n.update()
+        self.assertEqual(plain.get_snapshot().Activity, net.get_snapshot().Activity)
+        self.assertEqual(tuple(n.get_activity() for n in net.Neurons), net.get_snapshot().Activity)
+        self.assertTrue(any(net.get_snapshot().Activity))
+        net.add_neuron()
+        net.update()
+        self.assertEqual(len(net.Neurons), len(net.get_snapshot().Activity))
+
+    def test_ReadWhileRunning(self):
+        net, source, target = build_pair()
+        net.set_sensory_current(source, 1e-6)
+        net.set_period(0.001)
+        steps = []
+        deadline = time.monotonic() + 0.2
+        while time.monotonic() < deadline:
+            snapshot = net.get_snapshot()
+            steps.append(snapshot.Step)
+            self.assertEqual(len(snapshot.Names), len(snapshot.Activity))
+        net.set_period(0)
+        self.assertEqual(sorted(steps), steps)
+        self.assertTrue(steps[-1] > 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,34 @@
+#!/usr/bin/env python
+"""Parameter Sweep Test Code"""
+import os
+import unittest
+from neuralnetio import NeuralNetIO
+from sweep import sweep, expand_grid, _run
+
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+class TestSweep(unittest.TestCase):
+    def test_ExpandGrid(self):
+        runs = expand_grid({'Gain': [1, 2], 'LC.ThresholdVoltage': [0.1, 0.2, 0.3]})
+        self.assertEqual(6, len(runs))
+        self.assertEqual({'Gain': 1, 'LC.ThresholdVoltage': 0.1}, runs[0])
+        self.assertEqual({'Gain': 2, 'LC.ThresholdVoltage': 0.3}, runs[-1])
+
+    def test_UnknownParameter(self):
+        self.assertRaises(ValueError, sweep, _NET_PATH_, {'Bogus': [1]}, 10)
+
+    def test_UnknownNeuron(self):
+        self.assertRaises(KeyError, sweep, _NET_PATH_, {'Bogus.Gain': [1]}, 10)
+
+    def test_SweepMatchesSingleRuns(self):
+        grid = {'LC.Gain': [50.0, 100.0], 'MembraneConductance': [1e-7, 5e-7]}
+        results = sweep(_NET_PATH_, grid, 120, seed=1, max_workers=2)
+        self.assertEqual(4, len(results))
+
+        compiled = NeuralNetIO().read(_NET_PATH_).compile()
+        for params, metrics in results:
+            self.assertEqual(_run(compiled, params, 120, {}, 1), metrics)
+        self.assertNotEqual(results[0][1], results[-1][1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+"""Per Net Timestep and Exponential Integrator Test Code"""
+import math
+import os
+import random
+import unittest
+from neuron import Neuron
+from neuralnet import NeuralNet
+from neuralnetio import NeuralNetIO
+from flatten import FlatNet
+
+_MIN_FREQ_ = 10 # default min ticks to run tests for
+_NET_PATH_ = os.path.join(os.path.dirname(__file__), '..', 'nets', 'nerve_sim_layout_1.net')
+
+def build_single(current=1e-8):
+    net = NeuralNet()
+    neuron = net.add_neuron()
+    net.set_sensory_current(neuron, current)
+    return net, neuron
+
+def voltages(net):
+    return [n._voltage for n in FlatNet(net).Neurons]
+
+class TestIntegrator(unittest.TestCase):
+    def test_DefaultIsEuler(self):
+        nets = [build_single(), build_single()]
+        nets[1][0].set_timestep(Neuron.TimeConstant, Neuron.Integrator_Euler)
+        for net, neuron in nets:
+            for i in range(0, _MIN_FREQ_):
+                net.update()
+        self.assertEqual(nets[0][1]._voltage, nets[1][1]._voltage)
+        self.assertEqual((Neuron.TimeConstant, Neuron.Integrator_Euler), nets[0][0].get_timestep())
+
+    def test_ExponentialIsExact(self):
+        dt = 4 * Neuron.TimeConstant # well past the Euler stability limit of 2 C / G = 40 ms
+        exact, a = build_single()
+        exact.set_timestep(dt, Neuron.Integrator_Exponential)
+        euler, b = build_single()
+        euler.set_timestep(dt)
+        tau = a.MembraneCapacitance / a.MembraneConductance
+        v_inf = 1e-8 / a.MembraneConductance
+        for i in range(1, _MIN_FREQ_ + 1):
+            exact.update()
+            euler.update()
+            expected = v_inf * (1.0 - math.exp(-i * dt / tau))
+            self.assertAlmostEqual(expected, a._voltage, delta=1e-12)
+        self.assertTrue(abs(b._voltage - v_inf) > 10 * v_inf) # Euler diverges at this step
+
+    def test_ZeroConductance(self):
+        net, neuron = build_single()
+        neuron.MembraneConductance = 0.0
+        net.set_timestep(None, Neuron.Integrator_Exponential)
+        net.update()
+        self.assertAlmostEqual(1e-8 / neuron.MembraneCapacitance * Neuron.TimeConstant, neuron._voltage)
+
+    def test_Validation(self):
+        net, neuron = build_single()
+        self.assertRaises(ValueError, net.set_timestep, 0.0)
+        self.assertRaises(ValueError, net.set_timestep, None, 'rk4')
+
+class TestCompiledTimestep(unittest.TestCase):
+    def run_net(self, mode, dt, integrator):
+        net = NeuralNetIO().read(_NET_PATH_)
+        net.set_timestep(dt, integrator)
+        for n in net.Neurons[:3]:
+            net.set_sensory_current(n, 2e-8)
+        if mode == 'event_driven':
+            net.set_event_driven(True)
+        elif mode == 'store':
+            net.attach_store()
+        random.seed(1)
+        if mode == 'compiled':
+            net.run(30 * _MIN_FREQ_)
+        else:
+            for i in range(0, 30 * _MIN_FREQ_):
+                net.update()
+        return voltages(net)
+
+    def test_ModesMatch(self):
+        for dt, integrator in ((0.05, Neuron.Integrator_Exponential), (0.01, Neuron.Integrator_Euler)):
+            plain = self.run_net('plain', dt, integrator)
+            self.assertTrue(any(v != 0.0 for v in plain))
+            for mode in ('event_driven', 'store', 'compiled'):
+                self.assertEqual(plain, self.run_net(mode, dt, integrator), (mode, dt, integrator))
+
+    def test_NetsKeepTheirOwnTimestep(self):
+        slow, a = build_single()
+        fast, b = build_single()
+        for n, net in ((a, slow), (b, fast)):
+            n.IntrinsicCurrent = Neuron.ICType_VInf
+            n.LIC = [1.0, 100.0, 0.0]
+            net.invalidate()
+        fast.set_timestep(0.1, Neuron.Integrator_Exponential)
+        for i in range(0, _MIN_FREQ_):
+            slow.update()
+            fast.update()
+        self.assertAlmostEqual(_MIN_FREQ_ * Neuron.TimeConstant, a._lastChangeTimeIC)
+        self.assertAlmostEqual(_MIN_FREQ_ * 0.1, b._lastChangeTimeIC)
+
+if __name__ == '__main__':
+    unittest.main()
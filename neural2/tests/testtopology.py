@@ -0,0 +1,175 @@
+#!/usr/bin/env python
+"""NeuralNet Topology Index Test Code"""
+import time
+import unittest
+from neuron import Neuron
+from link import Link
+from neuralnet import NeuralNet
+from subnet import SubNet
+
+class TestTopologyIndex(unittest.TestCase):
+    def setUp(self):
+        self.net = NeuralNet()
+        self.a = self.net.add_neuron()
+        self.b = self.net.add_neuron()
+        self.c = self.net.add_neuron()
+
+    def test_UniqueNames(self):
+        self.assertEqual(['neuron', 'neuron-2', 'neuron-3'], [n.Name for n in self.net.Neurons])
+        self.assertTrue(self.net.lookup_neuron_by_name('neuron-2') is self.b)
+        self.assertEqual(None, self.net.lookup_neuron_by_name('bogus'))
+
+    def test_RenameNeuron(self):
+        self.assertEqual('LC', self.net.rename_neuron(self.a, 'LC'))
+        self.assertEqual('LC-2', self.net.rename_neuron(self.b, 'LC'))
+        self.assertEqual('LC', self.net.rename_neuron(self.a, 'LC')) # keeps its own name
+        self.assertTrue(self.net.lookup_neuron_by_name('LC-2') is self.b)
+        self.assertEqual(None, self.net.lookup_neuron_by_name('neuron'))
+        self.assertEqual('neuron', self.net.get_unique_name('neuron'))
+
+    def test_DirectRename(self):
+        self.a.Name = 'direct'
+        self.assertEqual(None, self.net.lookup_neuron_by_name('neuron'))
+        self.assertTrue(self.net.lookup_neuron_by_name('direct') is self.a)
+        self.assertEqual('direct-2', self.net.get_unique_name('direct'))
+        self.net.add_neuron() # indexed, then renamed directly again
+        self.b.Name = 'again'
+        self.assertTrue(self.net.lookup_neuron_by_name('again') is self.b)
+
+    def test_FreedNamesReused(self):
+        self.net.remove_neuron(self.b)
+        self.assertEqual('neuron-2', self.net.add_neuron().Name)
+        self.assertEqual('neuron-4', self.net.add_neuron().Name)
+        self.net.rename_neuron(self.c, 'LC')
+        self.assertEqual('neuron-3', self.net.add_neuron().Name)
+
+    def test_InputsAndOutputs(self):
+        self.net.add_link(self.a, self.b)
+        link = self.net.add_link(self.b, self.c)
+        self.assertEqual([self.a], self.net.get_input_neurons())
+        self.assertEqual([self.c], self.net.get_output_neurons())
+        self.net.remove_link(link)
+        self.assertEqual([self.a, self.c], self.net.get_input_neurons())
+        self.assertEqual([self.b, self.c], self.net.get_output_neurons())
+        self.net.remove_neuron(self.a)
+        self.assertEqual([self.b, self.c], self.net.get_input_neurons())
+        self.assertEqual(None, self.net.lookup_neuron_by_name('neuron'))
+
+    def test_DirectEdits(self):
+        extra = Neuron('extra')
+        self.net.Neurons.append(extra)
+        self.assertTrue(self.net.lookup_neuron_by_name('extra') is extra)
+        Link(self.a, extra)
+        self.net.invalidate()
+        self.assertEqual([self.a, self.b, self.c], self.net.get_input_neurons())
+
+    def test_BuildScales(self):
+        start = time.time()
+        net = NeuralNet()
+        neurons = [net.add_neuron() for i in range(0, 20000)]
+        for source, target in zip(neurons[:-1], neurons[1:]):
+            net.add_link(source, target)
+        self.assertEqual([neurons[0]], net.get_input_neurons())
+        self.assertTrue(time.time() - start < 5.0) # minutes when every add scanned the net
+
+class TestLinkIndex(unittest.TestCase):
+    def setUp(self):
+        self.net = NeuralNet()
+        self.hub = self.net.add_neuron()
+        self.targets = [self.net.add_neuron() for i in range(0, 3 * Neuron.LinkIndexMin)]
+        self.links = [self.net.add_link(self.hub, target) for target in self.targets]
+
+    def test_Connected(self):
+        self.assertTrue(self.hub.is_connected_outgoing(self.targets[5]) is self.links[5])
+        self.assertTrue(self.targets[5].is_connected_incoming(self.hub) is self.links[5])
+        self.assertEqual(None, self.targets[5].is_connected_outgoing(self.hub))
+        self.assertTrue(self.net.add_link(self.hub, self.targets[7]) is self.links[7])
+        self.assertEqual(len(self.targets), len(self.hub.Outgoing))
+
+    def test_Removed(self):
+        self.net.remove_link(self.links[3])
+        self.assertEqual(None, self.hub.is_connected_outgoing(self.targets[3]))
+        self.hub.set_outgoing(self.links[3])
+        self.hub.set_outgoing(self.links[3])
+        self.assertTrue(self.hub.is_connected_outgoing(self.targets[3]) is self.links[3])
+        self.assertEqual(len(self.targets), len(self.hub.Outgoing))
+
+    def test_DirectEdits(self):
+        self.hub.Outgoing = self.hub.Outgoing[:-1]
+        self.assertEqual(None, self.hub.is_connected_outgoing(self.targets[-1]))
+        self.links[2].Target = self.targets[-1] # rewired, so the net needs invalidate()
+        self.net.invalidate()
+        self.net.get_input_neurons()
+        self.assertTrue(self.hub.is_connected_outgoing(self.targets[-1]) is self.links[2])
+        self.assertEqual(None, self.hub.is_connected_outgoing(self.targets[2]))
+
+    def test_HubScales(self):
+        start = time.time()
+        hub = self.net.add_neuron()
+        for target in [self.net.add_neuron() for i in range(0, 20000)]:
+            self.net.add_link(hub, target)
+            self.net.add_link(target, hub)
+        self.assertTrue(time.time() - start < 5.0)
+
+class TestLinkRegistry(unittest.TestCase):
+    def setUp(self):
+        self.net = NeuralNet()
+        self.sub = SubNet('sub')
+        self.net.Neurons.append(self.sub)
+        self.sub_in = self.sub.Net.add_neuron()
+        self.sub_out = self.sub.Net.add_neuron()
+        self.sub.Net.add_link(self.sub_in, self.sub_out)
+        self.source = self.net.add_neuron()
+        self.target = self.net.add_neuron()
+        self.into = self.net.add_link(self.source, self.sub)
+        self.out_of = self.net.add_link(self.sub, self.target)
+
+    def test_BoundaryLinksAreWired(self):
+        self.assertTrue(self.into in self.sub_in.Incoming)
+        self.assertTrue(self.out_of in self.sub_out.Outgoing)
+        self.assertTrue(self.out_of.Source is self.sub_out)
+
+    def test_RemoveLinkIntoSubNet(self):
+        self.net.remove_link(self.into)
+        self.assertFalse(self.into in self.source.Outgoing)
+        self.assertFalse(self.into in self.sub.Incoming)
+        self.assertFalse(self.into in self.sub_in.Incoming)
+        self.assertEqual([self.sub_in], self.sub.Net.get_input_neurons())
+        self.assertTrue(self.source in self.net.get_output_neurons())
+
+    def test_RemoveNeuronFedBySubNet(self):
+        self.net.remove_neuron(self.target)
+        self.assertFalse(self.out_of in self.sub.Outgoing)
+        self.assertFalse(self.out_of in self.sub_out.Outgoing)
+        self.assertEqual([self.sub_out], self.sub.Net.get_output_neurons())
+        self.assertEqual([self.sub], self.net.get_output_neurons())
+
+    def test_RemoveSubNet(self):
+        self.net.remove_neuron(self.sub)
+        self.assertEqual([], self.source.Outgoing)
+        self.assertEqual([], self.target.Incoming)
+        self.assertEqual([], self.sub_in.Incoming)
+        self.assertEqual([], self.sub_out.Outgoing)
+
+    def test_RemoveLinkWiredByHand(self):
+        link = Link(self.source, self.target) # no invalidate()
+        self.net.remove_link(link)
+        self.assertFalse(link in self.source.Outgoing)
+        self.assertFalse(link in self.target.Incoming)
+        self.assertTrue(self.out_of in self.target.Incoming)
+        self.assertEqual([self.target], self.net.get_output_neurons())
+
+    def test_RemoveScales(self):
+        net = NeuralNet()
+        neurons = [net.add_neuron() for i in range(0, 20000)]
+        links = [net.add_link(source, target) for source, target in zip(neurons[:-1], neurons[1:])]
+        start = time.time()
+        for link in links[::2]:
+            net.remove_link(link)
+        for neuron in neurons[1:5000:2]:
+            net.remove_neuron(neuron)
+        self.assertTrue(time.time() - start < 5.0)
+        self.assertEqual([], neurons[2].Incoming)
+
+if __name__ == '__main__':
+    unittest.main()